@@ -3,7 +3,6 @@
 对网易云音乐热门歌单数据进行统计分析
 """
 import pandas as pd
-import jieba
 from collections import Counter
 from typing import List, Dict, Any, Tuple, Optional
 import os
@@ -254,7 +253,8 @@ class DataAnalyzer:
             
             descriptions_text = ' '.join(descriptions)
             
-            # 使用jieba分词
+            # 使用jieba分词（延迟导入，仅关键词分析需要）
+            import jieba
             words = jieba.cut(descriptions_text)
             
             # 停用词
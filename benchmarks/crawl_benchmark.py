@@ -0,0 +1,131 @@
+"""
+爬虫吞吐量基准测试
+在进程内启动本地模拟API服务，让爬虫指向该服务，比较不同并发数下的耗时和请求速率（不访问网络）
+
+运行: python -m benchmarks.crawl_benchmark [--workers 1 2 4 8] [--latency-ms 50] [--error-rate 0.01]
+"""
+import os
+import sys
+import time
+import argparse
+from typing import List, Dict, Any, Callable
+
+from config.settings import SPIDER_CONFIG, API_CONFIG
+from benchmarks.mock_api_server import MockNeteaseAPI, MockNeteaseServer
+
+
+def run_scenario(server: MockNeteaseServer, func: Callable) -> Dict[str, Any]:
+    """
+    执行一个爬取场景并统计请求数
+    :param server: 模拟API服务
+    :param func: 接收爬虫实例、返回爬取条数的函数
+    :return: 耗时、条数、请求数及各类错误数
+    """
+    from spider.music_spider import MusicSpider
+
+    spider = MusicSpider(use_response_cache=False, archive_responses=False, base_url=server.base_url)
+    before = dict(server.api.stats)
+    start = time.perf_counter()
+    try:
+        items = func(spider)
+    finally:
+        spider.close()
+    seconds = time.perf_counter() - start
+
+    stats = {key: server.api.stats[key] - before[key] for key in before}
+    return {
+        'seconds': seconds,
+        'items': items,
+        'requests': stats['requests'],
+        'requests_per_second': stats['requests'] / seconds if seconds else 0,
+        'rate_limited': stats['rate_limited'],
+        'errors': stats['errors'],
+    }
+
+
+def run_benchmark(api: MockNeteaseAPI, workers: List[int], categories: int = 8, pages: int = 2,
+                  playlists: int = 40) -> List[Dict[str, Any]]:
+    """
+    运行所有场景并打印结果
+    :param api: 模拟API（延迟、错误率、限流等参数）
+    :param workers: 并发数列表
+    :param categories: 多分类爬取的分类数
+    :param pages: 每个分类的页数
+    :param playlists: 歌曲爬取的歌单数
+    :return: 场景结果列表
+    """
+    results = []
+
+    def crawl_categories(n):
+        def func(spider):
+            names = spider.get_hot_playlist_categories()[:categories]
+            return len(spider.crawl_categories(names, pages, 'hot', n))
+        return func
+
+    def crawl_songs(n, by_track_ids):
+        def func(spider):
+            ids = [100000000 + i for i in range(playlists)]
+            if by_track_ids:
+                batch = spider.crawl_playlist_songs_by_track_ids(ids, None, n)
+            else:
+                batch = spider.crawl_playlist_songs_batch(ids, None, n)
+            return sum(len(songs) for songs in batch.values())
+        return func
+
+    scenarios = []
+    for n in workers:
+        scenarios.append((f"多分类歌单 workers={n}", crawl_categories(n)))
+    for n in workers:
+        scenarios.append((f"歌单歌曲 workers={n}", crawl_songs(n, False)))
+    for n in workers:
+        scenarios.append((f"曲目ID+批量详情 workers={n}", crawl_songs(n, True)))
+
+    with MockNeteaseServer(api) as server:
+        print(f"模拟API服务: {server.base_url}\n")
+        print(f"{'场景':<28}{'耗时(s)':>10}{'条数':>8}{'请求数':>8}{'请求/s':>10}{'429':>6}{'5xx':>6}")
+        for name, func in scenarios:
+            result = run_scenario(server, func)
+            result['scenario'] = name
+            results.append(result)
+            print(
+                f"{name:<28}{result['seconds']:>10.2f}{result['items']:>8}{result['requests']:>8}"
+                f"{result['requests_per_second']:>10.1f}{result['rate_limited']:>6}{result['errors']:>6}"
+            )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫吞吐量基准测试（本地模拟API）')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='要比较的并发数')
+    parser.add_argument('--categories', type=int, default=8, help='多分类爬取的分类数')
+    parser.add_argument('--pages', type=int, default=2, help='每个分类的页数')
+    parser.add_argument('--playlists', type=int, default=40, help='歌曲爬取的歌单数')
+    parser.add_argument('--latency-ms', type=float, default=50, help='模拟服务每个请求的延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=20, help='模拟服务延迟的随机抖动（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0, help='模拟服务返回503的概率')
+    parser.add_argument('--server-rate-limit', type=float, default=0, help='模拟服务每秒允许的请求数')
+    parser.add_argument('--max-rps', type=float, default=0, help='爬虫的请求速率上限（0=不限制）')
+    parser.add_argument('--delay', type=float, default=0, help='爬虫请求间的随机延时上限（秒）')
+    parser.add_argument('--seed', type=int, default=163, help='随机种子')
+    args = parser.parse_args()
+
+    # 基准测试只调整本进程内的配置
+    SPIDER_CONFIG['max_requests_per_second'] = args.max_rps
+    SPIDER_CONFIG['min_delay'] = 0
+    SPIDER_CONFIG['max_delay'] = args.delay
+    API_CONFIG['retry_delay'] = 0.1
+
+    api = MockNeteaseAPI(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit=args.server_rate_limit, seed=args.seed
+    )
+
+    print("=" * 80)
+    print(f"爬虫吞吐量基准测试 (Python {sys.version.split()[0]}, {os.path.basename(sys.executable)})")
+    print("=" * 80)
+    run_benchmark(api, args.workers, args.categories, args.pages, args.playlists)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+ID存储类型基准测试
+用同一份合成数据分别生成ID列为TEXT（迁移前的表结构）和INTEGER（当前表结构）的数据库，
+对比文件大小、各表和索引的占用，以及按ID查找、关联、分组等查询的耗时，并统计旧数据库启动时迁移的耗时
+
+运行: python -m benchmarks.id_storage_benchmark [--playlists 10000] [--tracks 30] [--repeat 5] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import logging
+import argparse
+import tempfile
+from typing import List, Dict, Any, Callable
+
+from utils.logger import get_logger
+from config.settings import DATABASE_CONFIG
+from benchmarks.synthetic_data import SyntheticDataGenerator, build_database
+
+# 迁移前的表结构（ID列为TEXT，歌单表以自增id为rowid）
+LEGACY_SCHEMA = """
+    CREATE TABLE playlists (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        playlist_id TEXT UNIQUE NOT NULL,
+        playlist_name TEXT NOT NULL,
+        creator_name TEXT,
+        creator_id TEXT,
+        play_count INTEGER DEFAULT 0,
+        subscribed_count INTEGER DEFAULT 0,
+        track_count INTEGER DEFAULT 0,
+        share_count INTEGER DEFAULT 0,
+        comment_count INTEGER DEFAULT 0,
+        tags TEXT,
+        description TEXT,
+        cover_img_url TEXT,
+        playlist_url TEXT,
+        create_time TIMESTAMP,
+        update_time INTEGER DEFAULT 0,
+        track_update_time INTEGER DEFAULT 0,
+        songs_track_update_time INTEGER DEFAULT 0,
+        track_ids_hash TEXT,
+        crawl_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE songs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        song_id TEXT NOT NULL,
+        song_name TEXT NOT NULL,
+        artist TEXT,
+        artist_id TEXT,
+        album TEXT,
+        album_id TEXT,
+        duration INTEGER DEFAULT 0,
+        duration_format TEXT,
+        popularity INTEGER DEFAULT 0,
+        position INTEGER DEFAULT 0,
+        publish_time TEXT,
+        song_url TEXT,
+        cover_url TEXT,
+        playlist_id TEXT NOT NULL,
+        crawl_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (playlist_id) REFERENCES playlists(playlist_id)
+    );
+    CREATE TABLE playlist_categories (
+        playlist_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        PRIMARY KEY (playlist_id, category)
+    );
+    CREATE TABLE artists (
+        artist_id INTEGER PRIMARY KEY,
+        artist_name TEXT NOT NULL
+    );
+    CREATE TABLE albums (
+        album_id INTEGER PRIMARY KEY,
+        album_name TEXT,
+        artist_id INTEGER,
+        publish_time TEXT,
+        cover_url TEXT
+    );
+    CREATE TABLE song_artists (
+        song_id TEXT NOT NULL,
+        artist_id INTEGER NOT NULL,
+        artist_order INTEGER NOT NULL DEFAULT 1,
+        PRIMARY KEY (song_id, artist_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE comments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        comment_id TEXT UNIQUE NOT NULL,
+        song_id TEXT NOT NULL,
+        user_name TEXT,
+        user_id TEXT,
+        content TEXT,
+        like_count INTEGER DEFAULT 0,
+        comment_time TIMESTAMP,
+        crawl_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (song_id) REFERENCES songs(song_id)
+    );
+    CREATE INDEX idx_playlist_id ON playlists(playlist_id);
+    CREATE INDEX idx_playlist_play_count ON playlists(play_count DESC);
+    CREATE INDEX idx_song_id ON songs(song_id);
+    CREATE INDEX idx_artist ON songs(artist);
+    CREATE INDEX idx_song_playlist_id ON songs(playlist_id);
+    CREATE INDEX idx_comment_song_time ON comments(song_id, comment_time);
+    CREATE INDEX idx_song_artists_artist ON song_artists(artist_id, song_id);
+"""
+
+# 查询场景: (名称, SQL, 参数生成函数(ids, to_id) -> 参数列表)
+# 同一SQL在两种数据库上执行；旧版本的调用方以字符串传ID，to_id 对TEXT数据库为 str，对INTEGER数据库为 int
+QUERIES = [
+    ('按ID查歌单 x2000', "SELECT * FROM playlists WHERE playlist_id = ?",
+     lambda ids, to_id: [(to_id(i),) for i in ids['playlists'][:2000]]),
+    ('按歌单查歌曲 x2000', "SELECT * FROM songs WHERE playlist_id = ? ORDER BY position",
+     lambda ids, to_id: [(to_id(i),) for i in ids['playlists'][:2000]]),
+    ('批量查歌曲元数据 x10', """
+        SELECT s.* FROM songs s
+        JOIN (SELECT MAX(id) AS id FROM songs WHERE song_id IN ({in}) GROUP BY song_id) latest
+        ON s.id = latest.id
+     """, lambda ids, to_id: [tuple(to_id(i) for i in ids['songs'][n * 500:(n + 1) * 500])
+                              for n in range(10) if ids['songs'][n * 500:(n + 1) * 500]]),
+    ('歌曲跨歌单次数', """
+        SELECT song_id, COUNT(DISTINCT playlist_id) AS cross_count FROM songs
+        GROUP BY song_id ORDER BY cross_count DESC LIMIT 30
+     """, lambda ids, to_id: [()]),
+    ('歌曲关联歌单', """
+        SELECT p.playlist_id, COUNT(*), AVG(s.popularity) FROM songs s
+        JOIN playlists p ON p.playlist_id = s.playlist_id
+        GROUP BY p.playlist_id
+     """, lambda ids, to_id: [()]),
+    ('歌手综合统计', """
+        SELECT a.artist_id, COUNT(*) AS song_count, AVG(s.cross_count), AVG(s.duration)
+        FROM (
+            SELECT song_id, MAX(duration) AS duration, COUNT(DISTINCT playlist_id) AS cross_count
+            FROM songs GROUP BY song_id
+        ) s
+        JOIN song_artists sa ON sa.song_id = s.song_id
+        JOIN artists a ON a.artist_id = sa.artist_id
+        GROUP BY sa.artist_id ORDER BY song_count DESC LIMIT 8
+     """, lambda ids, to_id: [()]),
+    ('分类关联歌单', """
+        SELECT c.category, COUNT(*), SUM(p.play_count) FROM playlist_categories c
+        JOIN playlists p ON p.playlist_id = c.playlist_id
+        GROUP BY c.category
+     """, lambda ids, to_id: [()]),
+    ('ID去重计数', """
+        SELECT COUNT(DISTINCT song_id), COUNT(DISTINCT artist_id), COUNT(DISTINCT album_id) FROM songs
+     """, lambda ids, to_id: [()]),
+]
+
+
+def build_legacy_database(source_path: str, legacy_path: str):
+    """
+    按迁移前的表结构复制一份数据库（ID转为TEXT）
+    :param source_path: 当前表结构的数据库
+    :param legacy_path: 输出路径
+    """
+    from database.db_manager import ID_TABLES, INTEGER_ID_COLUMNS
+
+    conn = sqlite3.connect(legacy_path)
+    try:
+        conn.executescript(LEGACY_SCHEMA)
+        conn.execute("ATTACH DATABASE ? AS src", (source_path,))
+        for table in ('playlists', 'songs', 'playlist_categories', 'artists', 'albums', 'song_artists', 'comments'):
+            legacy_columns = {row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")}
+            columns = [row[1] for row in conn.execute(f"PRAGMA src.table_info({table})") if row[1] in legacy_columns]
+            values = [f"CAST({c} AS TEXT)" if table in ID_TABLES and c in INTEGER_ID_COLUMNS else c for c in columns]
+            conn.execute(f"""
+                INSERT INTO main.{table} ({', '.join(columns)})
+                SELECT {', '.join(values)} FROM src.{table}
+            """)
+        conn.commit()
+        conn.execute("DETACH DATABASE src")
+    finally:
+        conn.close()
+
+
+def storage(path: str) -> Dict[str, Any]:
+    """
+    VACUUM后统计文件大小和各表、索引的占用（dbstat 不可用时只有文件大小）
+    :param path: 数据库路径
+    :return: {'file_bytes', 'objects': {名称: 字节数}}
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("VACUUM")
+        objects = {}
+        try:
+            for name, size in conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+                objects[name] = size
+        except sqlite3.Error:
+            pass
+    finally:
+        conn.close()
+    return {'file_bytes': os.path.getsize(path), 'objects': objects}
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params_list: List[tuple], repeat: int) -> float:
+    """
+    执行查询（取完全部结果），返回多次运行中的最短耗时
+    :param conn: 数据库连接
+    :param sql: SQL语句（{in} 替换为与每组参数个数相同的占位符）
+    :param params_list: 每次运行依次执行的参数列表
+    :param repeat: 运行次数
+    :return: 最短耗时（秒）
+    """
+    statements = [sql.replace('{in}', ', '.join('?' * len(params))) for params in params_list]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for statement, params in zip(statements, params_list):
+            conn.execute(statement, params).fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_queries(path: str, ids: Dict[str, list], to_id: Callable, repeat: int) -> Dict[str, float]:
+    """在一个数据库上运行所有查询场景，返回 {场景: 秒数}"""
+    conn = sqlite3.connect(path)
+    try:
+        return {name: time_query(conn, sql, make_params(ids, to_id), repeat) for name, sql, make_params in QUERIES}
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ID存储类型（TEXT / INTEGER）基准测试')
+    parser.add_argument('--playlists', type=int, default=10000, help='歌单数量')
+    parser.add_argument('--tracks', type=int, default=30, help='每个歌单的平均曲目数')
+    parser.add_argument('--repeat', type=int, default=5, help='每个查询场景的运行次数（取最短耗时）')
+    parser.add_argument('--json', default=None, help='把结果写入JSON文件')
+    parser.add_argument('--keep', action='store_true', help='保留生成的数据库')
+    args = parser.parse_args()
+
+    # 基准测试期间只输出警告以上的日志；不建全文检索索引，只比较业务表和索引
+    get_logger().get_logger().setLevel(logging.WARNING)
+    DATABASE_CONFIG['search_index'] = False
+    DATABASE_CONFIG['profile_queries'] = False
+
+    print("=" * 70)
+    print(f"ID存储类型基准测试 (Python {sys.version.split()[0]}, SQLite {sqlite3.sqlite_version})")
+    print("=" * 70)
+
+    work_dir = tempfile.mkdtemp(prefix='music163_idbench_')
+    try:
+        integer_path = os.path.join(work_dir, 'integer_ids.db')
+        legacy_path = os.path.join(work_dir, 'text_ids.db')
+        migrated_path = os.path.join(work_dir, 'migrated.db')
+
+        generator = SyntheticDataGenerator(args.playlists, args.tracks)
+        playlist_count, song_count = build_database(integer_path, generator)
+        build_legacy_database(integer_path, legacy_path)
+        print(f"\n[{playlist_count:,} 个歌单] {song_count:,} 条歌曲记录")
+
+        # 查询参数: 随机顺序的歌单ID和歌曲ID（两种数据库相同）
+        conn = sqlite3.connect(integer_path)
+        ids = {
+            'playlists': [row[0] for row in conn.execute("SELECT playlist_id FROM playlists")],
+            'songs': [row[0] for row in conn.execute("SELECT DISTINCT song_id FROM songs")],
+        }
+        conn.close()
+        rng = random.Random(163)
+        for values in ids.values():
+            rng.shuffle(values)
+
+        # 旧数据库启动时的迁移耗时
+        from database.db_manager import DatabaseManager
+        shutil.copyfile(legacy_path, migrated_path)
+        start = time.perf_counter()
+        DatabaseManager(migrated_path).close()
+        migrate_seconds = time.perf_counter() - start
+
+        sizes = {name: storage(path) for name, path in
+                 (('text', legacy_path), ('integer', integer_path), ('migrated', migrated_path))}
+        timings = {
+            'text': run_queries(legacy_path, ids, str, args.repeat),
+            'integer': run_queries(integer_path, ids, int, args.repeat),
+        }
+
+        print(f"\n{'存储':<42}{'TEXT':>14}{'INTEGER':>14}{'变化':>10}")
+        rows = [('数据库文件', sizes['text']['file_bytes'], sizes['integer']['file_bytes'])]
+        for name in sorted(set(sizes['text']['objects']) | set(sizes['integer']['objects'])):
+            text_bytes = sizes['text']['objects'].get(name, 0)
+            integer_bytes = sizes['integer']['objects'].get(name, 0)
+            if max(text_bytes, integer_bytes) >= 64 * 1024:
+                rows.append((name, text_bytes, integer_bytes))
+        for name, text_bytes, integer_bytes in rows:
+            change = f"{(integer_bytes - text_bytes) / text_bytes * 100:+.1f}%" if text_bytes else '-'
+            print(f"  {name:<40}{text_bytes / 1024:>11.0f} KB{integer_bytes / 1024:>11.0f} KB{change:>10}")
+        print(f"  迁移后数据库文件 {sizes['migrated']['file_bytes'] / 1024:.0f} KB, 迁移耗时 {migrate_seconds * 1000:.0f} ms")
+
+        print(f"\n{'查询（最短耗时）':<22}{'TEXT ms':>12}{'INTEGER ms':>12}{'加速':>8}")
+        for name, _, _ in QUERIES:
+            text_ms, integer_ms = timings['text'][name] * 1000, timings['integer'][name] * 1000
+            print(f"  {name:<20}{text_ms:>12.1f}{integer_ms:>12.1f}{text_ms / integer_ms:>7.2f}x")
+
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'python': sys.version.split()[0],
+                    'sqlite': sqlite3.sqlite_version,
+                    'playlists': playlist_count,
+                    'song_records': song_count,
+                    'migrate_seconds': migrate_seconds,
+                    'sizes': sizes,
+                    'timings': timings,
+                }, f, ensure_ascii=False, indent=2)
+            print(f"\n结果已写入: {args.json}")
+    finally:
+        if args.keep:
+            print(f"\n数据库保留在: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
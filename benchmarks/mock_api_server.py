@@ -0,0 +1,333 @@
+"""
+本地模拟网易云音乐API服务
+返回与 /api/playlist/list、/api/playlist/detail、歌曲评论等接口结构一致的合成数据，
+可配置延迟、错误率和限流，用于离线测试爬虫的并发、重试和限速策略
+
+运行: python -m benchmarks.mock_api_server [--port 8163] [--latency-ms 50] [--error-rate 0.01] [--rate-limit 20]
+爬虫指向该服务: MUSIC163_API_BASE_URL=http://127.0.0.1:8163 python main.py crawl-playlists --pages 2
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from typing import List, Dict, Any, Optional, Tuple
+
+BASE_CREATE_TIME = 1500000000000  # 合成歌单创建时间起点（毫秒）
+LATEST_COMMENT_TIME = 1700000000000  # 合成评论的最新时间（毫秒）
+
+
+class MockNeteaseAPI:
+    """合成数据生成与请求处理（与HTTP层无关，便于直接调用）"""
+
+    def __init__(self, playlists_per_category: int = 1000, tracks_per_playlist: int = 50,
+                 song_pool: int = 20000, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0, rate_limit: float = 0, seed: int = 163, comments_per_song: int = 200):
+        """
+        初始化模拟API
+        :param playlists_per_category: 每个分类的歌单数（分页总数）
+        :param tracks_per_playlist: 每个歌单的平均曲目数
+        :param song_pool: 歌曲总数（热门歌曲会在多个歌单中重复出现）
+        :param latency_ms: 每个请求的固定延迟（毫秒）
+        :param jitter_ms: 延迟的随机抖动上限（毫秒）
+        :param error_rate: 返回HTTP 503的概率
+        :param rate_limit: 每秒允许的请求数，超出返回HTTP 429（<=0 表示不限流）
+        :param seed: 随机种子（相同参数下数据和错误序列可复现）
+        :param comments_per_song: 每首歌的平均评论数
+        """
+        self.playlists_per_category = playlists_per_category
+        self.tracks_per_playlist = tracks_per_playlist
+        self.song_pool = song_pool
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.seed = seed
+        self.comments_per_song = comments_per_song
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'not_found': 0}
+
+    # ==================== 合成数据 ====================
+
+    def _rng(self, *key) -> random.Random:
+        """按实体生成独立的随机数生成器，保证同一ID每次返回相同数据"""
+        return random.Random(f"{self.seed}-" + '-'.join(str(k) for k in key))
+
+    def _playlist_id(self, category: str, index: int) -> int:
+        """分类内第 index 个歌单的ID"""
+        return 100000000 + (sum(category.encode('utf-8')) % 1000) * 100000 + index
+
+    def _track_ids(self, playlist_id: int) -> List[int]:
+        """歌单的曲目ID（歌曲热度近似Zipf分布，热门歌曲在多个歌单中重复）"""
+        rng = self._rng('tracks', playlist_id)
+        count = max(1, int(rng.gauss(self.tracks_per_playlist, self.tracks_per_playlist / 4)))
+        ids = set()
+        while len(ids) < min(count, self.song_pool):
+            ids.add(1000 + int(self.song_pool ** rng.random()) - 1)
+        return sorted(ids, key=lambda _: rng.random())
+
+    def song(self, song_id: int) -> Dict[str, Any]:
+        """歌曲详情（与 /api/song/detail 中的歌曲结构一致）"""
+        rng = self._rng('song', song_id)
+        artist_id = rng.randint(1, max(1, self.song_pool // 10))
+        album_id = artist_id * 10 + rng.randint(0, 9)
+        artists = [{'id': artist_id, 'name': f"歌手{artist_id}"}]
+        if rng.random() < 0.2:  # 部分歌曲有合作歌手
+            featured_id = rng.randint(1, max(1, self.song_pool // 10))
+            if featured_id != artist_id:
+                artists.append({'id': featured_id, 'name': f"歌手{featured_id}"})
+        return {
+            'id': song_id,
+            'name': f"歌曲{song_id}",
+            'duration': rng.randint(90, 360) * 1000,
+            'popularity': round(100 * (1000 / song_id) ** 0.3, 1),
+            'artists': artists,
+            'album': {
+                'id': album_id,
+                'name': f"专辑{album_id}",
+                'picUrl': f"http://p1.music.126.net/mock/{album_id}.jpg",
+                'publishTime': BASE_CREATE_TIME + rng.randint(0, 2 * 10 ** 11),
+            },
+        }
+
+    def playlist(self, playlist_id: int, with_tracks: bool = False) -> Dict[str, Any]:
+        """歌单信息（与 /api/playlist/list 及 /api/playlist/detail 中的歌单结构一致）"""
+        rng = self._rng('playlist', playlist_id)
+        track_ids = self._track_ids(playlist_id)
+        play_count = int(10 ** rng.uniform(3, 9))
+        create_time = BASE_CREATE_TIME + rng.randint(0, 2 * 10 ** 11)
+        creator_id = rng.randint(1, 100000)
+
+        data = {
+            'id': playlist_id,
+            'name': f"模拟歌单{playlist_id}",
+            'description': f"模拟歌单{playlist_id}的描述",
+            'coverImgUrl': f"http://p1.music.126.net/mock/playlist/{playlist_id}.jpg",
+            'creator': {'userId': creator_id, 'nickname': f"用户{creator_id}"},
+            'playCount': play_count,
+            'subscribedCount': int(play_count * rng.uniform(0.001, 0.05)),
+            'shareCount': int(play_count * rng.uniform(0.0001, 0.002)),
+            'commentCount': int(play_count * rng.uniform(0.0001, 0.001)),
+            'trackCount': len(track_ids),
+            'tags': rng.sample(['华语', '流行', '摇滚', '民谣', '电子', '说唱', '轻音乐', '夜晚', '学习', '运动'], 3),
+            'createTime': create_time,
+            'updateTime': create_time + rng.randint(0, 10 ** 10),
+            'trackUpdateTime': create_time + rng.randint(0, 10 ** 10),
+        }
+        if with_tracks:
+            data['trackIds'] = [{'id': song_id} for song_id in track_ids]
+            data['tracks'] = [self.song(song_id) for song_id in track_ids]
+        return data
+
+    def comments(self, song_id: int, limit: int, before: int = None) -> Dict[str, Any]:
+        """
+        歌曲评论分页（按时间从新到旧，before 为游标：只返回早于该时间的评论）
+        :param song_id: 歌曲ID
+        :param limit: 每页条数
+        :param before: 时间游标（毫秒）
+        :return: 与评论接口结构一致的响应体
+        """
+        rng = self._rng('comments', song_id)
+        total = rng.randint(0, 2 * self.comments_per_song)
+        newest = LATEST_COMMENT_TIME - rng.randint(0, 10 ** 9)
+        step = rng.randint(1, 600) * 1000  # 相邻评论的时间间隔
+
+        start = 0
+        if before:
+            start = max(0, (newest - before) // step + 1)
+        end = min(start + limit, total)
+
+        comments = []
+        for i in range(start, end):
+            user_id = self._rng('comment', song_id, i).randint(1, 1000000)
+            comments.append({
+                'commentId': song_id * 100000 + i,
+                'user': {'userId': user_id, 'nickname': f"用户{user_id}"},
+                'content': f"歌曲{song_id}的第{total - i}条评论",
+                'likedCount': int(1000 / (i + 1)),
+                'time': newest - i * step,
+            })
+        return {'code': 200, 'comments': comments, 'hotComments': [], 'total': total, 'more': end < total}
+
+    # ==================== 请求处理 ====================
+
+    def _admit(self) -> Optional[int]:
+        """
+        判断请求是否被限流或随机失败
+        :return: 需要返回的错误状态码，正常返回None
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                if self._window_count > self.rate_limit:
+                    self.stats['rate_limited'] += 1
+                    return 429
+
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return 503
+
+            delay = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return None
+
+    def handle(self, path: str, query: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        """
+        处理一个请求
+        :param path: 请求路径
+        :param query: 查询参数
+        :return: (HTTP状态码, 响应JSON)
+        """
+        if path == '/__stats':
+            with self._lock:
+                return 200, dict(self.stats)
+
+        error = self._admit()
+        if error == 429:
+            return 429, {'code': 429, 'msg': '操作频繁，请稍候再试'}
+        if error:
+            return error, {'code': error, 'msg': '服务暂时不可用'}
+
+        status, body = self._route(path, query)
+        with self._lock:
+            self.stats['ok' if status == 200 else 'not_found'] += 1
+        return status, body
+
+    def _route(self, path: str, query: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        """按路径生成响应"""
+        if path == '/api/playlist/list':
+            category = query.get('cat', '全部')
+            offset = int(query.get('offset', 0))
+            limit = int(query.get('limit', 50))
+            end = min(offset + limit, self.playlists_per_category)
+            playlists = [self.playlist(self._playlist_id(category, i)) for i in range(offset, end)]
+            return 200, {'code': 200, 'playlists': playlists, 'total': self.playlists_per_category,
+                         'more': end < self.playlists_per_category}
+
+        if path == '/api/playlist/detail' and 'id' in query:
+            return 200, {'code': 200, 'result': self.playlist(int(query['id']), with_tracks=True)}
+
+        if path == '/api/v6/playlist/detail' and 'id' in query:
+            playlist = self.playlist(int(query['id']), with_tracks=True)
+            if query.get('n') == '0':
+                playlist['tracks'] = []
+            return 200, {'code': 200, 'playlist': playlist}
+
+        if path.rstrip('/') == '/api/song/detail' and 'ids' in query:
+            ids = [int(i) for i in json.loads(query['ids'])]
+            return 200, {'code': 200, 'songs': [self.song(song_id) for song_id in ids]}
+
+        if path.startswith('/api/v1/resource/comments/R_SO_4_'):
+            song_id = int(path.rsplit('_', 1)[1])
+            before = int(query['before']) if query.get('before') else None
+            return 200, self.comments(song_id, int(query.get('limit', 20)), before)
+
+        return 404, {'code': 404, 'msg': 'Not Found'}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP请求处理（委托给 MockNeteaseAPI）"""
+
+    api: MockNeteaseAPI = None
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        status, body = self.api.handle(parts.path, query)
+
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # 压测时不输出每个请求的访问日志
+        pass
+
+
+class MockNeteaseServer:
+    """在后台线程运行的模拟API服务"""
+
+    def __init__(self, api: MockNeteaseAPI = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        初始化模拟服务
+        :param api: 模拟API（None使用默认参数）
+        :param host: 监听地址
+        :param port: 监听端口（0表示自动分配）
+        """
+        self.api = api if api else MockNeteaseAPI()
+        handler = type('MockHandler', (_Handler,), {'api': self.api})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """服务地址（用作爬虫的 base_url）"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockNeteaseServer':
+        """在后台线程启动服务"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟网易云音乐API服务')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8163, help='监听端口')
+    parser.add_argument('--latency-ms', type=float, default=0, help='每个请求的固定延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='延迟的随机抖动上限（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0, help='返回503的概率')
+    parser.add_argument('--rate-limit', type=float, default=0, help='每秒允许的请求数，超出返回429')
+    parser.add_argument('--playlists', type=int, default=1000, help='每个分类的歌单数')
+    parser.add_argument('--tracks', type=int, default=50, help='每个歌单的平均曲目数')
+    parser.add_argument('--song-pool', type=int, default=20000, help='歌曲总数')
+    parser.add_argument('--comments', type=int, default=200, help='每首歌的平均评论数')
+    parser.add_argument('--seed', type=int, default=163, help='随机种子')
+    args = parser.parse_args()
+
+    api = MockNeteaseAPI(args.playlists, args.tracks, args.song_pool, args.latency_ms,
+                         args.jitter_ms, args.error_rate, args.rate_limit, args.seed, args.comments)
+    server = MockNeteaseServer(api, args.host, args.port)
+    print(f"模拟API服务已启动: {server.base_url} (统计: {server.base_url}/__stats)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"请求统计: {api.stats}")
+
+
+if __name__ == '__main__':
+    main()
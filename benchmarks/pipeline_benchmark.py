@@ -0,0 +1,183 @@
+"""
+全流程基准测试
+用合成数据生成不同规模的数据库，统计批量写入、DatabaseManager 各查询、DataAnalyzer 各分析
+以及完整报告生成的耗时和峰值内存（tracemalloc）
+
+运行: python -m benchmarks.pipeline_benchmark [--sizes 1000 10000 100000] [--tracks 30] [--json results.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from typing import List, Dict, Any, Callable, Tuple
+
+from utils.logger import get_logger
+from benchmarks.synthetic_data import SyntheticDataGenerator
+
+# DatabaseManager 查询场景: (名称, 调用)
+DB_QUERIES = [
+    ('get_statistics', lambda db: db.get_statistics()),
+    ('get_all_playlists', lambda db: db.get_all_playlists()),
+    ('get_top_playlists', lambda db: db.get_top_playlists(30, 'play_count')),
+    ('sample_playlist_metrics', lambda db: db.sample_playlist_metrics(1000)),
+    ('get_playlists_for_song_crawl', lambda db: db.get_playlists_for_song_crawl()),
+    ('get_playlist_scale_distribution', lambda db: db.get_playlist_scale_distribution()),
+    ('get_all_songs', lambda db: db.get_all_songs()),
+    ('get_top_songs', lambda db: db.get_top_songs(30)),
+    ('get_song_statistics', lambda db: db.get_song_statistics()),
+    ('get_unique_songs', lambda db: db.get_unique_songs()),
+    ('get_cross_playlist_songs', lambda db: db.get_cross_playlist_songs(2)),
+    ('get_songs_with_cross_playlist_count', lambda db: db.get_songs_with_cross_playlist_count(30)),
+    ('get_album_stats_with_cross_count', lambda db: db.get_album_stats_with_cross_count(30)),
+    ('get_artist_comprehensive_stats', lambda db: db.get_artist_comprehensive_stats(8)),
+    ('get_artist_song_counts', lambda db: db.get_artist_song_counts(20)),
+    ('get_song_duration_distribution', lambda db: db.get_song_duration_distribution()),
+    ('get_cross_count_distribution', lambda db: db.get_cross_count_distribution()),
+]
+
+# DataAnalyzer 分析场景: (名称, 调用)
+ANALYSES = [
+    ('get_basic_statistics', lambda a: a.get_basic_statistics()),
+    ('get_top_playlists', lambda a: a.get_top_playlists(30)),
+    ('get_creator_distribution', lambda a: a.get_creator_distribution(20)),
+    ('get_tag_distribution', lambda a: a.get_tag_distribution(20)),
+    ('get_playlist_scale_distribution', lambda a: a.get_playlist_scale_distribution()),
+    ('get_play_subscribe_correlation', lambda a: a.get_play_subscribe_correlation()),
+    ('analyze_playlist_description', lambda a: a.analyze_playlist_description(50)),
+    ('get_popularity_analysis', lambda a: a.get_popularity_analysis()),
+    ('get_song_statistics', lambda a: a.get_song_statistics()),
+    ('get_top_songs', lambda a: a.get_top_songs(30)),
+    ('get_artist_distribution', lambda a: a.get_artist_distribution(20)),
+    ('get_album_distribution', lambda a: a.get_album_distribution(20)),
+    ('get_song_duration_distribution', lambda a: a.get_song_duration_distribution()),
+    ('get_cross_playlist_songs', lambda a: a.get_cross_playlist_songs(2)),
+    ('get_unique_songs', lambda a: a.get_unique_songs()),
+]
+
+
+def measure(func: Callable, trace_memory: bool = True) -> Tuple[Any, float, float]:
+    """
+    执行函数并统计耗时和峰值内存
+    :param func: 无参函数
+    :param trace_memory: 是否统计峰值内存（tracemalloc 会使耗时变长）
+    :return: (返回值, 耗时秒数, 峰值内存MB，未统计时为0)
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+    finally:
+        seconds = time.perf_counter() - start
+        peak = 0
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def run_size(playlists: int, tracks: int, work_dir: str, trace_memory: bool = True,
+             skip_report: bool = False) -> List[Dict[str, Any]]:
+    """
+    在一个数据规模下运行所有场景
+    :param playlists: 歌单数量
+    :param tracks: 每个歌单的平均曲目数
+    :param work_dir: 临时目录（数据库和报告）
+    :param trace_memory: 是否统计峰值内存
+    :param skip_report: 是否跳过报告生成
+    :return: 场景结果列表
+    """
+    from database.db_manager import DatabaseManager
+
+    results = []
+
+    def record(group, name, func):
+        try:
+            _, seconds, peak_mb = measure(func, trace_memory)
+            error = None
+        except Exception as e:
+            seconds, peak_mb, error = 0, 0, str(e)
+        results.append({'size': playlists, 'group': group, 'scenario': name,
+                        'seconds': seconds, 'peak_mb': peak_mb, 'error': error})
+        status = f"失败: {error}" if error else f"{seconds * 1000:10.1f} ms {peak_mb:9.1f} MB"
+        print(f"  {group:<10}{name:<38}{status}")
+
+    generator = SyntheticDataGenerator(playlists, tracks)
+    data = list(generator.generate())
+    song_rows = sum(len(songs) for _, songs in data)
+    print(f"\n[{playlists:,} 个歌单] {song_rows:,} 条歌曲记录, 歌曲总数 {generator.song_pool:,}")
+
+    db_path = os.path.join(work_dir, f"bench_{playlists}.db")
+    db = DatabaseManager(db_path)
+    try:
+        record('写入', 'insert_playlists_batch', lambda: db.insert_playlists_batch([p for p, _ in data]))
+        record('写入', 'replace_playlist_songs', lambda: [
+            db.replace_playlist_songs(p['playlist_id'], songs) for p, songs in data
+        ])
+        del data
+
+        for name, query in DB_QUERIES:
+            record('查询', name, lambda query=query: query(db))
+
+        from analysis.data_analyzer import DataAnalyzer
+        analyzer_holder = []
+        record('分析', 'DataAnalyzer()', lambda: analyzer_holder.append(DataAnalyzer(db)))
+        if analyzer_holder:
+            analyzer = analyzer_holder[0]
+            for name, analysis in ANALYSES:
+                record('分析', name, lambda analysis=analysis: analysis(analyzer))
+            analyzer_holder.clear()
+            del analyzer
+
+        if not skip_report:
+            from visualization.modern_report_generator import ModernReportGenerator
+            report_path = os.path.join(work_dir, f"report_{playlists}.html")
+            record('报告', 'generate_report', lambda: ModernReportGenerator(db).generate_report(report_path))
+    finally:
+        db.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全流程基准测试（合成数据）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='歌单数量规模')
+    parser.add_argument('--tracks', type=int, default=30, help='每个歌单的平均曲目数')
+    parser.add_argument('--no-memory', action='store_true', help='不统计峰值内存（耗时更接近真实值）')
+    parser.add_argument('--skip-report', action='store_true', help='跳过报告生成')
+    parser.add_argument('--json', default=None, help='把结果写入JSON文件，便于对比不同版本')
+    parser.add_argument('--keep', action='store_true', help='保留生成的数据库和报告')
+    args = parser.parse_args()
+
+    # 基准测试期间只输出警告以上的日志，避免日志输出影响计时
+    get_logger().get_logger().setLevel(logging.WARNING)
+
+    print("=" * 70)
+    print(f"全流程基准测试 (Python {sys.version.split()[0]}, {os.path.basename(sys.executable)})")
+    print("=" * 70)
+
+    work_dir = tempfile.mkdtemp(prefix='music163_bench_')
+    results = []
+    try:
+        for size in args.sizes:
+            results.extend(run_size(size, args.tracks, work_dir, not args.no_memory, args.skip_report))
+    finally:
+        if args.keep:
+            print(f"\n数据库和报告保留在: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'tracks': args.tracks, 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
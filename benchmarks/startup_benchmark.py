@@ -0,0 +1,102 @@
+"""
+启动耗时基准测试
+使用 python -X importtime 统计 main.py 及各命令的导入耗时
+
+运行: python -m benchmarks.startup_benchmark [--repeat 5] [--top 15] [--depth 2]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+from typing import List, Dict, Any, Tuple
+
+from config.settings import BASE_DIR
+
+# -X importtime 输出格式: "import time: self [us] | cumulative | imported package"
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# 被测场景: (名称, python -c 代码)
+SCENARIOS = [
+    ('import main', 'import main'),
+    ('stats命令依赖', 'import main; import database.db_manager'),
+    ('爬虫依赖', 'import spider.music_spider'),
+    ('分析依赖', 'import analysis.data_analyzer'),
+    ('报告依赖', 'import visualization.modern_report_generator'),
+]
+
+
+def measure_import(code: str, depth: int = 2) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """
+    在子进程中执行代码并解析导入耗时
+    :param code: python -c 代码
+    :param depth: 解析的导入层级（1=只解析顶层导入）
+    :return: (总耗时毫秒, [(模块, 层级, 累计微秒)])
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else '执行失败')
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        # 顶层导入缩进1个空格，每深一层多2个空格
+        level = (len(match.group(3)) - 1) // 2 + 1
+        if level <= depth:
+            modules.append((match.group(4), level, int(match.group(2))))
+
+    return wall_ms, modules
+
+
+def run_benchmark(repeat: int = 5, top: int = 15, depth: int = 2) -> List[Dict[str, Any]]:
+    """
+    运行所有场景并打印结果
+    :param repeat: 每个场景重复次数（取最小值，排除冷缓存影响）
+    :param top: 展示耗时最多的模块数
+    :param depth: 展示的导入层级
+    :return: 场景结果列表
+    """
+    results = []
+
+    for name, code in SCENARIOS:
+        try:
+            runs = [measure_import(code, depth) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"\n[{name}] 跳过: {e}")
+            continue
+
+        best_wall, best_modules = min(runs, key=lambda r: r[0])
+        import_ms = sum(us for _, level, us in best_modules if level == 1) / 1000
+        results.append({'scenario': name, 'wall_ms': best_wall, 'import_ms': import_ms})
+
+        print(f"\n[{name}] 进程耗时: {best_wall:.1f} ms | 导入耗时: {import_ms:.1f} ms")
+        for module, level, us in sorted(best_modules, key=lambda m: m[2], reverse=True)[:top]:
+            print(f"    {us / 1000:8.1f} ms  {'  ' * (level - 1)}{module}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='启动耗时基准测试')
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景重复次数')
+    parser.add_argument('--top', type=int, default=15, help='展示耗时最多的模块数')
+    parser.add_argument('--depth', type=int, default=2, help='展示的导入层级')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"启动耗时基准测试 (Python {sys.version.split()[0]}, {os.path.basename(sys.executable)})")
+    print("=" * 60)
+    run_benchmark(args.repeat, args.top, args.depth)
+
+
+if __name__ == '__main__':
+    main()
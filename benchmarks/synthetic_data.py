@@ -0,0 +1,166 @@
+"""
+合成数据生成器
+生成结构与爬虫输出一致的歌单和歌曲数据，歌曲热度服从Zipf分布（热门歌曲在大量歌单中重复出现），
+用于基准测试在不同数据规模下的表现
+
+运行: python -m benchmarks.synthetic_data --playlists 10000 --db data/synthetic.db
+"""
+import os
+import time
+import random
+import argparse
+from itertools import accumulate
+from typing import List, Dict, Any, Iterator, Tuple
+
+TAGS = ['华语', '欧美', '日语', '韩语', '粤语', '流行', '摇滚', '民谣', '电子', '说唱',
+        '轻音乐', '古典', '夜晚', '学习', '工作', '运动', '旅行', '治愈', '伤感', '怀旧']
+BASE_CREATE_TIME = 1500000000  # 合成歌单创建时间起点（秒）
+
+
+class SyntheticDataGenerator:
+    """合成歌单/歌曲数据生成器（相同参数和种子生成相同数据）"""
+
+    def __init__(self, playlists: int, tracks_per_playlist: int = 30, song_pool: int = None,
+                 zipf_s: float = 1.1, seed: int = 163):
+        """
+        初始化生成器
+        :param playlists: 歌单数量
+        :param tracks_per_playlist: 每个歌单的平均曲目数
+        :param song_pool: 歌曲总数（None表示歌单数×曲目数/4）
+        :param zipf_s: Zipf分布指数（越大热门歌曲越集中）
+        :param seed: 随机种子
+        """
+        self.playlists = playlists
+        self.tracks_per_playlist = tracks_per_playlist
+        self.song_pool = song_pool if song_pool else max(100, playlists * tracks_per_playlist // 4)
+        self.seed = seed
+        self._rng = random.Random(seed)
+
+        # 第k热门的歌曲被选中的权重为 1/k^s
+        self._song_cum_weights = list(accumulate(1.0 / k ** zipf_s for k in range(1, self.song_pool + 1)))
+        self._artist_count = max(10, self.song_pool // 8)
+        self._creator_count = max(10, playlists // 5)
+        self._songs = {}
+
+    def _song(self, rank: int) -> Dict[str, Any]:
+        """第 rank 热门的歌曲元数据（不含歌单相关字段）"""
+        song = self._songs.get(rank)
+        if song is None:
+            rng = random.Random(f"{self.seed}-song-{rank}")
+            artist_id = min(self._artist_count, int(self._artist_count ** rng.random()))
+            album_id = artist_id * 10 + rng.randint(0, 9)
+            duration = rng.randint(60, 420) * 1000
+            # 约15%的歌曲有合作歌手
+            artist_ids = [artist_id]
+            if rng.random() < 0.15:
+                featured_id = rng.randint(1, self._artist_count)
+                if featured_id != artist_id:
+                    artist_ids.append(featured_id)
+            song = {
+                'song_id': 1000000 + rank,
+                'song_name': f"歌曲{rank}",
+                'artist': ', '.join(f"歌手{i}" for i in artist_ids),
+                'artist_id': artist_id,
+                'artists': [{'artist_id': i, 'artist_name': f"歌手{i}"} for i in artist_ids],
+                'album': f"专辑{album_id}",
+                'album_id': album_id,
+                'duration': duration,
+                'duration_format': f"{duration // 60000}:{duration // 1000 % 60:02d}",
+                'popularity': round(100 * (1 / rank) ** 0.2, 1),
+                'publish_time': time.strftime('%Y-%m-%d', time.gmtime(BASE_CREATE_TIME + rng.randint(0, 2 * 10 ** 8))),
+                'song_url': f"https://music.163.com/#/song?id={1000000 + rank}",
+                'cover_url': '',
+            }
+            self._songs[rank] = song
+        return song
+
+    def _playlist(self, index: int) -> Dict[str, Any]:
+        """第 index 个歌单的数据"""
+        rng = self._rng
+        play_count = int(10 ** rng.uniform(3, 9))
+        creator_id = min(self._creator_count, int(self._creator_count ** rng.random()))
+        create_time = BASE_CREATE_TIME + rng.randint(0, 2 * 10 ** 8)
+        return {
+            'rank': index + 1,
+            'playlist_id': 100000000 + index,
+            'playlist_name': f"合成歌单{index + 1}",
+            'creator_name': f"用户{creator_id}",
+            'creator_id': creator_id,
+            'play_count': play_count,
+            'subscribed_count': int(play_count * rng.uniform(0.001, 0.05)),
+            'share_count': int(play_count * rng.uniform(0.0001, 0.002)),
+            'comment_count': int(play_count * rng.uniform(0.0001, 0.001)),
+            'tags': ','.join(rng.sample(TAGS, rng.randint(1, 3))),
+            'description': f"合成歌单{index + 1}的描述",
+            'cover_url': '',
+            'playlist_url': f"https://music.163.com/#/playlist?id={100000000 + index}",
+            'create_time': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(create_time)),
+            'categories': [rng.choice(TAGS)],
+        }
+
+    def _track_ranks(self) -> List[int]:
+        """按Zipf分布抽取一个歌单的曲目（歌单内不重复）"""
+        count = max(1, min(self.song_pool, int(self._rng.gauss(self.tracks_per_playlist, self.tracks_per_playlist / 4))))
+        ranks = {}
+        while len(ranks) < count:
+            for rank in self._rng.choices(range(1, self.song_pool + 1), cum_weights=self._song_cum_weights,
+                                          k=count - len(ranks)):
+                ranks.setdefault(rank, None)
+        return list(ranks)
+
+    def generate(self) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        逐个生成歌单及其歌曲
+        :return: (歌单数据, 歌曲列表) 迭代器
+        """
+        for index in range(self.playlists):
+            playlist = self._playlist(index)
+            songs = self._track_ranks()
+            playlist['track_count'] = len(songs)
+            yield playlist, [
+                {**self._song(rank), 'playlist_id': playlist['playlist_id'], 'position': position}
+                for position, rank in enumerate(songs, 1)
+            ]
+
+
+def build_database(db_path: str, generator: SyntheticDataGenerator) -> Tuple[int, int]:
+    """
+    用合成数据生成数据库（通过 DatabaseManager 的正常写入路径）
+    :param db_path: 数据库路径（已存在时覆盖）
+    :param generator: 合成数据生成器
+    :return: (歌单数, 歌曲记录数)
+    """
+    from database.db_manager import DatabaseManager
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    db = DatabaseManager(db_path)
+    playlist_count = song_count = 0
+    try:
+        for playlist, songs in generator.generate():
+            playlist_count += db.insert_playlist(playlist)
+            song_count += db.replace_playlist_songs(playlist['playlist_id'], songs)
+    finally:
+        db.close()
+    return playlist_count, song_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成数据库')
+    parser.add_argument('--playlists', type=int, default=1000, help='歌单数量')
+    parser.add_argument('--tracks', type=int, default=30, help='每个歌单的平均曲目数')
+    parser.add_argument('--song-pool', type=int, default=None, help='歌曲总数（默认歌单数×曲目数/4）')
+    parser.add_argument('--zipf', type=float, default=1.1, help='歌曲热度的Zipf分布指数')
+    parser.add_argument('--seed', type=int, default=163, help='随机种子')
+    parser.add_argument('--db', required=True, help='输出数据库路径（已存在时覆盖）')
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(args.playlists, args.tracks, args.song_pool, args.zipf, args.seed)
+    playlist_count, song_count = build_database(args.db, generator)
+    print(f"已生成 {args.db}: {playlist_count} 个歌单, {song_count} 条歌曲记录 "
+          f"(歌曲总数 {generator.song_pool})")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,12 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # 数据库配置
 DATABASE_CONFIG = {
     'db_path': os.path.join(BASE_DIR, 'data', 'music163.db'),
+    # SQL性能分析：统计每条语句的耗时和行数，关闭连接时输出排名报告（也可用 --profile-queries 开启）
+    'profile_queries': os.environ.get('MUSIC163_PROFILE_QUERIES', '') not in ('', '0'),
+    'profile_top_n': 20,  # 报告包含的语句数
+    'profile_explain_top': 5,  # 为耗时最多的前几条查询附上 EXPLAIN QUERY PLAN
+    # 全文检索：写入歌单、歌曲、评论时同步维护FTS5索引（jieba切词），供 DatabaseManager.search 使用
+    'search_index': True,
 }
 
 # 爬虫配置
@@ -23,7 +29,10 @@ SPIDER_CONFIG = {
     
     # 爬取设置 - 歌曲
     'max_songs': 100,  # 最大爬取歌曲数量
-    'max_comments_per_song': 20,  # 每首歌最大评论数
+    'max_comments_per_song': 20,  # 每首歌最大评论数（0表示不限制）
+    'comment_page_size': 100,  # 每次评论请求的条数
+    'comment_workers': 4,  # 并发爬取评论的歌曲数
+    'comment_insert_batch': 2000,  # 评论累计到该条数时批量写入数据库
     
     # 爬取设置 - 热门歌单
     'max_playlist_pages': 20,  # 最大爬取歌单页数（每页50个，20页=1000个歌单）
@@ -39,6 +48,36 @@ SPIDER_CONFIG = {
     'min_delay': 1,  # 最小延时(秒)
     'max_delay': 3,  # 最大延时(秒)
     'scroll_pause': 0.5,  # 滚动暂停时间(秒)
+    'max_requests_per_second': 2,  # 所有爬取线程共享的请求速率上限（0=不限制）
+    'category_workers': 4,  # 多分类并发爬取的线程数
+    
+    # 歌曲爬取优先级（按加权分数从高到低爬取歌单详情）
+    'priority_weights': {
+        'play_count': 1.0,  # 播放量（对数归一化）
+        'subscribed_count': 1.0,  # 收藏数（对数归一化）
+        'staleness': 1.0,  # 距上次爬取歌曲的时间（从未爬取为最高）
+    },
+    'priority_staleness_hours': 24,  # 距上次爬取多少小时时陈旧度为0.5
+    
+    # 先取曲目ID再批量查询歌曲详情（只请求数据库中没有的歌曲）
+    'song_detail_batch_size': 200,  # 每次歌曲详情请求的歌曲数
+    
+    # HTTP响应磁盘缓存（开发调试或短时间内重复爬取时直接读取本地响应）
+    'response_cache_enabled': False,  # 是否启用（命令行 --http-cache 也可开启）
+    'response_cache_dir': os.path.join(BASE_DIR, 'data', 'http_cache'),
+    'response_cache_max_mb': 200,  # 缓存总大小上限，超出时淘汰最久未使用的响应
+    'response_cache_ttls': {  # 各接口的缓存有效期(秒)，按路径最长前缀匹配，<=0 表示不缓存
+        '/api/playlist/list': 3600,
+        '/api/playlist/detail': 6 * 3600,
+        '/api/v6/playlist/detail': 6 * 3600,
+        '/api/song/detail': 7 * 24 * 3600,
+        'default': 0,
+    },
+    
+    # 原始响应归档（gzip压缩的JSONL分段，可用 replay 命令离线重新解析入库）
+    'response_archive_enabled': False,  # 是否启用（命令行 --archive 也可开启）
+    'response_archive_dir': os.path.join(BASE_DIR, 'data', 'archive'),
+    'response_archive_segment_mb': 64,  # 单个分段未压缩数据的大小上限
     
     # User-Agent列表
     'user_agents': [
@@ -51,10 +90,11 @@ SPIDER_CONFIG = {
 
 # API请求配置
 API_CONFIG = {
-    'base_url': 'https://music.163.com',
+    # 接口地址（可通过环境变量指向本地模拟服务，见 benchmarks/mock_api_server.py）
+    'base_url': os.environ.get('MUSIC163_API_BASE_URL', 'https://music.163.com'),
     'timeout': 10,  # 请求超时时间（秒）
-    'max_retries': 3,  # 最大重试次数
-    'retry_delay': 2,  # 重试延迟（秒）
+    'max_retries': 3,  # 最大重试次数（请求异常、429和5xx时重试）
+    'retry_delay': 2,  # 重试延迟（秒，第n次重试等待n倍）
 }
 
 # 输出目录配置
@@ -64,6 +104,8 @@ OUTPUT_CONFIG = {
     'reports_dir': os.path.join(BASE_DIR, 'output', 'reports'),
     'logs_dir': os.path.join(BASE_DIR, 'logs'),
     'csv_export_path': os.path.join(BASE_DIR, 'output', 'music_data.csv'),
+    'assets_cache_dir': os.path.join(BASE_DIR, 'output', 'assets'),  # ECharts运行时等JS资源缓存
+    'metrics_dir': os.path.join(BASE_DIR, 'output', 'metrics'),  # 爬虫运行指标（JSON和Prometheus文本）
 }
 
 # 可视化配置
@@ -84,6 +126,19 @@ VISUALIZATION_CONFIG = {
     # 报告配置
     'report_title': '网易云音乐数据分析报告',
     'report_filename': 'music_analysis_report.html',
+    
+    # 图表延迟初始化：切换到对应标签页时才创建ECharts实例
+    'max_live_charts': 4,  # 同时保留的图表实例数，超出时释放最久未查看的图表（0=不释放）
+    
+    # 散点图最大点数（超出时按播放量分层抽样）
+    'scatter_max_points': 1000,
+    
+    # 报告资源输出方式：cdn=引用CDN，inline=内联到报告（完全离线），sidecar=写入报告旁的assets目录
+    'asset_mode': 'cdn',
+    'minify_html': True,  # 压缩报告模板中的CSS/JS/缩进
+    
+    # 报告旁会写出 <报告名>.profile.json（各图表的查询、构建、序列化耗时和输出大小）
+    'profile_memory': False,  # 同时用tracemalloc统计每个图表的峰值内存增量（耗时会明显变长）
 }
 
 # 日志配置
@@ -95,6 +150,9 @@ LOG_CONFIG = {
     'date_format': '%Y-%m-%d %H:%M:%S',
     'max_bytes': 10 * 1024 * 1024,  # 10MB
     'backup_count': 5,  # 保留5个备份
+    'async_logging': True,  # 由后台线程写日志文件和控制台（调用线程只入队）
+    'progress_every': 1000,  # 逐条日志汇总: 每处理多少条输出一次进度
+    'progress_interval': 5,  # 逐条日志汇总: 或每隔多少秒输出一次进度
 }
 
 # 数据分析配置
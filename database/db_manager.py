@@ -7,23 +7,83 @@ import os
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-from config.settings import DATABASE_CONFIG
+from config.settings import DATABASE_CONFIG, OUTPUT_CONFIG
+from database.query_profiler import QueryProfiler, ProfilingCursor
+from database.search_index import SearchIndex
 from utils.logger import get_logger
 
 logger = get_logger()
 
+# 维护数据版本号的表（每次写入后版本号递增，用于下游缓存失效判断）
+VERSIONED_TABLES = ('playlists', 'songs', 'comments')
+
+# 歌单表后续新增的列（旧数据库启动时自动补充）
+PLAYLIST_EXTRA_COLUMNS = [
+    ('update_time', 'INTEGER DEFAULT 0'),  # 上游歌单更新时间(毫秒)
+    ('track_update_time', 'INTEGER DEFAULT 0'),  # 上游曲目更新时间(毫秒)
+    ('songs_track_update_time', 'INTEGER DEFAULT 0'),  # 上次写入歌曲时的曲目更新时间
+    ('track_ids_hash', 'TEXT'),  # 上次写入歌曲时的曲目ID列表哈希
+    ('songs_check_time', 'TIMESTAMP'),  # 上次按详情检查曲目（写入歌曲或确认未变化）的时间
+]
+
+# get_statistics 结果中属于歌曲统计的字段
+SONG_STATISTICS_KEYS = (
+    'total_song_records', 'unique_songs', 'total_artists', 'total_albums',
+    'avg_duration', 'avg_popularity', 'max_popularity', 'playlists_with_songs'
+)
+
+# 评论表写入的列
+COMMENT_COLUMNS = (
+    'comment_id', 'song_id', 'user_name', 'user_id', 'content', 'like_count', 'comment_time'
+)
+
+# 网易云的各类ID（均为整数，旧版本以TEXT存储，启动时自动迁移为INTEGER）
+INTEGER_ID_COLUMNS = ('playlist_id', 'song_id', 'artist_id', 'album_id', 'creator_id')
+
+# 含上述ID列的表
+ID_TABLES = ('playlists', 'songs', 'playlist_categories', 'song_artists', 'comments')
+
+# 歌手/专辑维度表（写入歌曲时同步维护，旧数据库首次启动时从歌曲表补建）
+DIMENSION_TABLES = ('artists', 'albums', 'song_artists')
+
+# 歌曲表写入的列
+SONG_COLUMNS = (
+    'song_id', 'song_name', 'artist', 'artist_id', 'album', 'album_id',
+    'duration', 'duration_format', 'popularity', 'position',
+    'publish_time', 'song_url', 'cover_url', 'playlist_id'
+)
+
+
+def _to_int_id(value) -> Optional[int]:
+    """
+    转换为整数ID
+    :param value: 原始ID（字符串或整数）
+    :return: 正整数ID，缺失、非数字或为0（网易云未收录的歌手）时返回None
+    """
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
 
 class DatabaseManager:
     """数据库管理器"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, profile: bool = None):
         """
         初始化数据库管理器
         :param db_path: 数据库文件路径
+        :param profile: 是否统计每条SQL的耗时并在关闭时输出报告（None使用配置）
         """
         self.db_path = db_path if db_path else DATABASE_CONFIG['db_path']
+        if profile is None:
+            profile = DATABASE_CONFIG.get('profile_queries', False)
+        self.profiler = QueryProfiler() if profile else None
         self.conn = None
         self.cursor = None
+        self._statistics_cache = None  # (数据版本, 统计结果)
+        self.search_index = None  # 全文检索索引（DATABASE_CONFIG['search_index'] 关闭时为None）
         self._init_database()
     
     def _init_database(self):
@@ -35,7 +95,11 @@ class DatabaseManager:
             # 连接数据库
             self.conn = sqlite3.connect(self.db_path)
             self.conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
-            self.cursor = self.conn.cursor()
+            if self.profiler:
+                self.cursor = self.conn.cursor(factory=ProfilingCursor)
+                self.cursor.profiler = self.profiler
+            else:
+                self.cursor = self.conn.cursor()
             
             # 创建表
             self._create_tables()
@@ -49,14 +113,16 @@ class DatabaseManager:
     def _create_tables(self):
         """创建数据库表"""
         try:
-            # 歌单表
+            # ID列仍为TEXT的旧表先改名，建好新表后复制数据
+            legacy_tables = self._rename_legacy_id_tables()
+            
+            # 歌单表（歌单ID即rowid）
             self.cursor.execute("""
                 CREATE TABLE IF NOT EXISTS playlists (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    playlist_id TEXT UNIQUE NOT NULL,
+                    playlist_id INTEGER PRIMARY KEY,
                     playlist_name TEXT NOT NULL,
                     creator_name TEXT,
-                    creator_id TEXT,
+                    creator_id INTEGER,
                     play_count INTEGER DEFAULT 0,
                     subscribed_count INTEGER DEFAULT 0,
                     track_count INTEGER DEFAULT 0,
@@ -67,6 +133,11 @@ class DatabaseManager:
                     cover_img_url TEXT,
                     playlist_url TEXT,
                     create_time TIMESTAMP,
+                    update_time INTEGER DEFAULT 0,
+                    track_update_time INTEGER DEFAULT 0,
+                    songs_track_update_time INTEGER DEFAULT 0,
+                    track_ids_hash TEXT,
+                    songs_check_time TIMESTAMP,
                     crawl_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
@@ -75,12 +146,12 @@ class DatabaseManager:
             self.cursor.execute("""
                 CREATE TABLE IF NOT EXISTS songs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    song_id TEXT NOT NULL,
+                    song_id INTEGER NOT NULL,
                     song_name TEXT NOT NULL,
                     artist TEXT,
-                    artist_id TEXT,
+                    artist_id INTEGER,
                     album TEXT,
-                    album_id TEXT,
+                    album_id INTEGER,
                     duration INTEGER DEFAULT 0,
                     duration_format TEXT,
                     popularity INTEGER DEFAULT 0,
@@ -88,18 +159,58 @@ class DatabaseManager:
                     publish_time TEXT,
                     song_url TEXT,
                     cover_url TEXT,
-                    playlist_id TEXT NOT NULL,
+                    playlist_id INTEGER NOT NULL,
                     crawl_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (playlist_id) REFERENCES playlists(playlist_id)
                 )
             """)
             
-            # 评论表（可选，暂时保留结构）
+            # 歌单分类关联表（一个歌单可能出现在多个分类中）
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS playlist_categories (
+                    playlist_id INTEGER NOT NULL,
+                    category TEXT NOT NULL,
+                    PRIMARY KEY (playlist_id, category)
+                ) WITHOUT ROWID
+            """)
+            
+            # 歌手、专辑维度表和歌曲-歌手关联表（整数键）
+            self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'song_artists'")
+            dimensions_exist = self.cursor.fetchone() is not None or 'song_artists' in legacy_tables
+            
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS artists (
+                    artist_id INTEGER PRIMARY KEY,
+                    artist_name TEXT NOT NULL
+                )
+            """)
+            
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS albums (
+                    album_id INTEGER PRIMARY KEY,
+                    album_name TEXT,
+                    artist_id INTEGER,
+                    publish_time TEXT,
+                    cover_url TEXT
+                )
+            """)
+            
+            # 一首歌可以有多位歌手（artist_order 为署名顺序，1为主唱）
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS song_artists (
+                    song_id INTEGER NOT NULL,
+                    artist_id INTEGER NOT NULL,
+                    artist_order INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (song_id, artist_id)
+                ) WITHOUT ROWID
+            """)
+            
+            # 评论表
             self.cursor.execute("""
                 CREATE TABLE IF NOT EXISTS comments (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     comment_id TEXT UNIQUE NOT NULL,
-                    song_id TEXT NOT NULL,
+                    song_id INTEGER NOT NULL,
                     user_name TEXT,
                     user_id TEXT,
                     content TEXT,
@@ -110,12 +221,13 @@ class DatabaseManager:
                 )
             """)
             
-            # 创建索引
-            self.cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_playlist_id 
-                ON playlists(playlist_id)
-            """)
+            if legacy_tables:
+                self._copy_legacy_id_tables(legacy_tables)
             
+            if not dimensions_exist:
+                self._backfill_dimensions()
+            
+            # 创建索引
             self.cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_playlist_play_count 
                 ON playlists(play_count DESC)
@@ -136,13 +248,166 @@ class DatabaseManager:
                 ON songs(playlist_id)
             """)
             
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_comment_song_time 
+                ON comments(song_id, comment_time)
+            """)
+            
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_song_artists_artist 
+                ON song_artists(artist_id, song_id)
+            """)
+            
+            # 旧数据库补充新增的列
+            self._add_missing_columns('playlists', PLAYLIST_EXTRA_COLUMNS)
+            
+            # 数据版本表（每张业务表一个单调递增的写入计数器）
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS table_versions (
+                    table_name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.cursor.executemany(
+                "INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)",
+                [(table,) for table in VERSIONED_TABLES]
+            )
+            
+            # 全文检索索引（新建时为已有数据补建索引）
+            if DATABASE_CONFIG.get('search_index', True):
+                self.search_index = SearchIndex(self.cursor)
+                # 迁移后歌单索引的rowid由自增id改为歌单ID，需要重建
+                if self.search_index.create_tables() or legacy_tables:
+                    self.cursor.execute("SELECT EXISTS (SELECT 1 FROM playlists) OR EXISTS (SELECT 1 FROM songs)")
+                    if self.cursor.fetchone()[0]:
+                        logger.info("为已有数据建立全文检索索引...")
+                        self.search_index.rebuild()
+            
             self.conn.commit()
             logger.info("数据库表创建成功")
             
         except Exception as e:
             logger.error(f"创建数据库表失败: {e}")
+            self.conn.rollback()
             raise
     
+    def _rename_legacy_id_tables(self) -> List[str]:
+        """
+        将ID列仍为TEXT的旧表改名为 <表名>_legacy（开启事务，迁移与建表一起提交）
+        :return: 改名的表
+        """
+        legacy_tables = []
+        for table in ID_TABLES:
+            self.cursor.execute(f"PRAGMA table_info({table})")
+            if any(row['name'] in INTEGER_ID_COLUMNS and row['type'].upper() == 'TEXT'
+                   for row in self.cursor.fetchall()):
+                legacy_tables.append(table)
+        
+        if legacy_tables:
+            logger.info(f"迁移ID列为INTEGER: {', '.join(legacy_tables)}")
+            self.cursor.execute("BEGIN")
+            for table in legacy_tables:
+                self.cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        return legacy_tables
+    
+    def _copy_legacy_id_tables(self, legacy_tables: List[str]):
+        """
+        把旧表数据复制到新表（ID转为整数，空字符串转为NULL），然后删除旧表及其索引
+        :param legacy_tables: _rename_legacy_id_tables 改名的表
+        """
+        for table in legacy_tables:
+            self.cursor.execute(f"PRAGMA table_info({table})")
+            columns = [row['name'] for row in self.cursor.fetchall()]
+            self.cursor.execute(f"PRAGMA table_info({table}_legacy)")
+            legacy_columns = {row['name'] for row in self.cursor.fetchall()}
+            # 旧歌单表的自增id不再保留（歌单ID即rowid）
+            columns = [c for c in columns if c in legacy_columns]
+            values = [f"CAST(NULLIF({c}, '') AS INTEGER)" if c in INTEGER_ID_COLUMNS else c for c in columns]
+            self.cursor.execute(f"""
+                INSERT OR IGNORE INTO {table} ({', '.join(columns)})
+                SELECT {', '.join(values)} FROM {table}_legacy
+            """)
+            logger.info(f"表 {table} 已迁移 {self.cursor.rowcount} 行")
+            self.cursor.execute(f"DROP TABLE {table}_legacy")
+    
+    def _backfill_dimensions(self):
+        """
+        从歌曲表补建歌手、专辑维度表（旧数据库只保存了第一位歌手的ID，只能关联第一位歌手，
+        重新爬取歌曲后会补全合作歌手）
+        """
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO artists (artist_id, artist_name)
+            SELECT artist_id,
+                   CASE WHEN instr(artist, ', ') > 0 THEN substr(artist, 1, instr(artist, ', ') - 1)
+                        ELSE artist END
+            FROM songs
+            WHERE artist_id > 0
+            GROUP BY artist_id
+        """)
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO albums (album_id, album_name, artist_id, publish_time, cover_url)
+            SELECT album_id, album, NULLIF(artist_id, 0), publish_time, cover_url
+            FROM songs
+            WHERE album_id > 0
+            GROUP BY album_id
+        """)
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO song_artists (song_id, artist_id, artist_order)
+            SELECT song_id, artist_id, 1
+            FROM songs
+            WHERE artist_id > 0
+            GROUP BY song_id
+        """)
+        if self.cursor.rowcount > 0:
+            logger.info(f"已从歌曲表补建歌手维度: {self.cursor.rowcount} 条歌曲-歌手关联")
+    
+    def _add_missing_columns(self, table: str, columns: List[tuple]):
+        """
+        为已存在的表补充缺少的列
+        :param table: 表名
+        :param columns: [(列名, 类型定义)]
+        """
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row['name'] for row in self.cursor.fetchall()}
+        for name, definition in columns:
+            if name not in existing:
+                self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                logger.info(f"表 {table} 新增列: {name}")
+    
+    # ==================== 数据版本相关方法 ====================
+    
+    def _bump_table_version(self, *tables: str):
+        """
+        递增指定表的数据版本号（不提交，由调用方与数据写入在同一事务中提交）
+        :param tables: 表名
+        """
+        self.cursor.executemany(
+            "UPDATE table_versions SET version = version + 1 WHERE table_name = ?",
+            [(table,) for table in tables]
+        )
+    
+    def table_version(self, table_name: str) -> int:
+        """
+        获取表的数据版本号
+        每次对该表的写入（插入、覆盖、清空）都会使版本号递增，
+        调用方可缓存昂贵的聚合结果，并在版本号变化时重新计算
+        :param table_name: 表名（playlists / songs / comments）
+        :return: 当前版本号
+        """
+        if table_name not in VERSIONED_TABLES:
+            raise ValueError(f"不支持版本跟踪的表: {table_name}")
+        
+        self.cursor.execute(
+            "SELECT version FROM table_versions WHERE table_name = ?", (table_name,)
+        )
+        row = self.cursor.fetchone()
+        return row['version'] if row else 0
+    
+    def _data_versions(self) -> tuple:
+        """所有表的数据版本号（用于判断缓存的聚合结果是否仍然有效）"""
+        self.cursor.execute("SELECT table_name, version FROM table_versions ORDER BY table_name")
+        return tuple((row['table_name'], row['version']) for row in self.cursor.fetchall())
+    
     # ==================== 歌单相关方法 ====================
     
     def insert_playlist(self, playlist_data: Dict[str, Any]) -> bool:
@@ -152,13 +417,32 @@ class DatabaseManager:
         :return: 是否成功
         """
         try:
+            # 已存在时只更新歌单信息，保留上次写入歌曲时的曲目标记
             self.cursor.execute("""
-                INSERT OR REPLACE INTO playlists (
+                INSERT INTO playlists (
                     playlist_id, playlist_name, creator_name, creator_id,
                     play_count, subscribed_count, track_count,
                     share_count, comment_count, tags, description,
-                    cover_img_url, playlist_url, create_time
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    cover_img_url, playlist_url, create_time,
+                    update_time, track_update_time
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(playlist_id) DO UPDATE SET
+                    playlist_name = excluded.playlist_name,
+                    creator_name = excluded.creator_name,
+                    creator_id = excluded.creator_id,
+                    play_count = excluded.play_count,
+                    subscribed_count = excluded.subscribed_count,
+                    track_count = excluded.track_count,
+                    share_count = excluded.share_count,
+                    comment_count = excluded.comment_count,
+                    tags = excluded.tags,
+                    description = excluded.description,
+                    cover_img_url = excluded.cover_img_url,
+                    playlist_url = excluded.playlist_url,
+                    create_time = excluded.create_time,
+                    update_time = excluded.update_time,
+                    track_update_time = excluded.track_update_time,
+                    crawl_time = CURRENT_TIMESTAMP
             """, (
                 playlist_data.get('playlist_id'),
                 playlist_data.get('playlist_name'),
@@ -173,9 +457,25 @@ class DatabaseManager:
                 playlist_data.get('description'),
                 playlist_data.get('cover_img_url'),
                 playlist_data.get('playlist_url'),
-                playlist_data.get('create_time')
+                playlist_data.get('create_time'),
+                playlist_data.get('update_time', 0),
+                playlist_data.get('track_update_time', 0)
             ))
             
+            # 记录歌单来源分类
+            categories = playlist_data.get('categories')
+            if categories:
+                if isinstance(categories, str):
+                    categories = categories.split(',')
+                self.cursor.executemany("""
+                    INSERT OR IGNORE INTO playlist_categories (playlist_id, category)
+                    VALUES (?, ?)
+                """, [(playlist_data.get('playlist_id'), category) for category in categories])
+            
+            if self.search_index:
+                self.search_index.sync_playlists([playlist_data.get('playlist_id')])
+            self._bump_table_version('playlists')
+            
             self.conn.commit()
             return True
             
@@ -208,7 +508,7 @@ class DatabaseManager:
             logger.error(f"获取所有歌单失败: {e}")
             return []
     
-    def get_playlist_by_id(self, playlist_id: str) -> Optional[Dict[str, Any]]:
+    def get_playlist_by_id(self, playlist_id: int) -> Optional[Dict[str, Any]]:
         """根据ID获取歌单"""
         try:
             self.cursor.execute("SELECT * FROM playlists WHERE playlist_id = ?", (playlist_id,))
@@ -218,6 +518,19 @@ class DatabaseManager:
             logger.error(f"获取歌单失败: {e}")
             return None
     
+    def get_playlist_categories(self, playlist_id: int) -> List[str]:
+        """根据ID获取歌单出现过的分类"""
+        try:
+            self.cursor.execute("""
+                SELECT category FROM playlist_categories
+                WHERE playlist_id = ?
+                ORDER BY category
+            """, (playlist_id,))
+            return [row['category'] for row in self.cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"获取歌单分类失败: {e}")
+            return []
+    
     def get_top_playlists(self, n: int = 30, order_by: str = 'play_count') -> List[Dict[str, Any]]:
         """
         获取TOP N歌单
@@ -238,8 +551,148 @@ class DatabaseManager:
             logger.error(f"获取TOP歌单失败: {e}")
             return []
     
+    def sample_playlist_metrics(self, sample_size: int = 1000, strata: int = 10) -> List[Dict[str, Any]]:
+        """
+        按播放量分层随机抽样歌单指标（用于散点图等大数据量图表）
+        先按播放量将歌单等分为若干层，再在每层内随机抽取相同数量，
+        保证高、中、低播放量的歌单都有代表，且返回行数不超过 sample_size
+        :param sample_size: 最大样本数
+        :param strata: 分层数
+        :return: 歌单指标列表（playlist_id, playlist_name, play_count, subscribed_count）
+        """
+        per_stratum = max(1, -(-sample_size // max(1, strata)))
+        try:
+            self.cursor.execute("""
+                SELECT playlist_id, playlist_name, play_count, subscribed_count
+                FROM (
+                    SELECT *,
+                           ROW_NUMBER() OVER (PARTITION BY stratum ORDER BY RANDOM()) as rn
+                    FROM (
+                        SELECT playlist_id, playlist_name, play_count, subscribed_count,
+                               NTILE(?) OVER (ORDER BY play_count) as stratum
+                        FROM playlists
+                    )
+                )
+                WHERE rn <= ?
+                ORDER BY rn
+                LIMIT ?
+            """, (strata, per_stratum, sample_size))
+            rows = self.cursor.fetchall()
+            return [dict(row) for row in rows]
+            
+        except Exception as e:
+            # 如果窗口函数不支持，退化为简单随机抽样
+            logger.warning(f"使用简单随机抽样: {e}")
+            try:
+                self.cursor.execute("""
+                    SELECT playlist_id, playlist_name, play_count, subscribed_count
+                    FROM playlists
+                    ORDER BY RANDOM()
+                    LIMIT ?
+                """, (sample_size,))
+                rows = self.cursor.fetchall()
+                return [dict(row) for row in rows]
+            except Exception as e2:
+                logger.error(f"抽样歌单数据失败: {e2}")
+                return []
+    
+    def get_playlists_for_song_crawl(self) -> List[Dict[str, Any]]:
+        """
+        获取歌单及其上次爬取歌曲的时间和曲目标记（用于按优先级、增量爬取歌曲）
+        :return: 歌单列表（playlist_id, playlist_name, play_count, subscribed_count, track_update_time,
+                 songs_track_update_time, track_ids_hash, songs_check_time, crawl_time, last_crawl_time）
+        """
+        try:
+            self.cursor.execute("""
+                SELECT 
+                    p.playlist_id,
+                    p.playlist_name,
+                    p.play_count,
+                    p.subscribed_count,
+                    p.track_update_time,
+                    p.songs_track_update_time,
+                    p.track_ids_hash,
+                    p.songs_check_time,
+                    p.crawl_time,
+                    s.last_crawl_time
+                FROM playlists p
+                LEFT JOIN (
+                    SELECT playlist_id, MAX(crawl_time) as last_crawl_time
+                    FROM songs
+                    GROUP BY playlist_id
+                ) s ON s.playlist_id = p.playlist_id
+            """)
+            rows = self.cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"获取待爬取歌单失败: {e}")
+            return []
+    
     # ==================== 歌曲相关方法 ====================
     
+    @staticmethod
+    def _insert_song_sql() -> str:
+        """歌曲插入语句"""
+        return f"""
+            INSERT INTO songs ({', '.join(SONG_COLUMNS)})
+            VALUES ({', '.join('?' * len(SONG_COLUMNS))})
+        """
+    
+    @staticmethod
+    def _song_row(song_data: Dict[str, Any]) -> tuple:
+        """
+        将歌曲数据转换为插入参数
+        :param song_data: 歌曲数据字典
+        :return: 与 SONG_COLUMNS 对应的参数元组
+        """
+        defaults = {'duration': 0, 'popularity': 0, 'position': 0}
+        return tuple(song_data.get(column, defaults.get(column)) for column in SONG_COLUMNS)
+    
+    def _upsert_song_dimensions(self, songs_data: List[Dict[str, Any]]):
+        """
+        写入歌曲对应的歌手、专辑和歌曲-歌手关联（不提交，与歌曲写入在同一事务中）
+        :param songs_data: 歌曲数据列表（artists 为完整歌手列表；缺失时只关联第一位歌手）
+        """
+        artists, albums, links = {}, {}, {}
+        for song in songs_data:
+            song_artists = song.get('artists')
+            if song_artists is None:
+                first_name = (song.get('artist') or '').split(', ')[0]
+                song_artists = [{'artist_id': song.get('artist_id'), 'artist_name': first_name}]
+            
+            first_artist_id = None
+            for order, artist in enumerate(song_artists, 1):
+                artist_id = _to_int_id(artist.get('artist_id'))
+                if artist_id is None:
+                    continue
+                first_artist_id = first_artist_id or artist_id
+                artists[artist_id] = artist.get('artist_name') or ''
+                links.setdefault((song.get('song_id'), artist_id), order)
+            
+            album_id = _to_int_id(song.get('album_id'))
+            if album_id is not None:
+                albums[album_id] = (song.get('album'), first_artist_id, song.get('publish_time'), song.get('cover_url'))
+        
+        if artists:
+            self.cursor.executemany("""
+                INSERT INTO artists (artist_id, artist_name) VALUES (?, ?)
+                ON CONFLICT(artist_id) DO UPDATE SET artist_name = excluded.artist_name
+            """, list(artists.items()))
+        if albums:
+            self.cursor.executemany("""
+                INSERT INTO albums (album_id, album_name, artist_id, publish_time, cover_url) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(album_id) DO UPDATE SET
+                    album_name = excluded.album_name,
+                    artist_id = COALESCE(excluded.artist_id, albums.artist_id),
+                    publish_time = excluded.publish_time,
+                    cover_url = excluded.cover_url
+            """, [(album_id, *values) for album_id, values in albums.items()])
+        if links:
+            self.cursor.executemany(
+                "INSERT OR IGNORE INTO song_artists (song_id, artist_id, artist_order) VALUES (?, ?, ?)",
+                [(song_id, artist_id, order) for (song_id, artist_id), order in links.items()]
+            )
+    
     def insert_song(self, song_data: Dict[str, Any]) -> bool:
         """
         插入单首歌曲数据
@@ -247,28 +700,11 @@ class DatabaseManager:
         :return: 是否成功
         """
         try:
-            self.cursor.execute("""
-                INSERT INTO songs (
-                    song_id, song_name, artist, artist_id, album, album_id,
-                    duration, duration_format, popularity, position,
-                    publish_time, song_url, cover_url, playlist_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                song_data.get('song_id'),
-                song_data.get('song_name'),
-                song_data.get('artist'),
-                song_data.get('artist_id'),
-                song_data.get('album'),
-                song_data.get('album_id'),
-                song_data.get('duration', 0),
-                song_data.get('duration_format'),
-                song_data.get('popularity', 0),
-                song_data.get('position', 0),
-                song_data.get('publish_time'),
-                song_data.get('song_url'),
-                song_data.get('cover_url'),
-                song_data.get('playlist_id')
-            ))
+            self.cursor.execute(self._insert_song_sql(), self._song_row(song_data))
+            self._upsert_song_dimensions([song_data])
+            if self.search_index:
+                self.search_index.sync_songs([song_data.get('song_id')])
+            self._bump_table_version('songs')
             
             self.conn.commit()
             return True
@@ -292,6 +728,101 @@ class DatabaseManager:
         logger.info(f"批量插入歌曲: 成功 {success_count}/{len(songs_data)}")
         return success_count
     
+    def replace_playlist_songs(self, playlist_id: int, songs_data: List[Dict[str, Any]],
+                               track_update_time: int = None, track_ids_hash: str = None) -> int:
+        """
+        用新爬取的歌曲替换歌单原有的歌曲（同一事务内删除并写入，避免重复爬取产生重复记录）
+        :param playlist_id: 歌单ID
+        :param songs_data: 歌曲数据列表
+        :param track_update_time: 本次爬取时的上游曲目更新时间（用于增量爬取）
+        :param track_ids_hash: 本次爬取时的曲目ID列表哈希（用于增量爬取）
+        :return: 写入的歌曲数
+        """
+        try:
+            # 原有歌曲可能不再出现在任何歌单中，需要一并同步全文索引
+            removed_song_ids = []
+            if self.search_index:
+                self.cursor.execute("SELECT DISTINCT song_id FROM songs WHERE playlist_id = ?", (playlist_id,))
+                removed_song_ids = [row['song_id'] for row in self.cursor.fetchall()]
+            
+            self.cursor.execute("DELETE FROM songs WHERE playlist_id = ?", (playlist_id,))
+            self.cursor.executemany(self._insert_song_sql(), [self._song_row(song) for song in songs_data])
+            self._upsert_song_dimensions(songs_data)
+            if self.search_index:
+                self.search_index.sync_songs(removed_song_ids + [song.get('song_id') for song in songs_data])
+            self._bump_table_version('songs')
+            
+            if track_update_time is not None or track_ids_hash is not None:
+                self._set_playlist_track_marker(playlist_id, track_update_time, track_ids_hash)
+            
+            self.conn.commit()
+            return len(songs_data)
+            
+        except Exception as e:
+            logger.error(f"替换歌单 {playlist_id} 的歌曲失败: {e}")
+            self.conn.rollback()
+            return 0
+    
+    def update_playlist_track_marker(self, playlist_id: int, track_update_time: int = None,
+                                     track_ids_hash: str = None) -> bool:
+        """
+        记录歌单曲目未变化时的最新标记（不改动歌曲）
+        :param playlist_id: 歌单ID
+        :param track_update_time: 上游曲目更新时间
+        :param track_ids_hash: 曲目ID列表哈希
+        :return: 是否成功
+        """
+        try:
+            self._set_playlist_track_marker(playlist_id, track_update_time, track_ids_hash)
+            self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"更新歌单 {playlist_id} 曲目标记失败: {e}")
+            self.conn.rollback()
+            return False
+    
+    def _set_playlist_track_marker(self, playlist_id: int, track_update_time: int, track_ids_hash: str):
+        """写入歌单的曲目标记（不提交）"""
+        self.cursor.execute("""
+            UPDATE playlists SET
+                songs_track_update_time = COALESCE(?, songs_track_update_time),
+                track_update_time = MAX(track_update_time, COALESCE(?, 0)),
+                track_ids_hash = COALESCE(?, track_ids_hash),
+                songs_check_time = CURRENT_TIMESTAMP
+            WHERE playlist_id = ?
+        """, (track_update_time, track_update_time, track_ids_hash, playlist_id))
+        self._bump_table_version('playlists')
+    
+    def get_song_metadata(self, song_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        获取已入库歌曲的元数据（每首歌取最近一次写入的记录，不含歌单相关字段）
+        :param song_ids: 歌曲ID列表
+        :return: {song_id: 歌曲数据} 字典，只包含数据库中已有的歌曲
+        """
+        metadata = {}
+        columns = [c for c in SONG_COLUMNS if c not in ('playlist_id', 'position')]
+        unique_ids = list(dict.fromkeys(song_ids))
+        
+        try:
+            # 分批查询，避免超出SQLite的参数个数上限
+            for start in range(0, len(unique_ids), 500):
+                chunk = unique_ids[start:start + 500]
+                self.cursor.execute(f"""
+                    SELECT {', '.join('s.' + c for c in columns)}
+                    FROM songs s
+                    JOIN (
+                        SELECT MAX(id) AS id FROM songs
+                        WHERE song_id IN ({', '.join('?' * len(chunk))})
+                        GROUP BY song_id
+                    ) latest ON s.id = latest.id
+                """, chunk)
+                for row in self.cursor.fetchall():
+                    metadata[row['song_id']] = dict(row)
+        except Exception as e:
+            logger.error(f"查询歌曲元数据失败: {e}")
+        
+        return metadata
+    
     def get_all_songs(self) -> List[Dict[str, Any]]:
         """获取所有歌曲"""
         try:
@@ -302,7 +833,7 @@ class DatabaseManager:
             logger.error(f"获取所有歌曲失败: {e}")
             return []
     
-    def get_songs_by_playlist(self, playlist_id: str) -> List[Dict[str, Any]]:
+    def get_songs_by_playlist(self, playlist_id: int) -> List[Dict[str, Any]]:
         """根据歌单ID获取歌曲列表"""
         try:
             self.cursor.execute("""
@@ -337,38 +868,9 @@ class DatabaseManager:
             return []
     
     def get_song_statistics(self) -> Dict[str, Any]:
-        """获取歌曲统计数据"""
-        try:
-            stats = {}
-            
-            # 基础统计
-            self.cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_song_records,
-                    COUNT(DISTINCT song_id) as unique_songs,
-                    COUNT(DISTINCT artist) as total_artists,
-                    COUNT(DISTINCT album) as total_albums,
-                    AVG(duration) as avg_duration,
-                    AVG(popularity) as avg_popularity,
-                    MAX(popularity) as max_popularity
-                FROM songs
-            """)
-            row = self.cursor.fetchone()
-            stats.update(dict(row))
-            
-            # 歌单分布
-            self.cursor.execute("""
-                SELECT COUNT(DISTINCT playlist_id) as playlists_with_songs
-                FROM songs
-            """)
-            row = self.cursor.fetchone()
-            stats.update(dict(row))
-            
-            return stats
-            
-        except Exception as e:
-            logger.error(f"获取歌曲统计失败: {e}")
-            return {}
+        """获取歌曲统计数据（取自 get_statistics 的缓存结果）"""
+        stats = self.get_statistics()
+        return {key: stats[key] for key in SONG_STATISTICS_KEYS if key in stats}
     
     def get_unique_songs(self, limit: int = None) -> List[Dict[str, Any]]:
         """
@@ -453,33 +955,168 @@ class DatabaseManager:
             logger.error(f"获取跨歌单歌曲失败: {e}")
             return []
     
+    # ==================== 评论相关方法 ====================
+    
+    def insert_comments(self, comments_data: List[Dict[str, Any]]) -> int:
+        """
+        批量写入评论（按 comment_id 去重，已存在的评论只更新点赞数）
+        :param comments_data: 评论数据列表
+        :return: 写入的评论数
+        """
+        if not comments_data:
+            return 0
+        
+        try:
+            self.cursor.executemany(f"""
+                INSERT INTO comments ({', '.join(COMMENT_COLUMNS)})
+                VALUES ({', '.join('?' * len(COMMENT_COLUMNS))})
+                ON CONFLICT(comment_id) DO UPDATE SET
+                    like_count = excluded.like_count,
+                    crawl_time = CURRENT_TIMESTAMP
+            """, [tuple(comment.get(c) for c in COMMENT_COLUMNS) for comment in comments_data])
+            if self.search_index:
+                self.search_index.index_comments([comment.get('comment_id') for comment in comments_data])
+            self._bump_table_version('comments')
+            self.conn.commit()
+            return len(comments_data)
+            
+        except Exception as e:
+            logger.error(f"批量写入评论失败: {e}")
+            self.conn.rollback()
+            return 0
+    
+    def get_songs_for_comment_crawl(self, limit: int = None) -> List[int]:
+        """
+        获取待爬取评论的歌曲ID（按出现的歌单数从多到少，热门歌曲优先）
+        :param limit: 限制数量
+        :return: 歌曲ID列表
+        """
+        try:
+            query = """
+                SELECT song_id
+                FROM songs
+                GROUP BY song_id
+                ORDER BY COUNT(DISTINCT playlist_id) DESC, song_id
+            """
+            if limit:
+                query += " LIMIT ?"
+                self.cursor.execute(query, (limit,))
+            else:
+                self.cursor.execute(query)
+            return [row['song_id'] for row in self.cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"获取待爬取评论的歌曲失败: {e}")
+            return []
+    
+    def get_latest_comment_times(self, song_ids: List[int]) -> Dict[int, str]:
+        """
+        获取歌曲已入库评论的最新时间（增量爬取评论时翻页到这里即可停止）
+        :param song_ids: 歌曲ID列表
+        :return: {song_id: 最新评论时间}，只包含已有评论的歌曲
+        """
+        latest = {}
+        unique_ids = list(dict.fromkeys(song_ids))
+        
+        try:
+            # 分批查询，避免超出SQLite的参数个数上限
+            for start in range(0, len(unique_ids), 500):
+                chunk = unique_ids[start:start + 500]
+                self.cursor.execute(f"""
+                    SELECT song_id, MAX(comment_time) AS latest
+                    FROM comments
+                    WHERE song_id IN ({', '.join('?' * len(chunk))})
+                    GROUP BY song_id
+                """, chunk)
+                for row in self.cursor.fetchall():
+                    latest[row['song_id']] = row['latest']
+        except Exception as e:
+            logger.error(f"查询最新评论时间失败: {e}")
+        
+        return latest
+    
+    # ==================== 全文检索相关方法 ====================
+    
+    def search(self, query: str, kinds: List[str] = None, limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        全文检索歌单（名称、描述、标签）、歌曲（歌名、歌手、专辑）和评论（内容）
+        :param query: 搜索词（中文按jieba切词，所有词都需出现）
+        :param kinds: 搜索的类型（playlists / songs / comments，None表示全部）
+        :param limit: 每种类型返回的结果数
+        :return: {类型: [结果]}，结果按相关度排序（score 越小越相关）
+        """
+        if not self.search_index:
+            logger.warning("全文检索未启用（DATABASE_CONFIG['search_index']）")
+            return {}
+        try:
+            return self.search_index.search(query, kinds, limit)
+        except Exception as e:
+            logger.error(f"全文检索失败: {e}")
+            return {}
+    
+    def rebuild_search_index(self) -> Dict[str, int]:
+        """
+        按当前数据重建全文检索索引（修改分词方式或索引与数据不一致时使用）
+        :return: 各类型建立索引的行数
+        """
+        if not self.search_index:
+            return {}
+        try:
+            counts = self.search_index.rebuild()
+            self.conn.commit()
+            logger.info(f"全文检索索引重建完成: {counts}")
+            return counts
+        except Exception as e:
+            logger.error(f"重建全文检索索引失败: {e}")
+            self.conn.rollback()
+            return {}
+    
     def get_statistics(self) -> Dict[str, Any]:
-        """获取统计数据"""
+        """
+        获取统计数据（歌单和歌曲统计合并为一条查询，歌曲表只扫描一次）
+        歌手数按当前歌曲关联的歌手ID统计，合作歌手分别计数
+        结果按数据版本缓存，数据未变化时重复调用不再查询
+        :return: 统计字典
+        """
         try:
-            stats = {}
+            versions = self._data_versions()
+            if self._statistics_cache and self._statistics_cache[0] == versions:
+                return dict(self._statistics_cache[1])
             
-            # 歌单统计
             self.cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_playlists,
-                    SUM(play_count) as total_playlist_play_count,
-                    AVG(play_count) as avg_playlist_play_count,
-                    SUM(subscribed_count) as total_playlist_subscribe_count,
-                    AVG(subscribed_count) as avg_subscribed_count,
-                    AVG(track_count) as avg_track_count,
-                    MAX(play_count) as max_playlist_play_count,
-                    MAX(subscribed_count) as max_playlist_subscribe_count
-                FROM playlists
+                SELECT p.*, s.*, a.*, c.*
+                FROM (
+                    SELECT 
+                        COUNT(*) as total_playlists,
+                        SUM(play_count) as total_playlist_play_count,
+                        AVG(play_count) as avg_playlist_play_count,
+                        SUM(subscribed_count) as total_playlist_subscribe_count,
+                        AVG(subscribed_count) as avg_subscribed_count,
+                        AVG(track_count) as avg_track_count,
+                        MAX(play_count) as max_playlist_play_count,
+                        MAX(subscribed_count) as max_playlist_subscribe_count
+                    FROM playlists
+                ) p, (
+                    SELECT 
+                        COUNT(*) as total_song_records,
+                        COUNT(DISTINCT song_id) as unique_songs,
+                        COUNT(DISTINCT album) as total_albums,
+                        AVG(duration) as avg_duration,
+                        AVG(popularity) as avg_popularity,
+                        MAX(popularity) as max_popularity,
+                        COUNT(DISTINCT playlist_id) as playlists_with_songs
+                    FROM songs
+                ) s, (
+                    SELECT COUNT(DISTINCT artist_id) as total_artists
+                    FROM song_artists
+                    WHERE song_id IN (SELECT song_id FROM songs)
+                ) a, (
+                    SELECT COUNT(*) as total_comments FROM comments
+                ) c
             """)
-            row = self.cursor.fetchone()
-            if row:
-                stats.update(dict(row))
-            
-            # 歌曲统计
-            song_stats = self.get_song_statistics()
-            stats.update(song_stats)
+            stats = dict(self.cursor.fetchone())
             
-            return stats
+            self._statistics_cache = (versions, stats)
+            return dict(stats)
             
         except Exception as e:
             logger.error(f"获取统计数据失败: {e}")
@@ -491,6 +1128,12 @@ class DatabaseManager:
             self.cursor.execute("DELETE FROM comments")
             self.cursor.execute("DELETE FROM songs")
             self.cursor.execute("DELETE FROM playlists")
+            self.cursor.execute("DELETE FROM playlist_categories")
+            for table in DIMENSION_TABLES:
+                self.cursor.execute(f"DELETE FROM {table}")
+            if self.search_index:
+                self.search_index.clear()
+            self._bump_table_version(*VERSIONED_TABLES)
             self.conn.commit()
             logger.info("已清空所有数据")
         except Exception as e:
@@ -538,24 +1181,27 @@ class DatabaseManager:
         :return: 专辑统计列表
         """
         try:
+            # 先按歌曲聚合跨歌单次数，再按专辑ID关联专辑维度表
             query = """
                 SELECT 
-                    album,
-                    artist,
-                    COUNT(DISTINCT song_id) as song_count,
-                    AVG(cross_count) as avg_cross_count,
-                    SUM(cross_count) as total_cross_count
+                    al.album_id,
+                    al.album_name as album,
+                    ar.artist_name as artist,
+                    COUNT(*) as song_count,
+                    AVG(s.cross_count) as avg_cross_count,
+                    SUM(s.cross_count) as total_cross_count
                 FROM (
                     SELECT 
                         song_id,
-                        album,
-                        artist,
+                        MAX(album_id) as album_id,
                         COUNT(DISTINCT playlist_id) as cross_count
                     FROM songs
-                    WHERE album IS NOT NULL AND album != ''
-                    GROUP BY song_id, album, artist
-                )
-                GROUP BY album, artist
+                    GROUP BY song_id
+                ) s
+                JOIN albums al ON al.album_id = s.album_id
+                LEFT JOIN artists ar ON ar.artist_id = al.artist_id
+                WHERE al.album_name IS NOT NULL AND al.album_name != ''
+                GROUP BY al.album_id
                 HAVING song_count >= 2
                 ORDER BY total_cross_count DESC
                 LIMIT ?
@@ -579,25 +1225,27 @@ class DatabaseManager:
         :return: 歌手统计列表
         """
         try:
+            # 每首歌计入其所有歌手（含合作歌手），按整数歌手ID分组
             query = """
                 SELECT 
-                    artist,
-                    COUNT(DISTINCT song_id) as song_count,
-                    AVG(cross_count) as avg_cross_count,
-                    MAX(cross_count) as max_cross_count,
-                    AVG(duration) as avg_duration,
-                    (MAX(duration) - MIN(duration)) as duration_range
+                    a.artist_id,
+                    a.artist_name as artist,
+                    COUNT(*) as song_count,
+                    AVG(s.cross_count) as avg_cross_count,
+                    MAX(s.cross_count) as max_cross_count,
+                    AVG(s.duration) as avg_duration,
+                    (MAX(s.duration) - MIN(s.duration)) as duration_range
                 FROM (
                     SELECT 
                         song_id,
-                        artist,
-                        duration,
+                        MAX(duration) as duration,
                         COUNT(DISTINCT playlist_id) as cross_count
                     FROM songs
-                    WHERE artist IS NOT NULL AND artist != ''
-                    GROUP BY song_id, artist, duration
-                )
-                GROUP BY artist
+                    GROUP BY song_id
+                ) s
+                JOIN song_artists sa ON sa.song_id = s.song_id
+                JOIN artists a ON a.artist_id = sa.artist_id
+                GROUP BY sa.artist_id
                 HAVING song_count >= 3
                 ORDER BY song_count DESC
                 LIMIT ?
@@ -646,10 +1294,132 @@ class DatabaseManager:
             logger.error(f"获取歌单规模分布失败: {e}")
             return {}
     
+    def get_artist_song_counts(self, top_n: int = 20) -> List[Dict[str, Any]]:
+        """
+        获取歌手歌曲记录数排行（用于歌手柱状图，合作歌曲计入每位歌手）
+        :param top_n: TOP N
+        :return: 歌手列表，包含 artist_id、artist 和 song_count
+        """
+        try:
+            self.cursor.execute("""
+                SELECT a.artist_id, a.artist_name as artist, SUM(s.records) as song_count
+                FROM (
+                    SELECT song_id, COUNT(*) as records FROM songs GROUP BY song_id
+                ) s
+                JOIN song_artists sa ON sa.song_id = s.song_id
+                JOIN artists a ON a.artist_id = sa.artist_id
+                GROUP BY sa.artist_id
+                ORDER BY song_count DESC
+                LIMIT ?
+            """, (top_n,))
+            rows = self.cursor.fetchall()
+            return [dict(row) for row in rows]
+            
+        except Exception as e:
+            logger.error(f"获取歌手排行失败: {e}")
+            return []
+    
+    def get_song_duration_distribution(self) -> Dict[str, int]:
+        """获取歌曲时长分布（按歌曲记录统计）"""
+        try:
+            self.cursor.execute("""
+                SELECT 
+                    CASE 
+                        WHEN duration <= 120000 THEN '极短(≤2分钟)'
+                        WHEN duration <= 180000 THEN '短(2-3分钟)'
+                        WHEN duration <= 300000 THEN '中等(3-5分钟)'
+                        WHEN duration <= 420000 THEN '长(5-7分钟)'
+                        ELSE '超长(>7分钟)'
+                    END as duration_range,
+                    COUNT(*) as count
+                FROM songs
+                WHERE duration IS NOT NULL
+                GROUP BY duration_range
+                ORDER BY 
+                    CASE duration_range
+                        WHEN '极短(≤2分钟)' THEN 1
+                        WHEN '短(2-3分钟)' THEN 2
+                        WHEN '中等(3-5分钟)' THEN 3
+                        WHEN '长(5-7分钟)' THEN 4
+                        ELSE 5
+                    END
+            """)
+            rows = self.cursor.fetchall()
+            return {row['duration_range']: row['count'] for row in rows}
+            
+        except Exception as e:
+            logger.error(f"获取歌曲时长分布失败: {e}")
+            return {}
+    
+    def get_cross_count_distribution(self) -> Dict[str, int]:
+        """获取唯一歌曲的跨歌单次数分布（用于热度分布图）"""
+        try:
+            self.cursor.execute("""
+                SELECT 
+                    CASE 
+                        WHEN cross_count <= 1 THEN '仅1个歌单'
+                        WHEN cross_count = 2 THEN '2个歌单'
+                        WHEN cross_count = 3 THEN '3个歌单'
+                        WHEN cross_count <= 5 THEN '4-5个歌单'
+                        ELSE '6个以上歌单'
+                    END as cross_range,
+                    COUNT(*) as count
+                FROM (
+                    SELECT song_id, COUNT(DISTINCT playlist_id) as cross_count
+                    FROM songs
+                    GROUP BY song_id
+                )
+                GROUP BY cross_range
+            """)
+            rows = self.cursor.fetchall()
+            counts = {row['cross_range']: row['count'] for row in rows}
+            
+            # 保持区间顺序，没有歌曲的区间计为0
+            labels = ['仅1个歌单', '2个歌单', '3个歌单', '4-5个歌单', '6个以上歌单']
+            return {label: counts.get(label, 0) for label in labels}
+            
+        except Exception as e:
+            logger.error(f"获取跨歌单次数分布失败: {e}")
+            return {}
+    
+    def query_profile(self, top_n: int = None, explain_top: int = None) -> Optional[Dict[str, Any]]:
+        """
+        获取SQL性能分析报告（按总耗时排名，耗时最多的查询附带 EXPLAIN QUERY PLAN）
+        :param top_n: 报告包含的语句数（None使用配置）
+        :param explain_top: 附带查询计划的语句数（None使用配置）
+        :return: 报告字典，未开启性能分析时返回None
+        """
+        if not self.profiler:
+            return None
+        return self.profiler.report(
+            self.conn,
+            top_n if top_n is not None else DATABASE_CONFIG.get('profile_top_n', 20),
+            explain_top if explain_top is not None else DATABASE_CONFIG.get('profile_explain_top', 5)
+        )
+    
+    def _dump_query_profile(self):
+        """输出SQL性能分析报告到日志和JSON文件"""
+        try:
+            report = self.query_profile()
+            if not report or not report['executions']:
+                return
+            logger.info("\n" + QueryProfiler.format_report(report))
+            
+            output_dir = OUTPUT_CONFIG['metrics_dir']
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(output_dir, 'query_profile.json')
+            self.profiler.dump(path, report)
+            logger.info(f"SQL性能分析报告已保存: {path}")
+        except Exception as e:
+            logger.error(f"输出SQL性能分析报告失败: {e}")
+    
     def close(self):
-        """关闭数据库连接"""
+        """关闭数据库连接（开启性能分析时先输出报告）"""
         if self.conn:
+            if self.profiler:
+                self._dump_query_profile()
             self.conn.close()
+            self.conn = None
             logger.info("数据库连接已关闭")
 
 
@@ -0,0 +1,186 @@
+"""
+SQL查询性能分析模块
+统计每条语句的执行次数、耗时（含取结果）和行数，并为最慢的查询附上 EXPLAIN QUERY PLAN
+"""
+import re
+import sys
+import json
+import time
+import sqlite3
+from typing import List, Dict, Any, Optional
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class _QueryStats:
+    """单条语句的统计"""
+
+    def __init__(self, sql: str, params):
+        self.sql = sql
+        self.params = params  # 首次执行时的参数（用于 EXPLAIN QUERY PLAN）
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.callers = {}
+
+
+class QueryProfiler:
+    """查询耗时统计器"""
+
+    def __init__(self):
+        self._stats = {}
+        self._total_seconds = 0.0
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        """合并空白字符，使同一语句的不同排版归为一类"""
+        return _WHITESPACE.sub(' ', sql).strip()
+
+    def record(self, sql: str, params, seconds: float, rows: int, caller: str) -> _QueryStats:
+        """
+        记录一次语句执行
+        :param sql: SQL语句
+        :param params: 参数
+        :param seconds: 耗时
+        :param rows: 影响或返回的行数
+        :param caller: 调用方（DatabaseManager 方法名）
+        :return: 该语句的统计对象（之后取结果的耗时和行数累加到这里）
+        """
+        key = self.normalize(sql)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _QueryStats(key, params)
+        stats.calls += 1
+        stats.callers[caller] = stats.callers.get(caller, 0) + 1
+        self.add(stats, seconds, rows)
+        return stats
+
+    def add(self, stats: _QueryStats, seconds: float, rows: int = 0):
+        """为语句累加耗时和行数（取结果阶段）"""
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.rows += rows
+        self._total_seconds += seconds
+
+    def ranked(self) -> List[_QueryStats]:
+        """按总耗时从高到低排序的语句统计"""
+        return sorted(self._stats.values(), key=lambda s: s.total_seconds, reverse=True)
+
+    @staticmethod
+    def explain(conn: sqlite3.Connection, stats: _QueryStats) -> Optional[List[str]]:
+        """
+        获取查询计划（只对查询语句）
+        :param conn: 数据库连接
+        :param stats: 语句统计
+        :return: 查询计划各行，无法获取时返回None
+        """
+        if not stats.sql.upper().startswith(('SELECT', 'WITH')):
+            return None
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {stats.sql}", stats.params or ()).fetchall()
+            return [row[-1] for row in rows]
+        except sqlite3.Error:
+            return None
+
+    def report(self, conn: sqlite3.Connection = None, top_n: int = 20, explain_top: int = 5) -> Dict[str, Any]:
+        """
+        生成排名报告
+        :param conn: 数据库连接（用于 EXPLAIN QUERY PLAN，None表示不附查询计划）
+        :param top_n: 报告包含的语句数
+        :param explain_top: 为耗时最多的前几条查询附上查询计划
+        :return: 报告字典
+        """
+        queries = []
+        for rank, stats in enumerate(self.ranked()[:top_n], 1):
+            entry = {
+                'rank': rank,
+                'sql': stats.sql,
+                'calls': stats.calls,
+                'total_ms': round(stats.total_seconds * 1000, 3),
+                'avg_ms': round(stats.total_seconds * 1000 / stats.calls, 3),
+                'max_ms': round(stats.max_seconds * 1000, 3),
+                'rows': stats.rows,
+                'share': round(stats.total_seconds / self._total_seconds, 4) if self._total_seconds else 0,
+                'callers': dict(sorted(stats.callers.items(), key=lambda c: c[1], reverse=True)),
+            }
+            if conn is not None and rank <= explain_top:
+                entry['plan'] = self.explain(conn, stats)
+            queries.append(entry)
+
+        return {
+            'statements': len(self._stats),
+            'executions': sum(s.calls for s in self._stats.values()),
+            'total_ms': round(self._total_seconds * 1000, 3),
+            'queries': queries,
+        }
+
+    @staticmethod
+    def format_report(report: Dict[str, Any], sql_width: int = 100) -> str:
+        """
+        将报告格式化为文本
+        :param report: report() 返回的报告
+        :param sql_width: SQL显示的最大宽度
+        :return: 文本报告
+        """
+        lines = [
+            f"SQL性能分析: {report['statements']} 条语句, 执行 {report['executions']} 次, "
+            f"共 {report['total_ms']:.1f} ms",
+            f"{'#':>3} {'总耗时ms':>10} {'占比':>6} {'次数':>7} {'平均ms':>9} {'最大ms':>9} {'行数':>9}  调用方 / SQL",
+        ]
+        for q in report['queries']:
+            sql = q['sql'] if len(q['sql']) <= sql_width else q['sql'][:sql_width - 3] + '...'
+            callers = ', '.join(q['callers'])
+            lines.append(
+                f"{q['rank']:>3} {q['total_ms']:>10.1f} {q['share'] * 100:>5.1f}% {q['calls']:>7} "
+                f"{q['avg_ms']:>9.2f} {q['max_ms']:>9.2f} {q['rows']:>9}  {callers}"
+            )
+            lines.append(f"{'':>4}{sql}")
+            for step in q.get('plan') or []:
+                lines.append(f"{'':>8}计划: {step}")
+        return '\n'.join(lines)
+
+    def dump(self, path: str, report: Dict[str, Any]):
+        """写出JSON报告"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """记录每条语句耗时的游标（取结果的耗时计入最近一次执行的语句）"""
+
+    profiler: QueryProfiler = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        result = super().execute(sql, parameters)
+        elapsed = time.perf_counter() - start
+        rows = max(self.rowcount, 0)
+        self._current = self.profiler.record(sql, parameters, elapsed, rows, sys._getframe(1).f_code.co_name)
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        result = super().executemany(sql, seq_of_parameters)
+        elapsed = time.perf_counter() - start
+        self._current = self.profiler.record(sql, None, elapsed, max(self.rowcount, 0),
+                                             sys._getframe(1).f_code.co_name)
+        return result
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        current = getattr(self, '_current', None)
+        if current is not None:
+            rows = len(result) if isinstance(result, list) else int(result is not None)
+            self.profiler.add(current, time.perf_counter() - start, rows)
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
@@ -0,0 +1,319 @@
+"""
+全文检索模块
+用SQLite FTS5为歌单（名称、描述、标签）、歌曲（歌名、歌手、专辑）和评论（内容）建立索引。
+中文没有空格分词，写入索引前先用jieba切词，以空格连接后交给 unicode61 分词器；
+查询串用jieba搜索引擎模式切词，索引中除同样的切词结果外，还写入全模式切出的所有词典词和每个汉字，
+使查询串是原文的一部分时（如用“好听”搜“好听的歌”）也能命中，结果按 bm25 相关度排序
+"""
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterable
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 各类型的索引定义: 索引表、索引列、bm25列权重
+SEARCH_TABLES = {
+    'playlists': {
+        'fts': 'playlists_fts',
+        'columns': ('playlist_name', 'description', 'tags'),
+        'weights': (10.0, 1.0, 5.0),
+    },
+    'songs': {
+        'fts': 'songs_fts',
+        'columns': ('song_name', 'artist', 'album'),
+        'weights': (10.0, 5.0, 2.0),
+    },
+    'comments': {
+        'fts': 'comments_fts',
+        'columns': ('content',),
+        'weights': (1.0,),
+    },
+}
+
+# 搜索结果返回的歌曲字段（每首歌取最近一次写入的记录）
+SONG_RESULT_COLUMNS = (
+    'song_id', 'song_name', 'artist', 'artist_id', 'album', 'album_id',
+    'duration', 'duration_format', 'popularity', 'publish_time', 'song_url', 'cover_url'
+)
+
+_WORD = re.compile(r'\w')
+_HAN_CHAR = re.compile(r'[\u4e00-\u9fff]')
+# 没有jieba时的退化分词：中文逐字，其他按连续字母数字
+_FALLBACK_TOKEN = re.compile(r'[\u4e00-\u9fff]|[^\W\u4e00-\u9fff_]+')
+
+_jieba = None
+
+
+def _get_jieba():
+    """延迟加载jieba（词典加载约1秒，只在第一次建索引或搜索时发生）"""
+    global _jieba
+    if _jieba is None:
+        try:
+            import jieba
+            _jieba = jieba
+        except ImportError:
+            logger.warning("未安装jieba，全文检索退化为中文逐字匹配")
+            _jieba = False
+    return _jieba
+
+
+def _search_tokens(text: str) -> List[str]:
+    """
+    搜索引擎模式切词（不做HMM新词发现，只切出词典词和单字，与原文中的切法无关）
+    :param text: 原始文本
+    :return: 词列表
+    """
+    jieba = _get_jieba()
+    if jieba:
+        return [token for token in jieba.cut_for_search(text, HMM=False) if _WORD.search(token)]
+    return _FALLBACK_TOKEN.findall(text)
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: str) -> str:
+    """
+    将文本切词后以空格连接（歌手、专辑等重复文本命中缓存）
+    除搜索引擎模式的切词外，还包含全模式切出的所有词典词和每个汉字，
+    原文任意片段的查询词都能在其中找到
+    :param text: 原始文本
+    :return: 切词后的文本
+    """
+    if not text:
+        return ''
+    tokens = _search_tokens(text)
+    jieba = _get_jieba()
+    if jieba:
+        tokens += [token for token in jieba.cut(text, cut_all=True) if _WORD.search(token)]
+        tokens += _HAN_CHAR.findall(text)
+    return ' '.join(dict.fromkeys(tokens))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    把用户输入转换为FTS5查询（切词后每个词作为短语，所有词都需出现）
+    :param query: 搜索词
+    :return: MATCH表达式，没有有效词时返回None
+    """
+    terms = ['"' + token.replace('"', '""') + '"' for token in _search_tokens(query)]
+    return ' '.join(dict.fromkeys(terms)) or None
+
+
+def _chunks(items: List, size: int = 500) -> Iterable[List]:
+    """分批（避免超出SQLite的参数个数上限）"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _song_rowid(song_id) -> Optional[int]:
+    """歌曲索引的rowid（即歌曲ID，无效ID不建索引）"""
+    try:
+        return int(song_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class SearchIndex:
+    """FTS5索引维护与查询（与数据写入共用游标，由调用方提交事务）"""
+
+    def __init__(self, cursor):
+        """
+        初始化
+        :param cursor: 数据库游标
+        """
+        self.cursor = cursor
+
+    def create_tables(self) -> bool:
+        """
+        创建索引表
+        :return: 是否新建了索引表（已有数据时需要调用 rebuild 补建索引）
+        """
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        existing = {row[0] for row in self.cursor.fetchall()}
+
+        created = False
+        for spec in SEARCH_TABLES.values():
+            if spec['fts'] in existing:
+                continue
+            # 歌单、歌曲的rowid为歌单ID、歌曲ID（歌曲按ID去重），评论的rowid为评论表id
+            self.cursor.execute(
+                f"CREATE VIRTUAL TABLE {spec['fts']} USING fts5({', '.join(spec['columns'])}, tokenize='unicode61')"
+            )
+            weights = ', '.join(str(w) for w in spec['weights'])
+            self.cursor.execute(
+                f"INSERT INTO {spec['fts']} ({spec['fts']}, rank) VALUES ('rank', 'bm25({weights})')"
+            )
+            created = True
+        return created
+
+    def _insert(self, kind: str, rows: List[tuple], replace: bool = False):
+        """写入索引行 [(rowid, 列1原文, 列2原文, ...)]"""
+        if not rows:
+            return
+        spec = SEARCH_TABLES[kind]
+        columns = spec['columns']
+        self.cursor.executemany(
+            f"INSERT {'OR REPLACE ' if replace else ''}INTO {spec['fts']} (rowid, {', '.join(columns)}) "
+            f"VALUES (?, {', '.join('?' * len(columns))})",
+            [(row[0], *(tokenize(value or '') for value in row[1:])) for row in rows]
+        )
+
+    def _indexed_rows(self, kind: str, rowids: List[int]) -> Dict[int, tuple]:
+        """索引中已有的行 {rowid: (切词后的各列)}"""
+        columns = SEARCH_TABLES[kind]['columns']
+        indexed = {}
+        for chunk in _chunks(rowids):
+            self.cursor.execute(
+                f"SELECT rowid, {', '.join(columns)} FROM {SEARCH_TABLES[kind]['fts']} "
+                f"WHERE rowid IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            indexed.update((row[0], tuple(row[1:])) for row in self.cursor.fetchall())
+        return indexed
+
+    def _sync(self, kind: str, rowids: List[int], current: Dict[int, tuple]):
+        """
+        按源表当前数据同步索引：内容变化的行覆盖写入，源表中已不存在的行从索引删除
+        :param kind: 类型
+        :param rowids: 需要同步的rowid
+        :param current: 源表当前数据 {rowid: (各列原文)}，不含已删除的行
+        """
+        indexed = self._indexed_rows(kind, rowids)
+        removed = [rowid for rowid in indexed if rowid not in current]
+        for chunk in _chunks(removed):
+            self.cursor.execute(
+                f"DELETE FROM {SEARCH_TABLES[kind]['fts']} WHERE rowid IN ({', '.join('?' * len(chunk))})", chunk
+            )
+        self._insert(kind, [
+            (rowid, *values) for rowid, values in current.items()
+            if indexed.get(rowid) != tuple(tokenize(value or '') for value in values)
+        ], replace=True)
+
+    def sync_playlists(self, playlist_ids: List[int]):
+        """
+        同步歌单索引（歌单名称、描述、标签变化时覆盖，未变化时不重写）
+        :param playlist_ids: 歌单ID列表
+        """
+        for chunk in _chunks(list(dict.fromkeys(playlist_ids))):
+            self.cursor.execute(f"""
+                SELECT playlist_id, playlist_name, description, tags FROM playlists
+                WHERE playlist_id IN ({', '.join('?' * len(chunk))})
+            """, chunk)
+            current = {row[0]: tuple(row[1:]) for row in self.cursor.fetchall()}
+            self._sync('playlists', chunk, current)
+
+    def sync_songs(self, song_ids: List[int]):
+        """
+        同步歌曲索引：按每首歌最近一次写入的记录覆盖变化的歌名、歌手、专辑，
+        歌曲表中已没有记录的歌曲从索引删除（同一首歌出现在多个歌单中时只切词一次）
+        :param song_ids: 写入或删除过记录的歌曲ID列表
+        """
+        rowids = [rowid for rowid in dict.fromkeys(_song_rowid(song_id) for song_id in song_ids) if rowid is not None]
+        for chunk in _chunks(rowids):
+            self.cursor.execute(f"""
+                SELECT s.song_id, s.song_name, s.artist, s.album
+                FROM songs s
+                JOIN (
+                    SELECT MAX(id) AS id FROM songs
+                    WHERE song_id IN ({', '.join('?' * len(chunk))})
+                    GROUP BY song_id
+                ) latest ON s.id = latest.id
+            """, chunk)
+            current = {row[0]: tuple(row[1:]) for row in self.cursor.fetchall()}
+            self._sync('songs', chunk, current)
+
+    def index_comments(self, comment_ids: List[str]):
+        """
+        为新写入的评论建立索引（评论内容不会变化，已有索引的评论跳过）
+        :param comment_ids: 评论ID列表
+        """
+        for chunk in _chunks(list(dict.fromkeys(comment_ids))):
+            self.cursor.execute(
+                f"SELECT id, content FROM comments WHERE comment_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            rows = [tuple(row) for row in self.cursor.fetchall()]
+            indexed = self._indexed_rows('comments', [row[0] for row in rows])
+            self._insert('comments', [row for row in rows if row[0] not in indexed])
+
+    def clear(self):
+        """清空所有索引"""
+        for spec in SEARCH_TABLES.values():
+            self.cursor.execute(f"DELETE FROM {spec['fts']}")
+
+    def rebuild(self, batch_size: int = 5000) -> Dict[str, int]:
+        """
+        按源表重建全部索引
+        :param batch_size: 每批读取的行数
+        :return: 各类型建立索引的行数
+        """
+        self.clear()
+        queries = {
+            'playlists': "SELECT playlist_id, playlist_name, description, tags FROM playlists",
+            # 每首歌取最近一次写入的记录
+            'songs': """
+                SELECT s.song_id, s.song_name, s.artist, s.album
+                FROM songs s JOIN (SELECT MAX(id) AS id FROM songs GROUP BY song_id) latest ON s.id = latest.id
+            """,
+            'comments': "SELECT id, content FROM comments",
+        }
+
+        counts = {}
+        for kind, query in queries.items():
+            # 读取用独立游标，写入索引用共享游标
+            reader = self.cursor.connection.execute(query)
+            counts[kind] = 0
+            while True:
+                rows = reader.fetchmany(batch_size)
+                if not rows:
+                    break
+                if kind == 'songs':
+                    rows = [(_song_rowid(row[0]), *row[1:]) for row in rows if _song_rowid(row[0]) is not None]
+                self._insert(kind, [tuple(row) for row in rows])
+                counts[kind] += len(rows)
+        return counts
+
+    def search(self, query: str, kinds: Iterable[str] = None, limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        全文检索
+        :param query: 搜索词
+        :param kinds: 搜索的类型（playlists / songs / comments，None表示全部）
+        :param limit: 每种类型返回的结果数
+        :return: {类型: [结果]}，结果按相关度排序，score 越小越相关
+        """
+        match = build_match_query(query)
+        kinds = list(kinds) if kinds else list(SEARCH_TABLES)
+        if not match:
+            return {kind: [] for kind in kinds}
+
+        # 先在索引中按相关度取前N条，再回表取数据
+        sql = {
+            'playlists': """
+                SELECT p.*, f.rank AS score
+                FROM (SELECT rowid, rank FROM playlists_fts WHERE playlists_fts MATCH ? ORDER BY rank LIMIT ?) f
+                JOIN playlists p ON p.playlist_id = f.rowid
+                ORDER BY f.rank
+            """,
+            'songs': f"""
+                SELECT {', '.join('s.' + c for c in SONG_RESULT_COLUMNS)},
+                       (SELECT COUNT(*) FROM songs c WHERE c.song_id = s.song_id) AS playlist_count,
+                       f.rank AS score
+                FROM (SELECT rowid, rank FROM songs_fts WHERE songs_fts MATCH ? ORDER BY rank LIMIT ?) f
+                JOIN songs s ON s.id = (SELECT MAX(id) FROM songs WHERE song_id = f.rowid)
+                ORDER BY f.rank
+            """,
+            'comments': """
+                SELECT c.*, f.rank AS score
+                FROM (SELECT rowid, rank FROM comments_fts WHERE comments_fts MATCH ? ORDER BY rank LIMIT ?) f
+                JOIN comments c ON c.id = f.rowid
+                ORDER BY f.rank
+            """,
+        }
+
+        results = {}
+        for kind in kinds:
+            if kind not in SEARCH_TABLES:
+                raise ValueError(f"不支持的搜索类型: {kind}")
+            self.cursor.execute(sql[kind], (match, limit))
+            results[kind] = [dict(row) for row in self.cursor.fetchall()]
+        return results
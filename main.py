@@ -4,12 +4,14 @@
 """
 import os
 import sys
+import json
 import time
+import argparse
 from datetime import datetime
+from typing import List, Dict, Any, Optional
 
-from config.settings import create_directories, SPIDER_CONFIG
+from config.settings import create_directories, SPIDER_CONFIG, DATABASE_CONFIG
 from database.db_manager import DatabaseManager
-from spider.music_spider import MusicSpider
 from utils.logger import get_logger
 
 logger = get_logger()
@@ -22,6 +24,9 @@ class MusicAnalysisApp:
         """初始化应用"""
         self.db = None
         self.spider = None
+        # 是否启用HTTP响应磁盘缓存、原始响应归档（None使用配置）
+        self.use_response_cache = None
+        self.archive_responses = None
         
         # 创建必要的目录
         create_directories()
@@ -34,6 +39,21 @@ class MusicAnalysisApp:
             logger.error(f"应用初始化失败: {e}")
             sys.exit(1)
     
+    def _ensure_spider(self):
+        """按需创建爬虫（延迟导入requests等依赖，统计、导出等命令无需加载）"""
+        if not self.spider:
+            from spider.music_spider import MusicSpider
+            self.spider = MusicSpider(self.use_response_cache, self.archive_responses)
+        return self.spider
+    
+    def _close_spider(self):
+        """导出爬虫指标（有请求时）并关闭爬虫"""
+        if self.spider:
+            if self.spider.metrics.summary()['requests']:
+                self.spider.export_metrics()
+            self.spider.close()
+            self.spider = None
+    
     def show_menu(self):
         """显示主菜单"""
         print("\n" + "="*60)
@@ -57,8 +77,7 @@ class MusicAnalysisApp:
         
         try:
             # 初始化爬虫
-            if not self.spider:
-                self.spider = MusicSpider()
+            self._ensure_spider()
             
             # 显示分类选项
             categories = self.spider.get_hot_playlist_categories()
@@ -99,41 +118,27 @@ class MusicAnalysisApp:
             print(f"\n开始爬取热门歌单...")
             print("提示: 爬取过程可能需要较长时间，请耐心等待...")
             
-            # 爬取热门歌单
-            start_time = time.time()
-            
-            playlists_data = self.spider.crawl_hot_playlists(
-                max_pages=max_pages,
-                category=category,
-                order='hot'
-            )
+            # 爬取热门歌单并保存到数据库
+            summary = self.do_crawl_playlists(max_pages, [category], 'hot')
             
-            if not playlists_data:
+            if not summary['crawled']:
                 print("[失败] 爬取失败，没有获取到数据")
                 return
             
-            print(f"\n[成功] 成功爬取 {len(playlists_data)} 个热门歌单")
-            
-            # 保存到数据库
-            print("\n正在保存到数据库...")
-            success_count = self.db.insert_playlists_batch(playlists_data)
-            print(f"[成功] 已保存 {success_count} 个歌单到数据库")
+            print(f"\n[成功] 成功爬取 {summary['crawled']} 个热门歌单")
+            print(f"[成功] 已保存 {summary['saved']} 个歌单到数据库")
             
             # 显示统计信息
-            if playlists_data:
-                total_play = sum(p.get('play_count', 0) for p in playlists_data)
-                total_subscribe = sum(p.get('subscribed_count', 0) for p in playlists_data)
-                avg_play = total_play // len(playlists_data) if playlists_data else 0
-                avg_subscribe = total_subscribe // len(playlists_data) if playlists_data else 0
-                
-                print(f"\n[统计] 统计信息:")
-                print(f"  总播放量: {total_play:,}")
-                print(f"  总收藏数: {total_subscribe:,}")
-                print(f"  平均播放量: {avg_play:,}")
-                print(f"  平均收藏数: {avg_subscribe:,}")
+            total_play = summary['total_play_count']
+            total_subscribe = summary['total_subscribed_count']
+            
+            print(f"\n[统计] 统计信息:")
+            print(f"  总播放量: {total_play:,}")
+            print(f"  总收藏数: {total_subscribe:,}")
+            print(f"  平均播放量: {total_play // summary['crawled']:,}")
+            print(f"  平均收藏数: {total_subscribe // summary['crawled']:,}")
             
-            elapsed_time = time.time() - start_time
-            print(f"\n爬取完成! 耗时: {elapsed_time:.2f} 秒")
+            print(f"\n爬取完成! 耗时: {summary['elapsed_seconds']:.2f} 秒")
             
         except KeyboardInterrupt:
             print("\n\n用户中断爬取")
@@ -141,10 +146,8 @@ class MusicAnalysisApp:
             logger.error(f"爬取热门歌单失败: {e}")
             print(f"[失败] 爬取失败: {e}")
         finally:
-            # 清理爬虫资源
-            if self.spider:
-                self.spider.close()
-                self.spider = None
+            # 导出本次爬取的指标并清理爬虫资源
+            self._close_spider()
     
     def crawl_playlist_songs(self):
         """爬取歌单内的歌曲功能"""
@@ -173,8 +176,7 @@ class MusicAnalysisApp:
                 return
             
             # 初始化爬虫
-            if not self.spider:
-                self.spider = MusicSpider()
+            self._ensure_spider()
             
             playlist_ids = []
             max_songs_per_playlist = None
@@ -248,23 +250,13 @@ class MusicAnalysisApp:
             
             # 开始爬取
             print(f"\n开始爬取 {len(playlist_ids)} 个歌单的歌曲...")
-            start_time = time.time()
             
-            batch_songs = self.spider.crawl_playlist_songs_batch(playlist_ids, max_songs_per_playlist)
+            summary = self.do_crawl_songs(playlist_ids, max_songs_per_playlist)
             
-            # 保存到数据库
-            print("\n保存歌曲到数据库...")
-            total_saved = 0
-            for playlist_id, songs_list in batch_songs.items():
-                if songs_list:
-                    count = self.db.insert_songs_batch(songs_list)
-                    total_saved += count
-            
-            elapsed_time = time.time() - start_time
             print(f"\n[成功] 爬取完成!")
-            print(f"  共爬取: {sum(len(songs) for songs in batch_songs.values())} 首歌曲")
-            print(f"  已保存: {total_saved} 首歌曲")
-            print(f"  耗时: {elapsed_time:.2f} 秒")
+            print(f"  共爬取: {summary['crawled']} 首歌曲")
+            print(f"  已保存: {summary['saved']} 首歌曲")
+            print(f"  耗时: {summary['elapsed_seconds']:.2f} 秒")
             
             # 显示歌曲统计
             song_stats = self.db.get_song_statistics()
@@ -281,10 +273,8 @@ class MusicAnalysisApp:
             logger.error(f"爬取歌曲失败: {e}")
             print(f"[失败] 爬取失败: {e}")
         finally:
-            # 清理爬虫资源
-            if self.spider:
-                self.spider.close()
-                self.spider = None
+            # 导出本次爬取的指标并清理爬虫资源
+            self._close_spider()
     
     def analyze_data(self):
         """热门歌单数据分析功能"""
@@ -386,15 +376,12 @@ class MusicAnalysisApp:
             print("正在生成报告，请稍候...")
             print("-"*60)
             
-            # 导入现代化可视化模块
-            from visualization.modern_report_generator import ModernReportGenerator
-            
             # 生成报告
-            generator = ModernReportGenerator(self.db)
-            report_path = generator.generate_report()
+            summary = self.do_generate_report()
+            report_path = summary['report_path']
             
-            if report_path and os.path.exists(report_path):
-                file_size = os.path.getsize(report_path) / 1024
+            if report_path:
+                file_size = summary['size_bytes'] / 1024
                 print("\n" + "="*60)
                 print("🎉 报告生成成功！")
                 print("="*60)
@@ -473,51 +460,332 @@ class MusicAnalysisApp:
         print("-"*60)
         
         try:
-            playlists = self.db.get_all_playlists()
+            summary = self.do_export_csv()
             
-            if not playlists:
+            if not summary['rows']:
                 print("\n[提示] 数据库中暂无歌单数据，请先爬取数据")
                 return
             
-            # 导出CSV
-            import csv
-            from config.settings import OUTPUT_CONFIG
-            
-            csv_path = OUTPUT_CONFIG.get('csv_export_path', 'output/playlists_data.csv')
-            csv_dir = os.path.dirname(csv_path)
-            if not os.path.exists(csv_dir):
-                os.makedirs(csv_dir)
-            
-            print(f"\n正在导出 {len(playlists)} 个歌单数据...")
-            
-            with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
-                fieldnames = ['rank', 'playlist_id', 'playlist_name', 'creator_name', 
-                             'play_count', 'subscribed_count', 'track_count', 
-                             'tags', 'create_time', 'description']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for playlist in playlists:
-                    writer.writerow({
-                        'rank': playlist.get('rank', ''),
-                        'playlist_id': playlist.get('playlist_id', ''),
-                        'playlist_name': playlist.get('playlist_name', ''),
-                        'creator_name': playlist.get('creator_name', ''),
-                        'play_count': playlist.get('play_count', 0),
-                        'subscribed_count': playlist.get('subscribed_count', 0),
-                        'track_count': playlist.get('track_count', 0),
-                        'tags': playlist.get('tags', ''),
-                        'create_time': playlist.get('create_time', ''),
-                        'description': playlist.get('description', '')[:200]  # 限制描述长度
-                    })
-            
-            print(f"[OK] 数据已导出到: {csv_path}")
-            print(f"     共导出 {len(playlists)} 条记录")
+            print(f"[OK] 数据已导出到: {summary['path']}")
+            print(f"     共导出 {summary['rows']} 条记录")
             
         except Exception as e:
             logger.error(f"导出CSV失败: {e}")
             print(f"[X] 导出失败: {e}")
     
+    # ==================== 无交互操作（供菜单和命令行共用） ====================
+    
+    def do_crawl_playlists(self, max_pages: int, categories: Optional[List[str]], order: str = 'hot',
+                           max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        爬取热门歌单并保存到数据库
+        :param max_pages: 每个分类的最大页数
+        :param categories: 歌单分类列表（多个分类时并发爬取并按歌单ID去重，None表示全部分类）
+        :param order: 排序方式
+        :param max_workers: 多分类并发线程数（None使用配置）
+        :return: 执行摘要
+        """
+        self._ensure_spider()
+        if categories is None:
+            categories = self.spider.get_hot_playlist_categories()
+        
+        start_time = time.time()
+        if len(categories) == 1:
+            playlists_data = self.spider.crawl_hot_playlists(max_pages=max_pages, category=categories[0], order=order)
+        else:
+            playlists_data = self.spider.crawl_categories(categories, max_pages, order, max_workers)
+        crawl_seconds = time.time() - start_time
+        
+        saved = self.db.insert_playlists_batch(playlists_data) if playlists_data else 0
+        
+        return {
+            'categories': len(categories),
+            'crawled': len(playlists_data),
+            'saved': saved,
+            'total_play_count': sum(p.get('play_count', 0) for p in playlists_data),
+            'total_subscribed_count': sum(p.get('subscribed_count', 0) for p in playlists_data),
+            'crawl_seconds': round(crawl_seconds, 3),
+            'elapsed_seconds': round(time.time() - start_time, 3),
+        }
+    
+    def do_crawl_songs(self, playlist_ids: List[int], max_songs_per_playlist: Optional[int] = None,
+                       max_workers: int = 1, by_track_ids: bool = False) -> Dict[str, Any]:
+        """
+        爬取歌单内的歌曲并保存到数据库
+        :param playlist_ids: 歌单ID列表
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数
+        :param max_workers: 并发线程数
+        :param by_track_ids: 先取曲目ID，只为数据库中没有的歌曲批量请求详情
+        :return: 执行摘要
+        """
+        self._ensure_spider()
+        
+        start_time = time.time()
+        if by_track_ids:
+            batch_songs = self.spider.crawl_playlist_songs_by_track_ids(
+                playlist_ids, max_songs_per_playlist, max_workers, known_songs=self.db.get_song_metadata
+            )
+        else:
+            batch_songs = self.spider.crawl_playlist_songs_batch(playlist_ids, max_songs_per_playlist, max_workers)
+        crawl_seconds = time.time() - start_time
+        
+        return self._save_batch_songs(batch_songs, len(playlist_ids), start_time, crawl_seconds)
+    
+    def do_crawl_songs_by_priority(self, max_songs_per_playlist: Optional[int] = None,
+                                   time_budget: Optional[float] = None,
+                                   request_budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        按优先级（播放量、收藏数、陈旧度）爬取数据库中歌单的歌曲并保存
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数
+        :param time_budget: 时间预算（秒）
+        :param request_budget: 请求预算（歌单数）
+        :return: 执行摘要
+        """
+        self._ensure_spider()
+        
+        start_time = time.time()
+        playlists = self.db.get_playlists_for_song_crawl()
+        batch_songs = self.spider.crawl_playlist_songs_by_priority(
+            playlists, max_songs_per_playlist, time_budget, request_budget
+        )
+        crawl_seconds = time.time() - start_time
+        
+        summary = self._save_batch_songs(batch_songs, len(batch_songs), start_time, crawl_seconds)
+        summary['skipped_playlists'] = len(playlists) - len(batch_songs)
+        return summary
+    
+    def do_crawl_songs_incremental(self, max_songs_per_playlist: Optional[int] = None) -> Dict[str, Any]:
+        """
+        增量爬取数据库中歌单的歌曲，只重新写入曲目有变化的歌单
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数
+        :return: 执行摘要
+        """
+        self._ensure_spider()
+        
+        start_time = time.time()
+        playlists = self.db.get_playlists_for_song_crawl()
+        results = self.spider.crawl_playlist_songs_incremental(playlists, max_songs_per_playlist)
+        crawl_seconds = time.time() - start_time
+        
+        total_saved = 0
+        counts = {'updated': 0, 'unchanged': 0, 'skipped': 0, 'failed': 0}
+        for playlist_id, entry in results.items():
+            counts[entry['status']] += 1
+            if entry['status'] == 'updated':
+                total_saved += self.db.replace_playlist_songs(
+                    playlist_id, entry['songs'], entry['track_update_time'], entry['track_ids_hash']
+                )
+            elif entry['status'] == 'unchanged':
+                self.db.update_playlist_track_marker(
+                    playlist_id, entry['track_update_time'], entry['track_ids_hash']
+                )
+        
+        return {
+            'playlists': len(playlists),
+            **counts,
+            'crawled': sum(len(entry['songs']) for entry in results.values()),
+            'saved': total_saved,
+            'crawl_seconds': round(crawl_seconds, 3),
+            'elapsed_seconds': round(time.time() - start_time, 3),
+        }
+    
+    def _save_batch_songs(self, batch_songs: Dict[str, List[Dict[str, Any]]], playlist_count: int,
+                          start_time: float, crawl_seconds: float) -> Dict[str, Any]:
+        """
+        保存批量爬取的歌曲并生成执行摘要
+        :param batch_songs: {playlist_id: [songs]} 字典
+        :param playlist_count: 爬取的歌单数
+        :param start_time: 开始时间
+        :param crawl_seconds: 爬取耗时
+        :return: 执行摘要
+        """
+        total_saved = 0
+        for playlist_id, songs_list in batch_songs.items():
+            if songs_list:
+                # 替换歌单原有歌曲，重复爬取不会产生重复记录
+                total_saved += self.db.replace_playlist_songs(playlist_id, songs_list)
+        
+        return {
+            'playlists': playlist_count,
+            'crawled': sum(len(songs) for songs in batch_songs.values()),
+            'saved': total_saved,
+            'crawl_seconds': round(crawl_seconds, 3),
+            'elapsed_seconds': round(time.time() - start_time, 3),
+        }
+    
+    def do_crawl_comments(self, song_ids: Optional[List[int]] = None, limit: Optional[int] = None,
+                          max_comments_per_song: Optional[int] = None, max_workers: Optional[int] = None,
+                          incremental: bool = False) -> Dict[str, Any]:
+        """
+        爬取歌曲评论并批量写入数据库（边爬边写，按 comment_id 去重）
+        :param song_ids: 歌曲ID列表（None表示数据库中的歌曲，热门优先）
+        :param limit: 不指定歌曲时最多爬取的歌曲数
+        :param max_comments_per_song: 每首歌最多获取的评论数（None使用配置）
+        :param max_workers: 并发线程数（None使用配置）
+        :param incremental: 只获取比已入库评论更新的评论
+        :return: 执行摘要
+        """
+        self._ensure_spider()
+        
+        start_time = time.time()
+        if not song_ids:
+            song_ids = self.db.get_songs_for_comment_crawl(limit)
+        since = self.db.get_latest_comment_times(song_ids) if incremental else None
+        
+        batch_size = SPIDER_CONFIG.get('comment_insert_batch', 2000)
+        pending = []
+        saved = 0
+        
+        def save(song_id, comments):
+            nonlocal saved
+            pending.extend(comments)
+            if len(pending) >= batch_size:
+                saved += self.db.insert_comments(pending)
+                pending.clear()
+        
+        counts = self.spider.crawl_song_comments(song_ids, save, max_comments_per_song, max_workers, since)
+        saved += self.db.insert_comments(pending)
+        
+        return {
+            'songs': len(song_ids),
+            'songs_with_comments': sum(1 for n in counts.values() if n),
+            'crawled': sum(counts.values()),
+            'saved': saved,
+            'elapsed_seconds': round(time.time() - start_time, 3),
+        }
+    
+    def do_search(self, query: str, kinds: Optional[List[str]] = None, limit: int = 20,
+                  rebuild: bool = False) -> Dict[str, Any]:
+        """
+        全文检索歌单、歌曲和评论
+        :param query: 搜索词
+        :param kinds: 搜索的类型（None表示全部）
+        :param limit: 每种类型返回的结果数
+        :param rebuild: 搜索前按当前数据重建索引
+        :return: 执行摘要（含搜索结果）
+        """
+        start_time = time.time()
+        if rebuild:
+            self.db.rebuild_search_index()
+        
+        search_start = time.time()
+        results = self.db.search(query, kinds, limit)
+        return {
+            'query': query,
+            'matches': {kind: len(rows) for kind, rows in results.items()},
+            'search_ms': round((time.time() - search_start) * 1000, 2),
+            'elapsed_seconds': round(time.time() - start_time, 3),
+            'results': results,
+        }
+    
+    def do_replay_archive(self, archive_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        重放原始响应归档，重新解析并写入数据库（不访问网络）
+        :param archive_dir: 归档目录（None使用配置）
+        :return: 执行摘要
+        """
+        self._ensure_spider()
+        
+        start_time = time.time()
+        playlists_data, batch_songs, comments = self.spider.replay_archive(
+            archive_dir, known_songs=self.db.get_song_metadata
+        )
+        parse_seconds = time.time() - start_time
+        
+        saved_playlists = self.db.insert_playlists_batch(playlists_data) if playlists_data else 0
+        summary = self._save_batch_songs(batch_songs, len(batch_songs), start_time, parse_seconds)
+        
+        batch_size = SPIDER_CONFIG.get('comment_insert_batch', 2000)
+        saved_comments = sum(
+            self.db.insert_comments(comments[i:i + batch_size]) for i in range(0, len(comments), batch_size)
+        )
+        
+        return {
+            'playlists': len(playlists_data),
+            'saved_playlists': saved_playlists,
+            'song_playlists': summary['playlists'],
+            'songs': summary['crawled'],
+            'saved_songs': summary['saved'],
+            'comments': len(comments),
+            'saved_comments': saved_comments,
+            'parse_seconds': summary['crawl_seconds'],
+            'elapsed_seconds': round(time.time() - start_time, 3),
+        }
+    
+    def do_generate_report(self, output_path: Optional[str] = None,
+                           profile_memory: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        生成可视化报告
+        :param output_path: 报告路径（None使用默认路径）
+        :param profile_memory: 是否统计每个图表的峰值内存增量（None使用配置）
+        :return: 执行摘要
+        """
+        from visualization.modern_report_generator import ModernReportGenerator
+        
+        start_time = time.time()
+        generator = ModernReportGenerator(self.db)
+        report_path = generator.generate_report(output_path, profile_memory)
+        
+        exists = bool(report_path) and os.path.exists(report_path)
+        slowest = max(generator.profiler.charts, key=lambda c: c['total_ms'], default=None)
+        return {
+            'report_path': report_path if exists else '',
+            'size_bytes': os.path.getsize(report_path) if exists else 0,
+            'slowest_chart': slowest['name'] if slowest else None,
+            'slowest_chart_ms': slowest['total_ms'] if slowest else 0,
+            'elapsed_seconds': round(time.time() - start_time, 3),
+        }
+    
+    def do_export_csv(self, csv_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        导出歌单数据为CSV
+        :param csv_path: CSV路径（None使用配置中的路径）
+        :return: 执行摘要
+        """
+        import csv
+        from config.settings import OUTPUT_CONFIG
+        
+        start_time = time.time()
+        playlists = self.db.get_all_playlists()
+        
+        if not playlists:
+            return {'path': '', 'rows': 0, 'elapsed_seconds': round(time.time() - start_time, 3)}
+        
+        if csv_path is None:
+            csv_path = OUTPUT_CONFIG.get('csv_export_path', 'output/playlists_data.csv')
+        csv_dir = os.path.dirname(csv_path)
+        if csv_dir and not os.path.exists(csv_dir):
+            os.makedirs(csv_dir)
+        
+        logger.info(f"正在导出 {len(playlists)} 个歌单数据...")
+        
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+            fieldnames = ['rank', 'playlist_id', 'playlist_name', 'creator_name', 
+                         'play_count', 'subscribed_count', 'track_count', 
+                         'tags', 'create_time', 'description']
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            
+            writer.writeheader()
+            for playlist in playlists:
+                writer.writerow({
+                    'rank': playlist.get('rank', ''),
+                    'playlist_id': playlist.get('playlist_id', ''),
+                    'playlist_name': playlist.get('playlist_name', ''),
+                    'creator_name': playlist.get('creator_name', ''),
+                    'play_count': playlist.get('play_count', 0),
+                    'subscribed_count': playlist.get('subscribed_count', 0),
+                    'track_count': playlist.get('track_count', 0),
+                    'tags': playlist.get('tags', ''),
+                    'create_time': playlist.get('create_time', ''),
+                    'description': playlist.get('description', '')[:200]  # 限制描述长度
+                })
+    
+        return {
+            'path': csv_path,
+            'rows': len(playlists),
+            'elapsed_seconds': round(time.time() - start_time, 3),
+        }
+    
     def clear_database(self):
         """清空数据库"""
         print("\n【清空数据库】")
@@ -590,8 +858,7 @@ class MusicAnalysisApp:
     def cleanup(self):
         """清理资源"""
         try:
-            if self.spider:
-                self.spider.close()
+            self._close_spider()
             if self.db:
                 self.db.close()
             logger.info("资源清理完成")
@@ -599,15 +866,194 @@ class MusicAnalysisApp:
             logger.error(f"清理资源失败: {e}")
 
 
+def build_arg_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器（不带子命令时进入交互式菜单）"""
+    parser = argparse.ArgumentParser(
+        description='网易云音乐热门歌单数据分析系统（不带子命令时进入交互式菜单）'
+    )
+    parser.add_argument('--http-cache', action='store_true',
+                        help='启用HTTP响应磁盘缓存（重复爬取时直接读取未过期的本地响应）')
+    parser.add_argument('--archive', action='store_true',
+                        help='归档接口返回的原始响应（可用 replay 命令离线重新解析）')
+    parser.add_argument('--profile-queries', action='store_true',
+                        help='统计每条SQL的耗时，退出时输出排名报告和查询计划')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    crawl_playlists = subparsers.add_parser('crawl-playlists', help='爬取热门歌单')
+    crawl_playlists.add_argument('--pages', type=int, default=SPIDER_CONFIG['max_playlist_pages'],
+                                 help='爬取页数（每页50个歌单）')
+    crawl_playlists.add_argument('--category', action='append', default=None,
+                                 help='歌单分类（可重复，多个分类并发爬取）')
+    crawl_playlists.add_argument('--all-categories', action='store_true',
+                                 help='爬取全部分类')
+    crawl_playlists.add_argument('--workers', type=int, default=None,
+                                 help='多分类并发线程数')
+    crawl_playlists.add_argument('--order', default=SPIDER_CONFIG['default_playlist_order'],
+                                 choices=['hot', 'new'], help='排序方式')
+    
+    crawl_songs = subparsers.add_parser('crawl-songs', help='爬取歌单内的歌曲')
+    crawl_songs.add_argument('--limit', type=int, default=None,
+                             help='只爬取播放量TOP N的歌单（默认全部）')
+    crawl_songs.add_argument('--playlist-id', type=int, action='append', default=None,
+                             help='指定歌单ID（可重复）')
+    crawl_songs.add_argument('--max-songs', type=int, default=None,
+                             help='每个歌单最多爬取的歌曲数')
+    crawl_songs.add_argument('--workers', type=int, default=1, help='并发线程数')
+    crawl_songs.add_argument('--track-ids', action='store_true',
+                             help='先取曲目ID，只为数据库中没有的歌曲批量请求详情')
+    crawl_songs.add_argument('--priority', action='store_true',
+                             help='按播放量、收藏数和陈旧度的优先级顺序爬取')
+    crawl_songs.add_argument('--incremental', action='store_true',
+                             help='增量爬取，跳过曲目未变化的歌单')
+    crawl_songs.add_argument('--time-budget', type=float, default=None,
+                             help='优先级模式的时间预算（秒）')
+    crawl_songs.add_argument('--request-budget', type=int, default=None,
+                             help='优先级模式的请求预算（歌单数）')
+    
+    crawl_comments = subparsers.add_parser('crawl-comments', help='爬取数据库中歌曲的评论')
+    crawl_comments.add_argument('--limit', type=int, default=None,
+                                help='只爬取出现在最多歌单中的前N首歌曲（默认全部）')
+    crawl_comments.add_argument('--song-id', type=int, action='append', default=None,
+                                help='指定歌曲ID（可重复）')
+    crawl_comments.add_argument('--max-comments', type=int, default=None,
+                                help='每首歌最多获取的评论数（0表示不限制）')
+    crawl_comments.add_argument('--workers', type=int, default=None, help='并发线程数')
+    crawl_comments.add_argument('--incremental', action='store_true',
+                                help='增量爬取，只获取比已入库评论更新的评论')
+    
+    search = subparsers.add_parser('search', help='全文检索歌单、歌曲和评论')
+    search.add_argument('query', help='搜索词')
+    search.add_argument('--type', dest='kinds', action='append', choices=['playlists', 'songs', 'comments'],
+                        default=None, help='搜索的类型（可重复，默认全部）')
+    search.add_argument('--limit', type=int, default=20, help='每种类型返回的结果数')
+    search.add_argument('--rebuild-index', action='store_true', help='搜索前按当前数据重建索引')
+    
+    replay = subparsers.add_parser('replay', help='重放原始响应归档，重新解析入库（不访问网络）')
+    replay.add_argument('--archive-dir', default=None, help='归档目录（默认使用配置）')
+    
+    report = subparsers.add_parser('report', help='生成可视化报告')
+    report.add_argument('--output', default=None, help='报告输出路径')
+    report.add_argument('--profile-memory', action='store_true',
+                        help='用tracemalloc统计每个图表的峰值内存增量（写入报告旁的 .profile.json）')
+    
+    export = subparsers.add_parser('export', help='导出歌单数据为CSV')
+    export.add_argument('--output', default=None, help='CSV输出路径')
+    
+    subparsers.add_parser('stats', help='输出数据库统计')
+    
+    return parser
+
+
+def run_command(app: MusicAnalysisApp, args: argparse.Namespace) -> int:
+    """
+    执行命令行子命令，结果以一行JSON输出到标准输出（日志输出到标准错误）
+    :param app: 应用实例
+    :param args: 命令行参数
+    :return: 退出码
+    """
+    start_time = time.time()
+    
+    if args.command == 'crawl-playlists':
+        if args.all_categories:
+            categories = None
+        else:
+            categories = args.category or [SPIDER_CONFIG['default_playlist_category']]
+        summary = app.do_crawl_playlists(args.pages, categories, args.order, args.workers)
+        ok = summary['crawled'] > 0
+    
+    elif args.command == 'crawl-songs' and args.incremental:
+        summary = app.do_crawl_songs_incremental(args.max_songs)
+        ok = summary['playlists'] > 0
+    
+    elif args.command == 'crawl-songs' and args.priority:
+        summary = app.do_crawl_songs_by_priority(args.max_songs, args.time_budget, args.request_budget)
+        ok = summary['playlists'] > 0
+    
+    elif args.command == 'crawl-songs':
+        if args.playlist_id:
+            playlist_ids = args.playlist_id
+        elif args.limit:
+            playlist_ids = [p['playlist_id'] for p in app.db.get_top_playlists(args.limit, 'play_count')]
+        else:
+            playlist_ids = [p['playlist_id'] for p in app.db.get_all_playlists()]
+        
+        summary = app.do_crawl_songs(playlist_ids, args.max_songs, args.workers, args.track_ids)
+        ok = summary['playlists'] > 0
+    
+    elif args.command == 'crawl-comments':
+        summary = app.do_crawl_comments(args.song_id, args.limit, args.max_comments, args.workers,
+                                        args.incremental)
+        ok = summary['songs'] > 0
+    
+    elif args.command == 'search':
+        summary = app.do_search(args.query, args.kinds, args.limit, args.rebuild_index)
+        ok = any(summary['matches'].values())
+    
+    elif args.command == 'replay':
+        summary = app.do_replay_archive(args.archive_dir)
+        ok = summary['playlists'] > 0 or summary['comments'] > 0
+    
+    elif args.command == 'report':
+        summary = app.do_generate_report(args.output, args.profile_memory or None)
+        ok = bool(summary['report_path'])
+    
+    elif args.command == 'export':
+        summary = app.do_export_csv(args.output)
+        ok = summary['rows'] > 0
+    
+    else:  # stats
+        summary = app.db.get_statistics()
+        ok = bool(summary)
+    
+    result = {
+        'command': args.command,
+        'ok': ok,
+        'total_seconds': round(time.time() - start_time, 3),
+    }
+    result.update(summary)
+    
+    # 发生过网络请求时附上爬虫指标汇总（各接口明细见导出的指标文件）
+    if app.spider and app.spider.metrics.summary()['requests']:
+        metrics = app.spider.metrics.summary()
+        metrics.pop('endpoints')
+        result['spider_metrics'] = metrics
+    
+    print(json.dumps(result, ensure_ascii=False, default=str))
+    
+    return 0 if ok else 1
+
+
 def main():
     """主函数"""
+    args = build_arg_parser().parse_args()
+    if args.profile_queries:
+        DATABASE_CONFIG['profile_queries'] = True
+    
     try:
         app = MusicAnalysisApp()
-        app.run()
     except Exception as e:
         logger.critical(f"程序启动失败: {e}")
         print(f"[X] 程序启动失败: {e}")
         sys.exit(1)
+    
+    if args.http_cache:
+        app.use_response_cache = True
+    if args.archive:
+        app.archive_responses = True
+    
+    if args.command is None:
+        app.run()
+        return
+    
+    try:
+        exit_code = run_command(app, args)
+    except Exception as e:
+        logger.error(f"命令 {args.command} 执行失败: {e}")
+        exit_code = 1
+    finally:
+        app.cleanup()
+    
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
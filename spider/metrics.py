@@ -0,0 +1,234 @@
+"""
+爬虫运行指标模块
+记录各接口的请求延迟直方图、传输字节数、请求速率、重试和错误次数以及各类等待耗时，
+可导出为JSON汇总和Prometheus文本格式
+"""
+import os
+import json
+import time
+import threading
+from typing import Dict, Any, Tuple
+from urllib.parse import urlsplit
+
+# 延迟直方图的桶上限(秒)，最后一个桶为 +Inf
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _EndpointStats:
+    """单个接口的统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.status = {}
+        self.retries = 0
+        self.errors = {}
+        self.cache_hits = 0
+
+    def observe(self, seconds: float):
+        self.latency_sum += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        for i, upper in enumerate(LATENCY_BUCKETS):
+            if seconds <= upper:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """按直方图估算分位数（返回所在桶的上限，落在 +Inf 桶时返回最大值）"""
+        count = sum(self.buckets)
+        if not count:
+            return 0.0
+        rank = q * count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.latency_max
+        return self.latency_max
+
+
+class SpiderMetrics:
+    """线程安全的爬虫指标收集器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._sleep = {}
+        self._start = time.time()
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        """URL对应的接口名（路径部分）"""
+        return urlsplit(url).path or '/'
+
+    def _stats(self, url: str) -> _EndpointStats:
+        name = self.endpoint(url)
+        stats = self._endpoints.get(name)
+        if stats is None:
+            stats = self._endpoints[name] = _EndpointStats()
+        return stats
+
+    def record_request(self, url: str, seconds: float, status_code: int, size: int):
+        """
+        记录一次网络请求
+        :param url: 请求URL
+        :param seconds: 请求耗时（含响应体下载）
+        :param status_code: 状态码
+        :param size: 响应体字节数
+        """
+        with self._lock:
+            stats = self._stats(url)
+            stats.requests += 1
+            stats.bytes += size
+            stats.status[status_code] = stats.status.get(status_code, 0) + 1
+            stats.observe(seconds)
+
+    def record_error(self, url: str, kind: str, seconds: float = None):
+        """
+        记录一次请求错误
+        :param url: 请求URL
+        :param kind: 错误类型（异常类名或 http_429、http_503 等）
+        :param seconds: 失败请求的耗时（请求异常时记录到延迟直方图）
+        """
+        with self._lock:
+            stats = self._stats(url)
+            stats.errors[kind] = stats.errors.get(kind, 0) + 1
+            if seconds is not None:
+                stats.requests += 1
+                stats.observe(seconds)
+
+    def record_retry(self, url: str):
+        """记录一次重试"""
+        with self._lock:
+            self._stats(url).retries += 1
+
+    def record_cache_hit(self, url: str):
+        """记录一次响应缓存命中"""
+        with self._lock:
+            self._stats(url).cache_hits += 1
+
+    def record_sleep(self, kind: str, seconds: float):
+        """
+        记录等待耗时
+        :param kind: 等待类型（rate_limit=速率限制, delay=随机延时, retry_backoff=重试退避）
+        :param seconds: 等待秒数
+        """
+        if seconds <= 0:
+            return
+        with self._lock:
+            count, total = self._sleep.get(kind, (0, 0.0))
+            self._sleep[kind] = (count + 1, total + seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        指标汇总
+        :return: 总体和各接口的请求数、字节数、速率、延迟分位数、重试、错误和等待耗时
+        """
+        with self._lock:
+            elapsed = time.time() - self._start
+            endpoints = {}
+            for name, stats in sorted(self._endpoints.items()):
+                endpoints[name] = {
+                    'requests': stats.requests,
+                    'bytes': stats.bytes,
+                    'cache_hits': stats.cache_hits,
+                    'retries': stats.retries,
+                    'errors': dict(stats.errors),
+                    'status': {str(code): n for code, n in sorted(stats.status.items())},
+                    'latency_avg': round(stats.latency_sum / stats.requests, 4) if stats.requests else 0,
+                    'latency_p50': stats.quantile(0.5),
+                    'latency_p95': stats.quantile(0.95),
+                    'latency_max': round(stats.latency_max, 4),
+                }
+            sleep = {kind: {'count': count, 'seconds': round(total, 3)} for kind, (count, total) in self._sleep.items()}
+
+        requests = sum(e['requests'] for e in endpoints.values())
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'requests': requests,
+            'requests_per_second': round(requests / elapsed, 3) if elapsed > 0 else 0,
+            'bytes': sum(e['bytes'] for e in endpoints.values()),
+            'cache_hits': sum(e['cache_hits'] for e in endpoints.values()),
+            'retries': sum(e['retries'] for e in endpoints.values()),
+            'errors': sum(sum(e['errors'].values()) for e in endpoints.values()),
+            'sleep': sleep,
+            'endpoints': endpoints,
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        导出为Prometheus文本格式
+        :return: 指标文本
+        """
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            sleep = sorted(self._sleep.items())
+
+            metric('music163_spider_request_duration_seconds', 'histogram', '接口请求耗时')
+            for name, stats in endpoints:
+                cumulative = 0
+                for upper, n in zip(LATENCY_BUCKETS + ('+Inf',), stats.buckets):
+                    cumulative += n
+                    lines.append(f'music163_spider_request_duration_seconds_bucket'
+                                 f'{{endpoint="{name}",le="{upper}"}} {cumulative}')
+                lines.append(f'music163_spider_request_duration_seconds_sum{{endpoint="{name}"}} {stats.latency_sum:.6f}')
+                lines.append(f'music163_spider_request_duration_seconds_count{{endpoint="{name}"}} {cumulative}')
+
+            metric('music163_spider_response_bytes_total', 'counter', '接收的响应体字节数')
+            for name, stats in endpoints:
+                lines.append(f'music163_spider_response_bytes_total{{endpoint="{name}"}} {stats.bytes}')
+
+            metric('music163_spider_responses_total', 'counter', '按状态码统计的响应数')
+            for name, stats in endpoints:
+                for code, n in sorted(stats.status.items()):
+                    lines.append(f'music163_spider_responses_total{{endpoint="{name}",code="{code}"}} {n}')
+
+            metric('music163_spider_retries_total', 'counter', '重试次数')
+            for name, stats in endpoints:
+                lines.append(f'music163_spider_retries_total{{endpoint="{name}"}} {stats.retries}')
+
+            metric('music163_spider_errors_total', 'counter', '按类型统计的请求错误数')
+            for name, stats in endpoints:
+                for kind, n in sorted(stats.errors.items()):
+                    lines.append(f'music163_spider_errors_total{{endpoint="{name}",kind="{kind}"}} {n}')
+
+            metric('music163_spider_cache_hits_total', 'counter', '响应缓存命中次数')
+            for name, stats in endpoints:
+                lines.append(f'music163_spider_cache_hits_total{{endpoint="{name}"}} {stats.cache_hits}')
+
+            metric('music163_spider_sleep_seconds_total', 'counter', '按类型统计的等待耗时')
+            for kind, (_, total) in sleep:
+                lines.append(f'music163_spider_sleep_seconds_total{{kind="{kind}"}} {total:.6f}')
+
+            metric('music163_spider_elapsed_seconds', 'gauge', '爬虫运行时长')
+            lines.append(f'music163_spider_elapsed_seconds {time.time() - self._start:.3f}')
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, output_dir: str, prefix: str = 'spider_metrics') -> Tuple[str, str]:
+        """
+        写出JSON汇总和Prometheus文本文件
+        :param output_dir: 输出目录
+        :param prefix: 文件名前缀
+        :return: (JSON文件路径, Prometheus文件路径)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, f"{prefix}.json")
+        prom_path = os.path.join(output_dir, f"{prefix}.prom")
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        with open(prom_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+        return json_path, prom_path
@@ -5,11 +5,20 @@
 """
 import time
 import random
+import json
+import hashlib
 import requests
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from urllib.parse import urlsplit
 
-from config.settings import SPIDER_CONFIG
+from config.settings import SPIDER_CONFIG, API_CONFIG, OUTPUT_CONFIG
 from utils.logger import get_logger
+from .rate_limiter import RateLimiter
+from .priority_queue import PlaylistPriorityQueue
+from .response_cache import ResponseCache
+from .metrics import SpiderMetrics
+from .response_archive import ResponseArchive, iter_archive_records
 
 logger = get_logger()
 
@@ -17,10 +26,40 @@ logger = get_logger()
 class MusicSpider:
     """网易云音乐爬虫类 - 热门歌单数据采集"""
     
-    def __init__(self):
-        """初始化爬虫"""
+    def __init__(self, use_response_cache: Optional[bool] = None, archive_responses: Optional[bool] = None,
+                 base_url: Optional[str] = None):
+        """
+        初始化爬虫
+        :param use_response_cache: 是否启用HTTP响应磁盘缓存（None使用配置）
+        :param archive_responses: 是否归档原始响应（None使用配置）
+        :param base_url: 接口地址（None使用配置，可指向本地模拟服务）
+        """
+        self.base_url = (base_url if base_url else API_CONFIG['base_url']).rstrip('/')
         self.session = requests.Session()
         self._setup_session()
+        # 所有线程共享的请求速率预算
+        self.rate_limiter = RateLimiter(SPIDER_CONFIG.get('max_requests_per_second', 0))
+        # 请求延迟、字节数、重试、错误和等待耗时等运行指标
+        self.metrics = SpiderMetrics()
+        
+        if use_response_cache is None:
+            use_response_cache = SPIDER_CONFIG.get('response_cache_enabled', False)
+        self.response_cache = None
+        if use_response_cache:
+            self.response_cache = ResponseCache(
+                SPIDER_CONFIG['response_cache_dir'],
+                SPIDER_CONFIG['response_cache_ttls'],
+                int(SPIDER_CONFIG['response_cache_max_mb'] * 1024 * 1024)
+            )
+        
+        if archive_responses is None:
+            archive_responses = SPIDER_CONFIG.get('response_archive_enabled', False)
+        self.response_archive = None
+        if archive_responses:
+            self.response_archive = ResponseArchive(
+                SPIDER_CONFIG['response_archive_dir'],
+                int(SPIDER_CONFIG['response_archive_segment_mb'] * 1024 * 1024)
+            )
         logger.info("热门歌单爬虫初始化成功")
     
     def _setup_session(self):
@@ -41,20 +80,93 @@ class MusicSpider:
     
     def _random_delay(self):
         """随机延时"""
-        time.sleep(random.uniform(SPIDER_CONFIG['min_delay'], SPIDER_CONFIG['max_delay']))
+        delay = random.uniform(SPIDER_CONFIG['min_delay'], SPIDER_CONFIG['max_delay'])
+        time.sleep(delay)
+        self.metrics.record_sleep('delay', delay)
+    
+    def _get(self, url: str, params: Dict[str, Any] = None, timeout: int = 10) -> requests.Response:
+        """
+        发送GET请求（受共享速率限制；启用响应缓存时优先读取未过期的本地响应，
+        启用响应归档时把原始响应（包括缓存命中的响应）追加到归档）
+        :param url: 请求URL
+        :param params: 查询参数
+        :param timeout: 超时时间(秒)
+        :return: 响应对象
+        """
+        if self.response_cache:
+            cached = self.response_cache.get(url, params)
+            if cached is not None:
+                self.metrics.record_cache_hit(url)
+                response = requests.Response()
+                response.status_code, response._content, response.encoding = cached
+                response.url = url
+                if self.response_archive and response.status_code == 200:
+                    self.response_archive.record(url, params, response.text)
+                return response
+        
+        response = self._get_with_retry(url, params, timeout)
+        
+        if self.response_cache:
+            self.response_cache.put(url, params, response.status_code, response.content, response.encoding)
+        if self.response_archive and response.status_code == 200:
+            self.response_archive.record(url, params, response.text)
+        return response
+    
+    def _get_with_retry(self, url: str, params: Dict[str, Any], timeout: int) -> requests.Response:
+        """
+        发送请求，遇到请求异常、429或5xx时按配置重试
+        :return: 最后一次请求的响应对象（重试用尽仍异常时抛出）
+        """
+        max_retries = API_CONFIG.get('max_retries', 0)
+        
+        for attempt in range(max_retries + 1):
+            self.metrics.record_sleep('rate_limit', self.rate_limiter.acquire())
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except requests.RequestException as e:
+                self.metrics.record_error(url, type(e).__name__, time.perf_counter() - start)
+                if attempt >= max_retries:
+                    raise
+                logger.warning(f"请求异常，第 {attempt + 1} 次重试: {e}")
+            else:
+                self.metrics.record_request(url, time.perf_counter() - start, response.status_code,
+                                            len(response.content))
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if retryable:
+                    self.metrics.record_error(url, f"http_{response.status_code}")
+                if not retryable or attempt >= max_retries:
+                    return response
+                logger.warning(f"请求返回 {response.status_code}，第 {attempt + 1} 次重试: {url}")
+            
+            self.metrics.record_retry(url)
+            backoff = API_CONFIG.get('retry_delay', 0) * (attempt + 1)
+            time.sleep(backoff)
+            self.metrics.record_sleep('retry_backoff', backoff)
     
-    def crawl_hot_playlists(self, max_pages: int = 20, category: str = '全部', order: str = 'hot') -> List[Dict[str, Any]]:
+    def _api_url(self, path: str) -> str:
+        """
+        拼接接口完整地址
+        :param path: 接口路径（如 /api/playlist/list）
+        :return: 完整URL
+        """
+        return f"{self.base_url}{path}"
+    
+    def crawl_hot_playlists(self, max_pages: int = 20, category: str = '全部', order: str = 'hot',
+                            page_delay: bool = True) -> List[Dict[str, Any]]:
         """
         爬取热门歌单（支持分页）
         :param max_pages: 最大页数（每页50个歌单）
         :param category: 歌单分类
         :param order: 排序方式（hot=最热、new=最新）
+        :param page_delay: 每页之后是否随机延时（并发调度时由共享速率限制控制节奏）
         :return: 歌单数据列表
         """
         playlists_data = []
         
         try:
             logger.info(f"开始爬取热门歌单，目标页数: {max_pages}，分类: {category}，排序: {order}")
+            progress = logger.sampler(f"解析歌单[{category}]")
             
             # 网易云音乐热门歌单API
             # 每页50个歌单，offset = (page - 1) * 50
@@ -64,7 +176,7 @@ class MusicSpider:
                 
                 try:
                     # 使用网易云音乐的歌单广场API
-                    url = 'https://music.163.com/api/playlist/list'
+                    url = self._api_url('/api/playlist/list')
                     params = {
                         'cat': category,  # 分类
                         'order': order,  # 排序方式
@@ -73,7 +185,7 @@ class MusicSpider:
                         'total': 'true'  # 返回总数
                     }
                     
-                    response = self.session.get(url, params=params, timeout=15)
+                    response = self._get(url, params=params, timeout=15)
                     
                     if response.status_code == 200:
                         data = response.json()
@@ -92,22 +204,24 @@ class MusicSpider:
                                 try:
                                     playlist_data = self._parse_playlist_data(playlist_info, offset + idx)
                                     if playlist_data:
+                                        playlist_data['categories'] = [category]
                                         playlists_data.append(playlist_data)
                                         
-                                        # 打印简要信息
-                                        logger.info(
-                                            f"  [{offset + idx}] {playlist_data['playlist_name'][:30]} | "
-                                            f"播放:{playlist_data['play_count']:,} | "
-                                            f"收藏:{playlist_data['subscribed_count']:,} | "
-                                            f"歌曲:{playlist_data['track_count']}"
+                                        # 逐条信息只在DEBUG级别输出，INFO级别按条数/时间汇总进度
+                                        logger.debug(
+                                            "  [%d] %.30s | 播放:%d | 收藏:%d | 歌曲:%d",
+                                            offset + idx, playlist_data['playlist_name'],
+                                            playlist_data['play_count'], playlist_data['subscribed_count'],
+                                            playlist_data['track_count']
                                         )
+                                        progress.tick()
                                         
                                 except Exception as e:
                                     logger.error(f"解析歌单 {idx} 失败: {e}")
                                     continue
                             
                             # 每页之后延时
-                            if page < max_pages:
+                            if page_delay and page < max_pages:
                                 self._random_delay()
                         else:
                             logger.warning(f"第 {page} 页API返回错误: {data.get('msg', 'Unknown error')}")
@@ -120,6 +234,7 @@ class MusicSpider:
                     logger.error(f"爬取第 {page} 页失败: {e}")
                     continue
             
+            progress.done()
             logger.info(f"热门歌单爬取完成，共 {len(playlists_data)} 个歌单")
             
         except Exception as e:
@@ -137,12 +252,12 @@ class MusicSpider:
         try:
             playlist_data = {
                 'rank': rank,
-                'playlist_id': str(playlist_info.get('id', '')),
+                'playlist_id': int(playlist_info.get('id', 0)),
                 'playlist_name': playlist_info.get('name', ''),
                 'description': playlist_info.get('description', ''),
                 'cover_url': playlist_info.get('coverImgUrl', ''),
                 'creator_name': playlist_info.get('creator', {}).get('nickname', ''),
-                'creator_id': str(playlist_info.get('creator', {}).get('userId', '')),
+                'creator_id': int(playlist_info.get('creator', {}).get('userId', 0)),
                 'play_count': playlist_info.get('playCount', 0),
                 'subscribed_count': playlist_info.get('subscribedCount', 0),
                 'track_count': playlist_info.get('trackCount', 0),
@@ -167,12 +282,63 @@ class MusicSpider:
             # 更新频率
             playlist_data['update_frequency'] = playlist_info.get('updateFrequency', '')
             
+            # 歌单/曲目更新时间（毫秒，用于增量爬取判断）
+            playlist_data['update_time'] = playlist_info.get('updateTime') or 0
+            playlist_data['track_update_time'] = playlist_info.get('trackUpdateTime') or 0
+            
             return playlist_data
             
         except Exception as e:
             logger.error(f"解析歌单数据失败: {e}")
             return None
     
+    def crawl_categories(self, categories: List[str] = None, max_pages: int = 1, order: str = 'hot',
+                         max_workers: int = None) -> List[Dict[str, Any]]:
+        """
+        并发爬取多个分类的热门歌单
+        各分类共享同一个请求速率预算；同一歌单出现在多个分类时只保留一份，
+        并在 categories 字段中记录它出现过的所有分类
+        :param categories: 分类列表（None表示全部分类）
+        :param max_pages: 每个分类的最大页数
+        :param order: 排序方式（hot=最热、new=最新）
+        :param max_workers: 并发线程数（None使用配置）
+        :return: 去重后的歌单数据列表
+        """
+        categories = categories if categories else self.get_hot_playlist_categories()
+        max_workers = max_workers if max_workers else SPIDER_CONFIG.get('category_workers', 4)
+        
+        logger.info(f"开始并发爬取 {len(categories)} 个分类，每个分类 {max_pages} 页 (并发: {max_workers})")
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.crawl_hot_playlists, max_pages, category, order, False): category
+                for category in categories
+            }
+            for future in as_completed(futures):
+                category = futures[future]
+                try:
+                    results[category] = future.result()
+                    logger.info(f"分类 {category} 完成，获取 {len(results[category])} 个歌单")
+                except Exception as e:
+                    logger.error(f"爬取分类 {category} 失败: {e}")
+                    results[category] = []
+        
+        # 按分类顺序合并，按 playlist_id 去重
+        merged = {}
+        total = 0
+        for category in categories:
+            for playlist_data in results.get(category, []):
+                total += 1
+                existing = merged.get(playlist_data['playlist_id'])
+                if existing is None:
+                    merged[playlist_data['playlist_id']] = playlist_data
+                elif category not in existing['categories']:
+                    existing['categories'].append(category)
+        
+        logger.info(f"多分类爬取完成: 共 {total} 条，去重后 {len(merged)} 个歌单")
+        return list(merged.values())
+    
     def get_hot_playlist_categories(self) -> List[str]:
         """
         获取热门歌单分类列表
@@ -188,16 +354,16 @@ class MusicSpider:
         ]
         return categories
     
-    def get_playlist_detail(self, playlist_id: str) -> Optional[Dict[str, Any]]:
+    def get_playlist_detail(self, playlist_id: int) -> Optional[Dict[str, Any]]:
         """
         获取指定歌单的详细信息
         :param playlist_id: 歌单ID
         :return: 歌单详细信息
         """
         try:
-            url = f'https://music.163.com/api/playlist/detail?id={playlist_id}'
+            url = self._api_url(f'/api/playlist/detail?id={playlist_id}')
             
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -206,12 +372,12 @@ class MusicSpider:
                     playlist = data['result']
                     
                     playlist_data = {
-                        'playlist_id': str(playlist.get('id', '')),
+                        'playlist_id': int(playlist.get('id', 0)),
                         'playlist_name': playlist.get('name', ''),
                         'description': playlist.get('description', ''),
                         'cover_url': playlist.get('coverImgUrl', ''),
                         'creator_name': playlist.get('creator', {}).get('nickname', ''),
-                        'creator_id': str(playlist.get('creator', {}).get('userId', '')),
+                        'creator_id': int(playlist.get('creator', {}).get('userId', 0)),
                         'play_count': playlist.get('playCount', 0),
                         'subscribed_count': playlist.get('subscribedCount', 0),
                         'track_count': playlist.get('trackCount', 0),
@@ -234,6 +400,8 @@ class MusicSpider:
                         playlist_data['create_time'] = ''
                     
                     playlist_data['update_frequency'] = playlist.get('updateFrequency', '')
+                    playlist_data['update_time'] = playlist.get('updateTime') or 0
+                    playlist_data['track_update_time'] = playlist.get('trackUpdateTime') or 0
                     
                     logger.info(f"获取歌单详情成功: {playlist_data['playlist_name']}")
                     return playlist_data
@@ -243,39 +411,132 @@ class MusicSpider:
         
         return None
     
-    def get_playlist_songs(self, playlist_id: str) -> List[Dict[str, Any]]:
+    def _fetch_playlist_result(self, playlist_id: int) -> Optional[Dict[str, Any]]:
+        """
+        请求歌单详情接口
+        :param playlist_id: 歌单ID
+        :return: 接口返回的 result 部分，失败返回None
+        """
+        url = self._api_url(f'/api/playlist/detail?id={playlist_id}')
+        
+        response = self._get(url, timeout=10)
+        
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('code') == 200 and 'result' in data:
+                return data['result']
+        
+        return None
+    
+    def _parse_playlist_tracks(self, playlist: Dict, playlist_id: int) -> List[Dict[str, Any]]:
+        """
+        解析歌单详情中的歌曲列表
+        :param playlist: 歌单详情（接口 result 部分）
+        :param playlist_id: 歌单ID
+        :return: 歌曲列表
+        """
+        songs_data = []
+        for idx, track in enumerate(playlist.get('tracks', []), 1):
+            song_data = self._parse_song_data(track, playlist_id, idx)
+            if song_data:
+                songs_data.append(song_data)
+        return songs_data
+    
+    @staticmethod
+    def _track_ids_hash(playlist: Dict, limit: int = None) -> str:
+        """
+        计算歌单曲目ID列表的哈希（顺序敏感）
+        优先使用 trackIds，缺失时退回 tracks 中的歌曲ID
+        :param playlist: 歌单详情（接口 result 部分）
+        :param limit: 只计算前N个曲目（与按上限截断写入的歌曲一致，None表示全部）
+        :return: sha1 十六进制字符串
+        """
+        track_ids = (playlist.get('trackIds') or playlist.get('tracks', []))[:limit]
+        joined = ','.join(str(track.get('id', '')) for track in track_ids)
+        return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+    
+    def get_playlist_songs(self, playlist_id: int) -> List[Dict[str, Any]]:
         """
         获取歌单中的所有歌曲
         :param playlist_id: 歌单ID
         :return: 歌曲列表
         """
         try:
-            url = f'https://music.163.com/api/playlist/detail?id={playlist_id}'
+            playlist = self._fetch_playlist_result(playlist_id)
             
-            response = self.session.get(url, timeout=10)
+            if playlist is not None:
+                songs_data = self._parse_playlist_tracks(playlist, playlist_id)
+                logger.debug("获取歌单 %s 的 %d 首歌曲", playlist_id, len(songs_data))
+                return songs_data
+            
+        except Exception as e:
+            logger.error(f"获取歌单歌曲失败: {e}")
+        
+        return []
+    
+    def get_playlist_track_ids(self, playlist_id: int) -> List[int]:
+        """
+        只获取歌单的曲目ID列表（不返回歌曲详情，响应体远小于完整详情）
+        :param playlist_id: 歌单ID
+        :return: 歌曲ID列表（按歌单顺序）
+        """
+        try:
+            url = self._api_url('/api/v6/playlist/detail')
+            
+            response = self._get(url, params={'id': playlist_id, 'n': 0}, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 
-                if data.get('code') == 200 and 'result' in data:
-                    playlist = data['result']
-                    tracks = playlist.get('tracks', [])
-                    
-                    songs_data = []
-                    for idx, track in enumerate(tracks, 1):
-                        song_data = self._parse_song_data(track, playlist_id, idx)
-                        if song_data:
-                            songs_data.append(song_data)
-                    
-                    logger.info(f"获取歌单 {playlist_id} 的 {len(songs_data)} 首歌曲")
-                    return songs_data
+                if data.get('code') == 200 and 'playlist' in data:
+                    track_ids = [int(track.get('id', 0)) for track in data['playlist'].get('trackIds', [])]
+                    logger.debug("获取歌单 %s 的 %d 个曲目ID", playlist_id, len(track_ids))
+                    return track_ids
             
         except Exception as e:
-            logger.error(f"获取歌单歌曲失败: {e}")
+            logger.error(f"获取歌单曲目ID失败: {e}")
         
         return []
     
-    def _parse_song_data(self, track: Dict, playlist_id: str, position: int) -> Optional[Dict[str, Any]]:
+    def get_song_details(self, song_ids: List[int], batch_size: int = None) -> Dict[int, Dict[str, Any]]:
+        """
+        批量获取歌曲详情
+        :param song_ids: 歌曲ID列表
+        :param batch_size: 每次请求的歌曲数（None使用配置）
+        :return: {song_id: 歌曲数据} 字典（不含歌单相关字段）
+        """
+        batch_size = batch_size if batch_size else SPIDER_CONFIG.get('song_detail_batch_size', 200)
+        details = {}
+        
+        for start in range(0, len(song_ids), batch_size):
+            batch = song_ids[start:start + batch_size]
+            if start:
+                self._random_delay()
+            
+            try:
+                url = self._api_url('/api/song/detail/')
+                ids = '[' + ','.join(str(song_id) for song_id in batch) + ']'
+                
+                response = self._get(url, params={'ids': ids}, timeout=10)
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    
+                    if data.get('code') == 200:
+                        for track in data.get('songs', []):
+                            song_data = self._parse_song_data(track, None, 0)
+                            if song_data:
+                                song_data.pop('playlist_id')
+                                song_data.pop('position')
+                                details[song_data['song_id']] = song_data
+                
+            except Exception as e:
+                logger.error(f"批量获取歌曲详情失败: {e}")
+        
+        logger.info(f"批量获取歌曲详情: {len(details)}/{len(song_ids)} 首")
+        return details
+    
+    def _parse_song_data(self, track: Dict, playlist_id: int, position: int) -> Optional[Dict[str, Any]]:
         """
         解析歌曲数据
         :param track: API返回的歌曲信息
@@ -285,7 +546,7 @@ class MusicSpider:
         """
         try:
             song_data = {
-                'song_id': str(track.get('id', '')),
+                'song_id': int(track.get('id', 0)),
                 'song_name': track.get('name', ''),
                 'playlist_id': playlist_id,
                 'position': position,
@@ -293,20 +554,23 @@ class MusicSpider:
                 'popularity': track.get('popularity', 0),  # 热度值
             }
             
-            # 歌手信息
+            # 歌手信息（artist 为展示用的合并名称，artists 为完整歌手列表，写入歌手维度表）
             artists = track.get('artists', [])
             if artists:
                 artist_names = [artist.get('name', '') for artist in artists]
                 song_data['artist'] = ', '.join(artist_names)
-                song_data['artist_id'] = str(artists[0].get('id', '')) if artists else ''
+                song_data['artist_id'] = int(artists[0].get('id', 0))
             else:
                 song_data['artist'] = ''
-                song_data['artist_id'] = ''
+                song_data['artist_id'] = None
+            song_data['artists'] = [
+                {'artist_id': artist.get('id', 0), 'artist_name': artist.get('name', '')} for artist in artists
+            ]
             
             # 专辑信息
             album = track.get('album', {})
             song_data['album'] = album.get('name', '')
-            song_data['album_id'] = str(album.get('id', ''))
+            song_data['album_id'] = int(album['id']) if album.get('id') else None
             
             # 封面
             song_data['cover_url'] = album.get('picUrl', '')
@@ -335,38 +599,55 @@ class MusicSpider:
             logger.error(f"解析歌曲数据失败: {e}")
             return None
     
-    def crawl_playlist_songs_batch(self, playlist_ids: List[str], max_songs_per_playlist: int = None) -> Dict[str, List[Dict[str, Any]]]:
+    def _crawl_single_playlist_songs(self, playlist_id: int, max_songs_per_playlist: int = None) -> List[Dict[str, Any]]:
+        """
+        爬取单个歌单的歌曲（按上限截断）
+        :param playlist_id: 歌单ID
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数（None表示全部）
+        :return: 歌曲列表
+        """
+        songs = self.get_playlist_songs(playlist_id)
+        
+        if max_songs_per_playlist and len(songs) > max_songs_per_playlist:
+            songs = songs[:max_songs_per_playlist]
+        
+        return songs
+    
+    def crawl_playlist_songs_batch(self, playlist_ids: List[int], max_songs_per_playlist: int = None,
+                                   max_workers: int = 1) -> Dict[int, List[Dict[str, Any]]]:
         """
         批量爬取多个歌单的歌曲
         :param playlist_ids: 歌单ID列表
         :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数（None表示全部）
-        :return: {playlist_id: [songs]} 字典
+        :param max_workers: 并发线程数（1表示顺序爬取，每个线程请求后各自延时）
+        :return: {playlist_id: [songs]} 字典，顺序与 playlist_ids 一致
         """
         result = {}
         
         try:
-            logger.info(f"开始批量爬取 {len(playlist_ids)} 个歌单的歌曲")
+            logger.info(f"开始批量爬取 {len(playlist_ids)} 个歌单的歌曲 (并发: {max_workers})")
             
-            for i, playlist_id in enumerate(playlist_ids, 1):
-                try:
-                    logger.info(f"正在爬取第 {i}/{len(playlist_ids)} 个歌单的歌曲 (ID: {playlist_id})")
-                    
-                    songs = self.get_playlist_songs(playlist_id)
-                    
-                    if max_songs_per_playlist and len(songs) > max_songs_per_playlist:
-                        songs = songs[:max_songs_per_playlist]
-                    
-                    result[playlist_id] = songs
-                    logger.info(f"  获取到 {len(songs)} 首歌曲")
-                    
-                    # 延时避免请求过快
-                    if i < len(playlist_ids):
-                        self._random_delay()
+            if max_workers > 1:
+                result = self._crawl_playlist_songs_concurrent(playlist_ids, max_songs_per_playlist, max_workers)
+            else:
+                progress = logger.sampler("爬取歌单歌曲", len(playlist_ids))
+                for i, playlist_id in enumerate(playlist_ids, 1):
+                    try:
+                        songs = self._crawl_single_playlist_songs(playlist_id, max_songs_per_playlist)
                         
-                except Exception as e:
-                    logger.error(f"爬取歌单 {playlist_id} 的歌曲失败: {e}")
-                    result[playlist_id] = []
-                    continue
+                        result[playlist_id] = songs
+                        logger.debug("[%d/%d] 歌单 %s 获取到 %d 首歌曲", i, len(playlist_ids), playlist_id, len(songs))
+                        progress.tick()
+                        
+                        # 延时避免请求过快
+                        if i < len(playlist_ids):
+                            self._random_delay()
+                            
+                    except Exception as e:
+                        logger.error(f"爬取歌单 {playlist_id} 的歌曲失败: {e}")
+                        result[playlist_id] = []
+                        continue
+                progress.done()
             
             total_songs = sum(len(songs) for songs in result.values())
             logger.info(f"批量爬取完成，共获取 {total_songs} 首歌曲")
@@ -376,8 +657,498 @@ class MusicSpider:
         
         return result
     
+    def crawl_playlist_songs_by_track_ids(self, playlist_ids: List[int], max_songs_per_playlist: int = None,
+                                          max_workers: int = 1,
+                                          known_songs: Callable[[List[int]], Dict[int, Dict[str, Any]]] = None
+                                          ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        先获取各歌单的曲目ID，在整批歌单间去重后，只为未知歌曲批量请求详情
+        热门歌曲在大量歌单中重复出现时，可大幅减少传输量和解析量
+        :param playlist_ids: 歌单ID列表
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数（None表示全部）
+        :param max_workers: 获取曲目ID的并发线程数
+        :param known_songs: 查询已知歌曲元数据的函数（如 DatabaseManager.get_song_metadata），
+                            返回的歌曲不再请求详情
+        :return: {playlist_id: [songs]} 字典，顺序与 playlist_ids 一致
+        """
+        def fetch_track_ids(playlist_id):
+            try:
+                track_ids = self.get_playlist_track_ids(playlist_id)
+            finally:
+                self._random_delay()
+            if max_songs_per_playlist:
+                track_ids = track_ids[:max_songs_per_playlist]
+            return track_ids
+        
+        logger.info(f"开始按曲目ID爬取 {len(playlist_ids)} 个歌单的歌曲 (并发: {max_workers})")
+        
+        # 1. 获取每个歌单的曲目ID
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            track_ids_by_playlist = dict(zip(playlist_ids, executor.map(fetch_track_ids, playlist_ids)))
+        
+        # 2. 整批去重，已知歌曲直接复用元数据
+        unique_ids = list(dict.fromkeys(
+            song_id for track_ids in track_ids_by_playlist.values() for song_id in track_ids
+        ))
+        metadata = known_songs(unique_ids) if known_songs else {}
+        missing_ids = [song_id for song_id in unique_ids if song_id not in metadata]
+        
+        logger.info(
+            f"共 {sum(len(ids) for ids in track_ids_by_playlist.values())} 个曲目，"
+            f"去重后 {len(unique_ids)} 首，已知 {len(metadata)} 首，需请求详情 {len(missing_ids)} 首"
+        )
+        
+        # 3. 批量请求未知歌曲的详情
+        if missing_ids:
+            metadata.update(self.get_song_details(missing_ids))
+        
+        # 4. 按歌单组装歌曲记录
+        result = {}
+        for playlist_id, track_ids in track_ids_by_playlist.items():
+            songs = []
+            for position, song_id in enumerate(track_ids, 1):
+                if song_id in metadata:
+                    songs.append({**metadata[song_id], 'playlist_id': playlist_id, 'position': position})
+            result[playlist_id] = songs
+        
+        total_songs = sum(len(songs) for songs in result.values())
+        logger.info(f"按曲目ID爬取完成，共获取 {total_songs} 首歌曲")
+        return result
+    
+    def crawl_playlist_songs_by_priority(self, playlists: List[Dict[str, Any]], max_songs_per_playlist: int = None,
+                                         time_budget: float = None, request_budget: int = None,
+                                         weights: Dict[str, float] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        按优先级爬取歌单歌曲，到达时间或请求预算时停止
+        :param playlists: 歌单列表（playlist_id, play_count, subscribed_count, last_crawl_time）
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数（None表示全部）
+        :param time_budget: 时间预算（秒，None表示不限制）
+        :param request_budget: 请求预算（歌单详情请求数，None表示不限制）
+        :param weights: 评分权重（None使用配置）
+        :return: {playlist_id: [songs]} 字典，按实际爬取顺序
+        """
+        queue = PlaylistPriorityQueue(playlists, weights)
+        result = {}
+        start_time = time.time()
+        
+        logger.info(
+            f"开始按优先级爬取 {len(queue)} 个歌单的歌曲 "
+            f"(时间预算: {time_budget or '不限'}秒, 请求预算: {request_budget or '不限'})"
+        )
+        
+        progress = logger.sampler("按优先级爬取歌单", len(queue))
+        while len(queue):
+            if time_budget is not None and time.time() - start_time >= time_budget:
+                logger.info("已达到时间预算，停止爬取")
+                break
+            if request_budget is not None and len(result) >= request_budget:
+                logger.info("已达到请求预算，停止爬取")
+                break
+            
+            playlist = queue.pop()
+            playlist_id = playlist['playlist_id']
+            try:
+                songs = self._crawl_single_playlist_songs(playlist_id, max_songs_per_playlist)
+            except Exception as e:
+                logger.error(f"爬取歌单 {playlist_id} 的歌曲失败: {e}")
+                songs = []
+            
+            result[playlist_id] = songs
+            logger.debug("[%d] 歌单 %s (优先级 %.3f) 获取到 %d 首歌曲",
+                         len(result), playlist_id, playlist['priority'], len(songs))
+            progress.tick()
+            
+            if len(queue):
+                self._random_delay()
+        
+        progress.done()
+        total_songs = sum(len(songs) for songs in result.values())
+        logger.info(f"按优先级爬取完成，爬取 {len(result)} 个歌单，剩余 {len(queue)} 个，共获取 {total_songs} 首歌曲")
+        return result
+    
+    def crawl_playlist_songs_incremental(self, playlists: List[Dict[str, Any]],
+                                         max_songs_per_playlist: int = None) -> Dict[int, Dict[str, Any]]:
+        """
+        增量爬取歌单歌曲，跳过曲目未变化的歌单
+        1. 上次检查曲目之后重新爬取过歌单信息，且其中的曲目更新时间与上次写入歌曲时一致：
+           不发请求，直接跳过（skipped）
+        2. 请求详情后曲目ID列表哈希与上次一致：不重新写入歌曲（unchanged）
+        3. 其余情况返回新的歌曲列表（updated）
+        歌单信息中的曲目更新时间只有 crawl-playlists 会刷新，没有重新爬取歌单信息时一律请求详情比较，
+        避免用过期的曲目更新时间跳过已变化的歌单
+        歌单曲目超过上限被截断时，哈希只按写入的前N个曲目计算，且不返回曲目更新时间，
+        避免之后不限数量爬取时被误判为未变化而漏掉其余曲目
+        :param playlists: 歌单列表（playlist_id, track_update_time, songs_track_update_time, track_ids_hash,
+                          songs_check_time, crawl_time）
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数（None表示全部）
+        :return: {playlist_id: {'status', 'songs', 'track_update_time', 'track_ids_hash'}} 字典
+        """
+        result = {}
+        requested = 0
+        
+        logger.info(f"开始增量爬取 {len(playlists)} 个歌单的歌曲")
+        progress = logger.sampler("增量爬取歌单", len(playlists))
+        
+        for i, playlist in enumerate(playlists, 1):
+            playlist_id = playlist['playlist_id']
+            track_update_time = playlist.get('track_update_time') or 0
+            # 歌单信息（含曲目更新时间）是否在上次检查曲目之后刷新过
+            checked_at = playlist.get('songs_check_time')
+            refreshed = bool(checked_at) and (playlist.get('crawl_time') or '') > checked_at
+            
+            progress.tick()
+            if refreshed and track_update_time and track_update_time == playlist.get('songs_track_update_time'):
+                result[playlist_id] = {'status': 'skipped', 'songs': []}
+                continue
+            
+            if requested:
+                self._random_delay()
+            requested += 1
+            
+            try:
+                detail = self._fetch_playlist_result(playlist_id)
+            except Exception as e:
+                logger.error(f"爬取歌单 {playlist_id} 的歌曲失败: {e}")
+                detail = None
+            
+            if detail is None:
+                result[playlist_id] = {'status': 'failed', 'songs': []}
+                continue
+            
+            track_count = len(detail.get('trackIds') or detail.get('tracks', []))
+            truncated = bool(max_songs_per_playlist) and track_count > max_songs_per_playlist
+            entry = {
+                'track_update_time': None if truncated else detail.get('trackUpdateTime') or 0,
+                'track_ids_hash': self._track_ids_hash(detail, max_songs_per_playlist if truncated else None),
+            }
+            
+            if entry['track_ids_hash'] == playlist.get('track_ids_hash'):
+                entry.update(status='unchanged', songs=[])
+            else:
+                songs = self._parse_playlist_tracks(detail, playlist_id)
+                if max_songs_per_playlist and len(songs) > max_songs_per_playlist:
+                    songs = songs[:max_songs_per_playlist]
+                entry.update(status='updated', songs=songs)
+            
+            result[playlist_id] = entry
+            logger.debug("[%d/%d] 歌单 %s: %s, %d 首歌曲", i, len(playlists), playlist_id, entry['status'], len(entry['songs']))
+        
+        progress.done()
+        counts = {}
+        for entry in result.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        logger.info(f"增量爬取完成，请求 {requested} 个歌单: {counts}")
+        return result
+    
+    def _crawl_playlist_songs_concurrent(self, playlist_ids: List[int], max_songs_per_playlist: int,
+                                         max_workers: int) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        多线程爬取歌单歌曲
+        :param playlist_ids: 歌单ID列表
+        :param max_songs_per_playlist: 每个歌单最多爬取的歌曲数
+        :param max_workers: 并发线程数
+        :return: {playlist_id: [songs]} 字典
+        """
+        def crawl(playlist_id):
+            try:
+                return self._crawl_single_playlist_songs(playlist_id, max_songs_per_playlist)
+            finally:
+                self._random_delay()
+        
+        songs_by_id = {}
+        progress = logger.sampler("爬取歌单歌曲", len(playlist_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(crawl, playlist_id): playlist_id for playlist_id in playlist_ids}
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                playlist_id = futures[future]
+                try:
+                    songs_by_id[playlist_id] = future.result()
+                    logger.debug("[%d/%d] 歌单 %s 获取到 %d 首歌曲",
+                                 done, len(playlist_ids), playlist_id, len(songs_by_id[playlist_id]))
+                except Exception as e:
+                    logger.error(f"爬取歌单 {playlist_id} 的歌曲失败: {e}")
+                    songs_by_id[playlist_id] = []
+                progress.tick()
+        progress.done()
+        
+        return {playlist_id: songs_by_id.get(playlist_id, []) for playlist_id in playlist_ids}
+    
+    def _parse_comment(self, comment: Dict, song_id: int) -> Optional[Dict[str, Any]]:
+        """
+        解析评论数据
+        :param comment: API返回的评论信息
+        :param song_id: 歌曲ID
+        :return: 格式化的评论数据
+        """
+        try:
+            if not comment.get('commentId'):
+                return None
+            
+            user = comment.get('user') or {}
+            comment_time = comment.get('time', 0)
+            if comment_time:
+                from datetime import datetime
+                comment_time = datetime.fromtimestamp(comment_time / 1000).strftime('%Y-%m-%d %H:%M:%S')
+            
+            return {
+                'comment_id': str(comment['commentId']),
+                'song_id': int(song_id),
+                'user_name': user.get('nickname', ''),
+                'user_id': str(user.get('userId', '')),
+                'content': comment.get('content') or '',
+                'like_count': comment.get('likedCount', 0),
+                'comment_time': comment_time or '',
+            }
+        except Exception as e:
+            logger.error(f"解析评论数据失败: {e}")
+            return None
+    
+    def get_song_comments(self, song_id: int, max_comments: int = None, since: str = None) -> List[Dict[str, Any]]:
+        """
+        按时间从新到旧分页获取歌曲评论（以上一页最后一条评论的时间作为游标，不使用offset翻页）
+        :param song_id: 歌曲ID
+        :param max_comments: 最多获取的评论数（None使用配置，0表示不限制）
+        :param since: 已入库的最新评论时间，翻到比它更早的评论时停止（用于增量爬取）
+        :return: 评论列表（按 comment_id 去重）
+        """
+        if max_comments is None:
+            max_comments = SPIDER_CONFIG.get('max_comments_per_song', 20)
+        page_size = SPIDER_CONFIG.get('comment_page_size', 100)
+        url = self._api_url(f'/api/v1/resource/comments/R_SO_4_{song_id}')
+        
+        comments = {}
+        before = None
+        try:
+            while True:
+                limit = min(page_size, max_comments - len(comments)) if max_comments else page_size
+                params = {'limit': limit, 'offset': 0}
+                if before:
+                    params['before'] = before
+                    self._random_delay()
+                
+                response = self._get(url, params=params, timeout=10)
+                if response.status_code != 200:
+                    logger.warning(f"获取歌曲 {song_id} 的评论返回 {response.status_code}")
+                    break
+                
+                data = response.json()
+                page = (data.get('comments') or []) if data.get('code') == 200 else []
+                
+                reached_known = False
+                for item in page:
+                    comment = self._parse_comment(item, song_id)
+                    if not comment:
+                        continue
+                    # 同一秒内的评论可能尚未入库，只在更早时停止
+                    if since and comment['comment_time'] and comment['comment_time'] < since:
+                        reached_known = True
+                        break
+                    comments.setdefault(comment['comment_id'], comment)
+                    if max_comments and len(comments) >= max_comments:
+                        break
+                
+                if reached_known or not page or not data.get('more'):
+                    break
+                if max_comments and len(comments) >= max_comments:
+                    break
+                
+                cursor = page[-1].get('time')
+                if not cursor or cursor == before:
+                    break
+                before = cursor
+                
+        except Exception as e:
+            logger.error(f"获取歌曲 {song_id} 的评论失败: {e}")
+        
+        logger.debug("歌曲 %s 获取到 %d 条评论", song_id, len(comments))
+        return list(comments.values())
+    
+    def crawl_song_comments(self, song_ids: List[int], on_comments: Callable[[int, List[Dict[str, Any]]], None],
+                            max_comments_per_song: int = None, max_workers: int = None,
+                            since: Dict[int, str] = None) -> Dict[int, int]:
+        """
+        并发爬取多首歌曲的评论（每首歌内按游标顺序翻页，所有线程共享请求速率限制）
+        评论在调用线程中逐首交给 on_comments，调用方可以边爬边批量写入，不必把全部评论留在内存中
+        :param song_ids: 歌曲ID列表
+        :param on_comments: 处理一首歌评论的回调 (song_id, comments)
+        :param max_comments_per_song: 每首歌最多获取的评论数（None使用配置，0表示不限制）
+        :param max_workers: 并发线程数（None使用配置）
+        :param since: {song_id: 已入库的最新评论时间}（增量爬取）
+        :return: {song_id: 获取到的评论数}
+        """
+        max_workers = max_workers if max_workers else SPIDER_CONFIG.get('comment_workers', 4)
+        since = since or {}
+        
+        def crawl(song_id):
+            try:
+                return self.get_song_comments(song_id, max_comments_per_song, since.get(song_id))
+            finally:
+                self._random_delay()
+        
+        logger.info(f"开始爬取 {len(song_ids)} 首歌曲的评论 (并发: {max_workers}, 增量: {len(since)} 首)")
+        
+        counts = {}
+        progress = logger.sampler("爬取歌曲评论", len(song_ids))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(crawl, song_id): song_id for song_id in song_ids}
+            
+            for future in as_completed(futures):
+                song_id = futures[future]
+                try:
+                    comments = future.result()
+                    counts[song_id] = len(comments)
+                    if comments:
+                        on_comments(song_id, comments)
+                except Exception as e:
+                    logger.error(f"爬取歌曲 {song_id} 的评论失败: {e}")
+                    counts[song_id] = 0
+                progress.tick()
+        progress.done()
+        
+        logger.info(f"评论爬取完成，共获取 {sum(counts.values())} 条评论")
+        return counts
+    
+    def replay_archive(self, archive_dir: str = None,
+                       known_songs: Callable[[List[int]], Dict[int, Dict[str, Any]]] = None
+                       ) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """
+        重放原始响应归档，用当前的解析逻辑重新解析（不发送任何请求）
+        同一歌单或评论出现多次时以归档中较新的记录为准
+        只有曲目ID的歌单，归档中没有详情的歌曲用 known_songs 补全；仍有曲目无法补全的歌单
+        不返回歌曲，避免用不完整的曲目列表覆盖已入库的歌单
+        :param archive_dir: 归档目录（None使用配置）
+        :param known_songs: 查询已知歌曲元数据的函数（如 DatabaseManager.get_song_metadata）
+        :return: (歌单数据列表, {playlist_id: [songs]}, 评论数据列表)
+        """
+        archive_dir = archive_dir if archive_dir else SPIDER_CONFIG['response_archive_dir']
+        
+        playlists = {}
+        songs_by_playlist = {}
+        track_ids_by_playlist = {}
+        song_metadata = {}
+        comments = {}
+        records = 0
+        
+        def merge_playlist(playlist_data, category=None):
+            existing = playlists.get(playlist_data['playlist_id'])
+            if existing is None:
+                playlist_data['categories'] = [category] if category else []
+                playlists[playlist_data['playlist_id']] = playlist_data
+                return
+            # 保留歌单广场中的排名和已出现过的分类
+            rank = existing['rank'] if playlist_data['rank'] == 0 else playlist_data['rank']
+            existing.update(playlist_data, rank=rank, categories=existing['categories'])
+            if category and category not in existing['categories']:
+                existing['categories'].append(category)
+        
+        for record in iter_archive_records(archive_dir):
+            records += 1
+            try:
+                data = json.loads(record['body'])
+            except ValueError:
+                continue
+            if not isinstance(data, dict) or data.get('code') != 200:
+                continue
+            
+            path = urlsplit(record['url']).path
+            params = record.get('params') or {}
+            
+            if path == '/api/playlist/list':
+                offset = int(params.get('offset', 0))
+                for idx, playlist_info in enumerate(data.get('playlists', []), 1):
+                    playlist_data = self._parse_playlist_data(playlist_info, offset + idx)
+                    if playlist_data:
+                        merge_playlist(playlist_data, params.get('cat'))
+            
+            elif path == '/api/playlist/detail' and 'result' in data:
+                playlist_data = self._parse_playlist_data(data['result'], 0)
+                if playlist_data:
+                    playlist_id = playlist_data['playlist_id']
+                    merge_playlist(playlist_data)
+                    songs_by_playlist[playlist_id] = self._parse_playlist_tracks(data['result'], playlist_id)
+                    track_ids_by_playlist.pop(playlist_id, None)
+            
+            elif path == '/api/v6/playlist/detail' and 'playlist' in data:
+                playlist_data = self._parse_playlist_data(data['playlist'], 0)
+                if playlist_data:
+                    playlist_id = playlist_data['playlist_id']
+                    merge_playlist(playlist_data)
+                    track_ids_by_playlist[playlist_id] = [
+                        int(track.get('id', 0)) for track in data['playlist'].get('trackIds', [])
+                    ]
+                    songs_by_playlist.pop(playlist_id, None)
+            
+            elif path.startswith('/api/song/detail'):
+                for track in data.get('songs', []):
+                    song_data = self._parse_song_data(track, None, 0)
+                    if song_data:
+                        song_data.pop('playlist_id')
+                        song_data.pop('position')
+                        song_metadata[song_data['song_id']] = song_data
+            
+            elif path.startswith('/api/v1/resource/comments/R_SO_4_'):
+                song_id = int(path.rsplit('_', 1)[1])
+                for comment in data.get('comments') or []:
+                    comment_data = self._parse_comment(comment, song_id)
+                    if comment_data:
+                        comments[comment_data['comment_id']] = comment_data
+        
+        # 只有曲目ID的歌单，用归档中的歌曲详情组装歌曲记录，缺失的歌曲用已知元数据补全
+        missing_ids = list(dict.fromkeys(
+            song_id for track_ids in track_ids_by_playlist.values()
+            for song_id in track_ids if song_id not in song_metadata
+        ))
+        if missing_ids and known_songs:
+            song_metadata.update(
+                (song_id, song) for song_id, song in known_songs(missing_ids).items() if song_id not in song_metadata
+            )
+        
+        incomplete = 0
+        for playlist_id, track_ids in track_ids_by_playlist.items():
+            if not all(song_id in song_metadata for song_id in track_ids):
+                incomplete += 1
+                continue
+            songs_by_playlist[playlist_id] = [
+                {**song_metadata[song_id], 'playlist_id': playlist_id, 'position': position}
+                for position, song_id in enumerate(track_ids, 1)
+            ]
+        if incomplete:
+            logger.warning(f"{incomplete} 个歌单的曲目无法从归档或数据库补全，跳过这些歌单的歌曲")
+        
+        logger.info(
+            f"归档重放完成: {records} 条响应，解析出 {len(playlists)} 个歌单、"
+            f"{sum(len(songs) for songs in songs_by_playlist.values())} 首歌曲、{len(comments)} 条评论"
+        )
+        return list(playlists.values()), songs_by_playlist, list(comments.values())
+    
+    def export_metrics(self, output_dir: str = None) -> Dict[str, Any]:
+        """
+        导出运行指标（JSON汇总和Prometheus文本文件）
+        :param output_dir: 输出目录（None使用配置）
+        :return: 指标汇总
+        """
+        output_dir = output_dir if output_dir else OUTPUT_CONFIG['metrics_dir']
+        summary = self.metrics.summary()
+        json_path, prom_path = self.metrics.export(output_dir)
+        
+        logger.info(
+            f"爬虫指标: {summary['requests']} 次请求 ({summary['requests_per_second']}/s), "
+            f"{summary['bytes'] / 1024:.1f} KB, 重试 {summary['retries']} 次, 错误 {summary['errors']} 次, "
+            f"等待 {sum(s['seconds'] for s in summary['sleep'].values()):.1f}s"
+        )
+        logger.info(f"爬虫指标已导出: {json_path}, {prom_path}")
+        return summary
+    
     def close(self):
         """关闭会话"""
+        if getattr(self, 'response_cache', None):
+            logger.info(f"HTTP响应缓存统计: {self.response_cache.stats()}")
+            self.response_cache = None
+        if getattr(self, 'response_archive', None):
+            self.response_archive.close()
+            logger.info(f"原始响应归档: 本次写入 {self.response_archive.records} 条")
+            self.response_archive = None
         if self.session:
             self.session.close()
             logger.info("爬虫会话已关闭")
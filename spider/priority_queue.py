@@ -0,0 +1,86 @@
+"""
+歌单爬取优先级调度模块
+按可配置的评分（播放量、收藏数、距上次爬取的时间）对歌单排序，
+在有限的爬取时间或请求数内优先获取价值最高的数据
+"""
+import heapq
+import math
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from config.settings import SPIDER_CONFIG
+
+# 默认评分权重
+DEFAULT_PRIORITY_WEIGHTS = {
+    'play_count': 1.0,
+    'subscribed_count': 1.0,
+    'staleness': 1.0,
+}
+
+
+class PlaylistPriorityQueue:
+    """歌单优先级队列（分数高的先出队）"""
+    
+    def __init__(self, playlists: List[Dict[str, Any]], weights: Dict[str, float] = None,
+                 now: Optional[datetime] = None):
+        """
+        初始化优先级队列
+        :param playlists: 歌单列表（playlist_id, play_count, subscribed_count, last_crawl_time）
+        :param weights: 评分权重（None使用配置）
+        :param now: 计算陈旧度的当前时间（UTC，与SQLite的CURRENT_TIMESTAMP一致）
+        """
+        self.weights = dict(DEFAULT_PRIORITY_WEIGHTS)
+        self.weights.update(weights if weights is not None else SPIDER_CONFIG.get('priority_weights', {}))
+        self.staleness_hours = SPIDER_CONFIG.get('priority_staleness_hours', 24)
+        self.now = now if now else datetime.utcnow()
+        
+        # 播放量、收藏数按全体最大值做对数归一化
+        self._max_log = {
+            key: math.log1p(max((p.get(key) or 0 for p in playlists), default=0)) or 1.0
+            for key in ('play_count', 'subscribed_count')
+        }
+        
+        self._heap = []
+        for idx, playlist in enumerate(playlists):
+            # idx 保证分数相同时按原顺序出队
+            heapq.heappush(self._heap, (-self.score(playlist), idx, playlist))
+    
+    def _staleness(self, last_crawl_time: Optional[str]) -> float:
+        """
+        计算陈旧度（0~1，从未爬取过为1）
+        :param last_crawl_time: 上次爬取时间（YYYY-MM-DD HH:MM:SS）
+        """
+        if not last_crawl_time:
+            return 1.0
+        try:
+            last = datetime.strptime(last_crawl_time, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return 1.0
+        hours = max(0.0, (self.now - last).total_seconds() / 3600)
+        # 经过 staleness_hours 小时陈旧度为0.5，之后逐渐趋近1
+        return hours / (hours + self.staleness_hours)
+    
+    def score(self, playlist: Dict[str, Any]) -> float:
+        """
+        计算歌单的优先级分数
+        :param playlist: 歌单数据
+        :return: 分数（越大越优先）
+        """
+        score = 0.0
+        for key in ('play_count', 'subscribed_count'):
+            score += self.weights[key] * math.log1p(playlist.get(key) or 0) / self._max_log[key]
+        score += self.weights['staleness'] * self._staleness(playlist.get('last_crawl_time'))
+        return score
+    
+    def pop(self) -> Optional[Dict[str, Any]]:
+        """
+        取出优先级最高的歌单
+        :return: 歌单数据（附带 priority 分数），队列为空返回None
+        """
+        if not self._heap:
+            return None
+        neg_score, _, playlist = heapq.heappop(self._heap)
+        return dict(playlist, priority=-neg_score)
+    
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,36 @@
+"""
+请求速率限制模块
+多个爬取线程共享同一个速率预算
+"""
+import time
+import threading
+
+
+class RateLimiter:
+    """线程安全的请求速率限制器（按固定最小间隔放行请求）"""
+    
+    def __init__(self, max_per_second: float):
+        """
+        初始化速率限制器
+        :param max_per_second: 每秒最多请求数（<=0 表示不限制）
+        """
+        self.interval = 1.0 / max_per_second if max_per_second and max_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+    
+    def acquire(self) -> float:
+        """
+        等待直到允许发出下一个请求
+        :return: 本次等待的秒数
+        """
+        if self.interval <= 0:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_time - now)
+            self._next_time = max(now, self._next_time) + self.interval
+        
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,114 @@
+"""
+原始响应归档模块
+将接口返回的原始JSON按行追加写入gzip压缩的分段文件（每次爬取一个或多个分段），
+之后可以离线重放归档、重新解析入库，无需重新请求网络
+"""
+import os
+import gzip
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+SEGMENT_PREFIX = 'responses-'
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+
+class ResponseArchive:
+    """线程安全的原始响应归档写入器（只追加）"""
+
+    def __init__(self, archive_dir: str, segment_max_bytes: int):
+        """
+        初始化归档写入器
+        :param archive_dir: 归档目录
+        :param segment_max_bytes: 单个分段未压缩数据的大小上限（字节），超出后切换新分段
+        """
+        self.archive_dir = archive_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.records = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._segment_bytes = 0
+        self._segment_index = 0
+        self._run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def _open_segment(self):
+        """打开新的分段文件"""
+        self._segment_index += 1
+        name = f"{SEGMENT_PREFIX}{self._run_id}-{self._segment_index:03d}{SEGMENT_SUFFIX}"
+        self._file = gzip.open(os.path.join(self.archive_dir, name), 'ab')
+        self._segment_bytes = 0
+        logger.info(f"原始响应归档分段: {name}")
+
+    def record(self, url: str, params: Optional[Dict[str, Any]], body: str):
+        """
+        追加一条响应记录
+        :param url: 请求URL
+        :param params: 查询参数
+        :param body: 响应文本（原始JSON）
+        """
+        line = json.dumps({
+            'ts': time.time(),
+            'url': url,
+            'params': params or {},
+            'body': body,
+        }, ensure_ascii=False).encode('utf-8') + b'\n'
+
+        with self._lock:
+            if self._file is None or self._segment_bytes >= self.segment_max_bytes:
+                self.close_segment()
+                self._open_segment()
+            self._file.write(line)
+            self._segment_bytes += len(line)
+            self.records += 1
+
+    def close_segment(self):
+        """关闭当前分段（下次写入时打开新分段）"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """关闭归档"""
+        with self._lock:
+            self.close_segment()
+
+
+def iter_archive_records(archive_dir: str) -> Iterator[Dict[str, Any]]:
+    """
+    按写入顺序遍历归档中的所有响应记录
+    分段末尾因异常中断而不完整的数据会被跳过
+    :param archive_dir: 归档目录
+    :return: 记录迭代器（url, params, body, ts）
+    """
+    if not os.path.isdir(archive_dir):
+        logger.warning(f"归档目录不存在: {archive_dir}")
+        return
+
+    segments = sorted(
+        name for name in os.listdir(archive_dir)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+
+    for name in segments:
+        path = os.path.join(archive_dir, name)
+        count = 0
+        try:
+            with gzip.open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"归档分段 {name} 第 {count + 1} 行不完整，已跳过")
+                        continue
+                    count += 1
+                    yield record
+        except (OSError, EOFError) as e:
+            logger.warning(f"归档分段 {name} 读取中断（已读取 {count} 条）: {e}")
@@ -0,0 +1,207 @@
+"""
+HTTP响应磁盘缓存模块
+按 URL+参数 缓存接口响应（gzip压缩），每个接口单独设置有效期，超出容量时按最近最少使用淘汰
+"""
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+CACHE_SUFFIX = '.gz'
+
+
+class ResponseCache:
+    """线程安全的HTTP响应磁盘缓存"""
+
+    def __init__(self, cache_dir: str, ttls: Dict[str, float], max_bytes: int):
+        """
+        初始化响应缓存
+        :param cache_dir: 缓存目录
+        :param ttls: {接口路径前缀: 有效期秒数}，按最长前缀匹配，'default' 为其余接口的有效期（<=0 表示不缓存）
+        :param max_bytes: 缓存文件总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # {缓存键: 文件大小}，按最近使用时间排序（最久未使用的在前）
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """按文件修改时间（即最近使用时间）重建LRU索引"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(CACHE_SUFFIX):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                files.append((stat.st_mtime, name[:-len(CACHE_SUFFIX)], stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        logger.info(f"HTTP响应缓存: {len(self._entries)} 个文件, {self._total_bytes / 1024 / 1024:.1f} MB")
+
+    @staticmethod
+    def make_key(url: str, params: Dict[str, Any] = None) -> str:
+        """
+        生成缓存键（参数顺序无关）
+        :param url: 请求URL
+        :param params: 查询参数
+        :return: sha1 十六进制字符串
+        """
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha1(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    def ttl_for(self, url: str) -> float:
+        """
+        获取接口的缓存有效期
+        :param url: 请求URL
+        :return: 有效期秒数（<=0 表示不缓存）
+        """
+        path = urlsplit(url).path
+        matches = [prefix for prefix in self.ttls if prefix != 'default' and path.startswith(prefix)]
+        if matches:
+            return self.ttls[max(matches, key=len)]
+        return self.ttls.get('default', 0)
+
+    @staticmethod
+    def is_success(body: bytes, encoding: str = None) -> bool:
+        """
+        响应体是否为成功的接口结果（网易云的反爬、资源不存在等错误也以HTTP 200返回，只能看JSON中的code）
+        :param body: 响应体
+        :param encoding: 响应编码
+        :return: JSON 的 code 为 200 时返回True
+        """
+        try:
+            data = json.loads(body.decode(encoding or 'utf-8'))
+        except (UnicodeDecodeError, LookupError, ValueError):
+            return False
+        return isinstance(data, dict) and data.get('code') == 200
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def get(self, url: str, params: Dict[str, Any] = None) -> Optional[Tuple[int, bytes, str]]:
+        """
+        读取未过期的缓存响应
+        :param url: 请求URL
+        :param params: 查询参数
+        :return: (状态码, 响应体, 编码)，未命中返回None
+        """
+        ttl = self.ttl_for(url)
+        if ttl <= 0:
+            return None
+
+        key = self.make_key(url, params)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+        try:
+            with gzip.open(self._path(key), 'rb') as f:
+                header = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取缓存文件失败: {e}")
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        if time.time() - header['stored_at'] > ttl:
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+        return header['status_code'], body, header.get('encoding')
+
+    def put(self, url: str, params: Dict[str, Any], status_code: int, body: bytes, encoding: str = None):
+        """
+        写入缓存响应（只缓存HTTP 200且接口code为200的响应），超出容量时淘汰最久未使用的文件
+        :param url: 请求URL
+        :param params: 查询参数
+        :param status_code: 状态码
+        :param body: 响应体
+        :param encoding: 响应编码
+        """
+        if status_code != 200 or self.ttl_for(url) <= 0 or not self.is_success(body, encoding):
+            return
+
+        key = self.make_key(url, params)
+        path = self._path(key)
+        header = {'url': url, 'stored_at': time.time(), 'status_code': status_code, 'encoding': encoding}
+
+        try:
+            # 先写临时文件再替换，避免并发读取到写了一半的文件
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                f.write(body)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"写入缓存文件失败: {e}")
+            return
+
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+        if evicted:
+            logger.debug(f"HTTP响应缓存淘汰 {len(evicted)} 个文件")
+
+    def _remove(self, key: str):
+        """删除缓存项"""
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+        :return: 命中数、未命中数、文件数和总大小
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
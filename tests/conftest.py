@@ -0,0 +1,45 @@
+import pytest
+
+import main
+from benchmarks.mock_api_server import MockNeteaseAPI, MockNeteaseServer
+from config.settings import DATABASE_CONFIG, SPIDER_CONFIG
+from database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """把数据库、HTTP缓存和归档目录指向临时目录，并关闭请求延时和限速"""
+    monkeypatch.setitem(DATABASE_CONFIG, 'db_path', str(tmp_path / 'music163.db'))
+    monkeypatch.setitem(DATABASE_CONFIG, 'profile_queries', False)
+    monkeypatch.setitem(SPIDER_CONFIG, 'response_cache_dir', str(tmp_path / 'http_cache'))
+    monkeypatch.setitem(SPIDER_CONFIG, 'response_archive_dir', str(tmp_path / 'archive'))
+    monkeypatch.setitem(SPIDER_CONFIG, 'min_delay', 0)
+    monkeypatch.setitem(SPIDER_CONFIG, 'max_delay', 0)
+    monkeypatch.setitem(SPIDER_CONFIG, 'max_requests_per_second', 0)
+    monkeypatch.setattr(main, 'create_directories', lambda: None)
+    return tmp_path
+
+
+@pytest.fixture
+def mock_server():
+    """本地模拟接口服务"""
+    with MockNeteaseServer(MockNeteaseAPI(tracks_per_playlist=12, song_pool=200)) as server:
+        yield server
+
+
+@pytest.fixture
+def db(settings):
+    """临时数据库"""
+    db = DatabaseManager()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def app(settings):
+    """使用临时数据库的应用实例"""
+    app = main.MusicAnalysisApp()
+    yield app
+    if app.spider:
+        app.spider.close()
+    app.db.close()
@@ -0,0 +1,24 @@
+from spider.music_spider import MusicSpider
+
+
+def run_incremental(app):
+    summary = app.do_crawl_songs_incremental()
+    return {status: summary[status] for status in ('updated', 'unchanged', 'skipped', 'failed')}
+
+
+def test_incremental_crawl_only_skips_playlists_refreshed_since_last_check(app, mock_server):
+    app.spider = MusicSpider(use_response_cache=False, archive_responses=False, base_url=mock_server.base_url)
+    app.do_crawl_playlists(1, ['华语'])
+    playlists = len(app.db.get_playlists_for_song_crawl())
+    assert playlists
+
+    assert run_incremental(app) == {'updated': playlists, 'unchanged': 0, 'skipped': 0, 'failed': 0}
+
+    # 没有重新爬取歌单信息：曲目更新时间可能已过期，必须请求详情比较
+    assert run_incremental(app) == {'updated': 0, 'unchanged': playlists, 'skipped': 0, 'failed': 0}
+
+    # 歌单信息在上次检查之后刷新过，曲目更新时间未变：直接跳过
+    app.db.cursor.execute("UPDATE playlists SET songs_check_time = datetime(songs_check_time, '-1 minute')")
+    app.db.conn.commit()
+    app.do_crawl_playlists(1, ['华语'])
+    assert run_incremental(app) == {'updated': 0, 'unchanged': 0, 'skipped': playlists, 'failed': 0}
@@ -0,0 +1,64 @@
+from spider.music_spider import MusicSpider
+
+
+def playlist_songs(db):
+    """{playlist_id: [song_id, ...]}（按曲目位置排序）"""
+    db.cursor.execute("SELECT playlist_id, song_id FROM songs ORDER BY playlist_id, position")
+    result = {}
+    for row in db.cursor.fetchall():
+        result.setdefault(row['playlist_id'], []).append(row['song_id'])
+    return result
+
+
+def test_replay_keeps_playlists_crawled_from_db_and_cache(app, mock_server):
+    playlist_ids = [mock_server.api._playlist_id('华语', index) for index in range(1, 7)]
+
+    # 第一次爬取：不归档，歌单详情进入HTTP缓存，歌曲写入数据库
+    app.spider = MusicSpider(use_response_cache=True, archive_responses=False, base_url=mock_server.base_url)
+    app.do_crawl_songs(playlist_ids[:3], by_track_ids=True)
+    app.spider.close()
+
+    # 第二次爬取：归档，前3个歌单的详情来自缓存、歌曲元数据来自数据库
+    app.spider = MusicSpider(use_response_cache=True, archive_responses=True, base_url=mock_server.base_url)
+    app.do_crawl_songs(playlist_ids, by_track_ids=True)
+    app.spider.close()
+    app.spider = None
+
+    expected = playlist_songs(app.db)
+    assert sorted(expected) == sorted(playlist_ids)
+
+    summary = app.do_replay_archive()
+    assert summary['song_playlists'] == len(playlist_ids)
+    assert playlist_songs(app.db) == expected
+
+
+def test_replay_skips_playlists_that_cannot_be_resolved(app, mock_server):
+    playlist_ids = [mock_server.api._playlist_id('华语', index) for index in range(1, 5)]
+
+    app.spider = MusicSpider(use_response_cache=False, archive_responses=False, base_url=mock_server.base_url)
+    app.do_crawl_songs(playlist_ids[:2], by_track_ids=True)
+    app.spider.close()
+
+    app.spider = MusicSpider(use_response_cache=False, archive_responses=True, base_url=mock_server.base_url)
+    app.do_crawl_songs(playlist_ids, by_track_ids=True)
+    app.spider.close()
+    app.spider = None
+    expected = playlist_songs(app.db)
+
+    # 清空前两个歌单的歌曲详情来源：归档中没有，数据库中也删掉
+    known = {song_id for pid in playlist_ids[2:] for song_id in expected[pid]}
+    unresolved = [song_id for pid in playlist_ids[:2] for song_id in expected[pid] if song_id not in known]
+    assert unresolved
+    app.db.cursor.execute(
+        f"DELETE FROM songs WHERE song_id IN ({', '.join('?' * len(unresolved))})", unresolved
+    )
+    app.db.conn.commit()
+    remaining = playlist_songs(app.db)
+
+    summary = app.do_replay_archive()
+    assert summary['song_playlists'] == 2
+    replayed = playlist_songs(app.db)
+    for playlist_id in playlist_ids[:2]:
+        assert replayed.get(playlist_id) == remaining.get(playlist_id)
+    for playlist_id in playlist_ids[2:]:
+        assert replayed[playlist_id] == expected[playlist_id]
@@ -0,0 +1,31 @@
+from database.search_index import build_match_query, tokenize
+
+
+def add_playlist(db, playlist_id, name, description='', tags=''):
+    db.insert_playlist({
+        'playlist_id': playlist_id, 'playlist_name': name, 'description': description, 'tags': tags,
+        'create_time': '2024-01-01 00:00:00',
+    })
+
+
+def found_playlists(db, query):
+    return [row['playlist_id'] for row in db.search(query, ['playlists'])['playlists']]
+
+
+def test_query_terms_are_indexed_for_the_same_text():
+    for text in ('好听的歌', '周杰伦的晴天', '中华人民共和国', '适合学习时听的轻音乐'):
+        indexed = set(tokenize(text).split())
+        terms = {term.strip('"') for term in build_match_query(text).split()}
+        assert terms <= indexed
+
+
+def test_query_that_is_part_of_an_indexed_title_matches(db):
+    add_playlist(db, 1, '好听的歌')
+    add_playlist(db, 2, '适合学习时听的轻音乐')
+    add_playlist(db, 3, '周杰伦演唱会现场版')
+
+    assert found_playlists(db, '好听') == [1]
+    assert found_playlists(db, '轻音') == [2]
+    assert found_playlists(db, '杰伦演唱') == [3]
+    assert found_playlists(db, '好听的歌') == [1]
+    assert found_playlists(db, '摇滚') == []
@@ -0,0 +1,18 @@
+def song(song_id, playlist_id, artists):
+    return {
+        'song_id': song_id, 'playlist_id': playlist_id, 'song_name': f"歌曲{song_id}",
+        'artist': ', '.join(name for _, name in artists), 'artist_id': artists[0][0],
+        'artists': [{'artist_id': artist_id, 'artist_name': name} for artist_id, name in artists],
+    }
+
+
+def test_artist_count_splits_collaborations_and_ignores_removed_songs(db):
+    db.replace_playlist_songs(1, [
+        song(101, 1, [(1, '歌手A')]),
+        song(102, 1, [(1, '歌手A'), (2, '歌手B')]),
+        song(103, 1, [(3, '歌手C')]),
+    ])
+    assert db.get_statistics()['total_artists'] == 3
+
+    db.replace_playlist_songs(1, [song(102, 1, [(1, '歌手A'), (2, '歌手B')])])
+    assert db.get_statistics()['total_artists'] == 2
@@ -2,9 +2,13 @@
 日志工具模块
 提供统一的日志记录功能
 """
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from config.settings import LOG_CONFIG, OUTPUT_CONFIG
 
 
@@ -26,6 +30,7 @@ class Logger:
             return
         
         self._initialized = True
+        self._listener = None
         
         # 创建日志目录
         log_dir = LOG_CONFIG['log_dir']
@@ -62,37 +67,133 @@ class Logger:
             file_handler.setFormatter(formatter)
             console_handler.setFormatter(formatter)
             
-            # 添加处理器
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            if LOG_CONFIG.get('async_logging', True):
+                # 调用线程只把日志记录放入队列，由后台线程写文件和控制台
+                log_queue = queue.SimpleQueue()
+                self.logger.addHandler(QueueHandler(log_queue))
+                self._listener = QueueListener(
+                    log_queue, file_handler, console_handler, respect_handler_level=True
+                )
+                self._listener.start()
+                # 退出前写完队列中剩余的日志
+                atexit.register(self.stop)
+            else:
+                # 添加处理器
+                self.logger.addHandler(file_handler)
+                self.logger.addHandler(console_handler)
+    
+    def stop(self):
+        """停止后台写日志线程（写完队列中剩余的日志）"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
     
     def get_logger(self):
         """获取日志记录器"""
         return self.logger
     
-    def debug(self, message):
+    # 以下方法支持 %-style 延迟格式化: logger.info("获取 %d 首歌曲", count)
+    # 日志级别被过滤时不会格式化消息
+    
+    def debug(self, message, *args, **kwargs):
         """调试日志"""
-        self.logger.debug(message)
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.debug(message, *args, **kwargs)
     
-    def info(self, message):
+    def info(self, message, *args, **kwargs):
         """信息日志"""
-        self.logger.info(message)
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.info(message, *args, **kwargs)
     
-    def warning(self, message):
+    def warning(self, message, *args, **kwargs):
         """警告日志"""
-        self.logger.warning(message)
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.warning(message, *args, **kwargs)
     
-    def error(self, message):
+    def error(self, message, *args, **kwargs):
         """错误日志"""
-        self.logger.error(message)
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.error(message, *args, **kwargs)
     
-    def critical(self, message):
+    def critical(self, message, *args, **kwargs):
         """严重错误日志"""
-        self.logger.critical(message)
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.critical(message, *args, **kwargs)
     
-    def exception(self, message):
+    def exception(self, message, *args, **kwargs):
         """异常日志(包含堆栈信息)"""
-        self.logger.exception(message)
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.exception(message, *args, **kwargs)
+    
+    def sampler(self, label: str, total: int = None, unit: str = '个') -> 'LogSampler':
+        """
+        创建逐条日志的采样汇总器
+        :param label: 汇总日志的标题（如 "解析歌单"）
+        :param total: 预计总数（None表示未知）
+        :param unit: 计数单位
+        :return: LogSampler 实例
+        """
+        return LogSampler(self, label, total, unit)
+
+
+class LogSampler:
+    """
+    逐条日志的采样汇总器（线程安全）
+    大批量处理时不再逐条输出INFO日志，而是每处理一定条数或每隔一段时间输出一条进度汇总，
+    例如 "解析歌单: 5000 个 (12.0/s)"
+    """
+    
+    def __init__(self, log: Logger, label: str, total: int = None, unit: str = '个'):
+        """
+        初始化采样汇总器
+        :param log: 日志记录器
+        :param label: 汇总日志的标题
+        :param total: 预计总数（None表示未知）
+        :param unit: 计数单位
+        """
+        self.log = log
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.every = LOG_CONFIG.get('progress_every', 1000)
+        self.interval = LOG_CONFIG.get('progress_interval', 5)
+        self.count = 0
+        self._start = time.monotonic()
+        self._last_count = 0
+        self._last_time = self._start
+        self._lock = threading.Lock()
+    
+    def tick(self, count: int = 1):
+        """
+        记录处理了 count 条，达到条数或时间间隔时输出一条进度汇总
+        :param count: 本次处理的条数
+        """
+        with self._lock:
+            self.count += count
+            now = time.monotonic()
+            due = (self.every and self.count - self._last_count >= self.every) or \
+                  (self.interval and now - self._last_time >= self.interval)
+            if not due:
+                return
+            self._last_count = self.count
+            self._last_time = now
+            current = self.count
+        
+        self._emit(current, now, done=False)
+    
+    def done(self):
+        """输出最终汇总"""
+        self._emit(self.count, time.monotonic(), done=True)
+    
+    def _emit(self, current: int, now: float, done: bool):
+        elapsed = now - self._start
+        rate = current / elapsed if elapsed > 0 else 0.0
+        progress = f"{current}/{self.total}" if self.total is not None else f"{current}"
+        if done:
+            self.log.info("%s完成: %s %s, 用时 %.1fs (%.1f/s)", self.label, progress, self.unit, elapsed, rate,
+                          stacklevel=4)
+        else:
+            self.log.info("%s: %s %s (%.1f/s)", self.label, progress, self.unit, rate, stacklevel=4)
 
 
 # 创建全局日志实例
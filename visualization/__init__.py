@@ -1,6 +1,13 @@
 """
 可视化模块
 """
-from visualization.modern_report_generator import ModernReportGenerator
 
 __all__ = ['ModernReportGenerator']
+
+
+def __getattr__(name):
+    """延迟导入报告生成器，避免导入子模块时加载pyecharts"""
+    if name == 'ModernReportGenerator':
+        from visualization.modern_report_generator import ModernReportGenerator
+        return ModernReportGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,116 @@
+"""ECharts运行时资源管理 - 报告中每个JS资源只引用一次"""
+import os
+import shutil
+from typing import List, Dict, Any, Optional
+
+from config.settings import OUTPUT_CONFIG
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# ECharts运行时及扩展的CDN地址
+ASSET_URLS = {
+    'echarts': 'https://cdn.jsdelivr.net/npm/echarts@5/dist/echarts.min.js',
+    'echarts-wordcloud': 'https://cdn.jsdelivr.net/npm/echarts-wordcloud@2/dist/echarts-wordcloud.min.js',
+}
+
+# 主题脚本地址（ECharts内置主题无需额外加载）
+THEME_URL = 'https://cdn.jsdelivr.net/npm/echarts@5/theme/{theme}.js'
+BUILTIN_THEMES = {'white', 'dark', 'light'}
+
+# 资源输出方式
+ASSET_MODES = ('cdn', 'inline', 'sidecar')
+
+
+class AssetManager:
+    """报告JS资源管理器"""
+
+    def __init__(self, mode: str = 'cdn', cache_dir: Optional[str] = None):
+        """
+        初始化资源管理器
+        :param mode: 输出方式（cdn=引用CDN，inline=内联到报告，sidecar=报告旁的assets目录）
+        :param cache_dir: 下载资源的本地缓存目录
+        """
+        if mode not in ASSET_MODES:
+            logger.warning(f"未知的资源输出方式 {mode}，使用cdn")
+            mode = 'cdn'
+        self.mode = mode
+        self.cache_dir = cache_dir if cache_dir else OUTPUT_CONFIG['assets_cache_dir']
+
+    def resolve_assets(self, charts: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        汇总所有图表需要的资源并去重
+        :param charts: 序列化后的图表列表
+        :return: {资源名: URL}，ECharts运行时排在最前
+        """
+        assets = {'echarts': ASSET_URLS['echarts']}
+
+        for chart in charts:
+            for dependency in chart.get('dependencies', []):
+                if dependency in ASSET_URLS and dependency not in assets:
+                    assets[dependency] = ASSET_URLS[dependency]
+
+        for chart in charts:
+            theme = chart.get('theme')
+            name = f"theme-{theme}"
+            if theme and theme not in BUILTIN_THEMES and name not in assets:
+                assets[name] = THEME_URL.format(theme=theme)
+
+        return assets
+
+    def _fetch_asset(self, name: str, url: str) -> Optional[str]:
+        """
+        获取资源的本地缓存文件，不存在时下载
+        :param name: 资源名
+        :param url: 资源URL
+        :return: 本地文件路径，失败返回None
+        """
+        cache_file = os.path.join(self.cache_dir, f"{name}.js")
+        if os.path.exists(cache_file):
+            return cache_file
+
+        try:
+            # 只有inline/sidecar模式首次下载时才需要requests，延迟导入以免拖慢报告生成的启动
+            import requests
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            response = requests.get(url, timeout=30)
+            if response.status_code != 200:
+                logger.warning(f"下载资源 {name} 失败，状态码: {response.status_code}")
+                return None
+
+            with open(cache_file, 'wb') as f:
+                f.write(response.content)
+            logger.info(f"已缓存资源 {name}: {len(response.content) / 1024:.1f} KB")
+            return cache_file
+
+        except Exception as e:
+            logger.warning(f"下载资源 {name} 失败: {e}")
+            return None
+
+    def build_script_tags(self, charts: List[Dict[str, Any]], report_dir: str) -> str:
+        """
+        生成报告 <head> 中的资源引用
+        无法获取本地资源时，对应资源退回CDN引用
+        :param charts: 序列化后的图表列表
+        :param report_dir: 报告所在目录（sidecar模式下资源写入其assets子目录）
+        :return: <script> 标签HTML
+        """
+        tags = []
+
+        for name, url in self.resolve_assets(charts).items():
+            local_file = self._fetch_asset(name, url) if self.mode != 'cdn' else None
+
+            if local_file is None:
+                tags.append(f'<script src="{url}"></script>')
+            elif self.mode == 'inline':
+                with open(local_file, 'r', encoding='utf-8') as f:
+                    content = f.read().replace('</script', '<\\/script')
+                tags.append(f"<script>{content}</script>")
+            else:
+                assets_dir = os.path.join(report_dir, 'assets')
+                os.makedirs(assets_dir, exist_ok=True)
+                shutil.copyfile(local_file, os.path.join(assets_dir, os.path.basename(local_file)))
+                tags.append(f'<script src="assets/{os.path.basename(local_file)}"></script>')
+
+        return '\n'.join(tags)
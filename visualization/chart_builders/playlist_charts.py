@@ -188,10 +188,10 @@ class PlaylistChartsBuilder(BaseChartBuilder):
             logger.error(f"创建创建者图表失败: {e}")
             return None
     
-    def create_relation_scatter(self, sample_size: int = 200):
-        """创建播放量与收藏数关系散点图"""
+    def create_relation_scatter(self, sample_size: int = 1000):
+        """创建播放量与收藏数关系散点图（按播放量分层抽样，控制嵌入数据量）"""
         try:
-            playlists = self.db.get_all_playlists()[:sample_size]
+            playlists = self.db.sample_playlist_metrics(sample_size)
             if not playlists:
                 return self._create_empty_chart("关系分析", "暂无数据")
             
@@ -209,7 +209,7 @@ class PlaylistChartsBuilder(BaseChartBuilder):
                 .set_global_opts(
                     title_opts=opts.TitleOpts(
                         title="💫 播放量与收藏数关系分析",
-                        subtitle=f"样本数: {len(data)}",
+                        subtitle=f"样本数: {len(data)}（按播放量分层随机抽样）",
                         title_textstyle_opts=opts.TextStyleOpts(font_size=22, font_weight="bold"),
                         pos_left="center",
                         pos_top="2%"
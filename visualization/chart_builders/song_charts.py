@@ -1,7 +1,6 @@
 """歌曲相关图表构建器"""
 from pyecharts import options as opts
 from pyecharts.charts import Bar, Pie, Scatter, Radar
-from collections import Counter
 from .base_builder import BaseChartBuilder
 from utils.logger import get_logger
 
@@ -52,15 +51,12 @@ class SongChartsBuilder(BaseChartBuilder):
     def create_artist_bar(self, top_n: int = 20):
         """创建TOP歌手柱状图"""
         try:
-            songs = self.db.get_all_songs()
-            if not songs:
+            top_artists = self.db.get_artist_song_counts(top_n)
+            if not top_artists:
                 return self._create_empty_chart("歌手排行榜", "暂无歌曲数据")
             
-            artist_counts = Counter([s['artist'] for s in songs if s.get('artist')])
-            top_artists = artist_counts.most_common(top_n)
-            
-            artists = [a[0] for a in top_artists]
-            counts = [a[1] for a in top_artists]
+            artists = [a['artist'] for a in top_artists]
+            counts = [a['song_count'] for a in top_artists]
             
             return (
                 Bar(init_opts=opts.InitOpts(theme=self.theme, width="100%", height="650px"))
@@ -91,23 +87,12 @@ class SongChartsBuilder(BaseChartBuilder):
     def create_duration_pie(self):
         """创建歌曲时长分布饼图"""
         try:
-            songs = self.db.get_all_songs()
-            if not songs:
+            distribution = self.db.get_song_duration_distribution()
+            if not distribution:
                 return self._create_empty_chart("时长分布", "暂无歌曲数据", 'pie')
             
-            import pandas as pd
-            df = pd.DataFrame(songs)
-            durations_sec = df['duration'] / 1000
-            
-            categories = [
-                ("极短(≤2分钟)", len(durations_sec[durations_sec <= 120])),
-                ("短(2-3分钟)", len(durations_sec[(durations_sec > 120) & (durations_sec <= 180)])),
-                ("中等(3-5分钟)", len(durations_sec[(durations_sec > 180) & (durations_sec <= 300)])),
-                ("长(5-7分钟)", len(durations_sec[(durations_sec > 300) & (durations_sec <= 420)])),
-                ("超长(>7分钟)", len(durations_sec[durations_sec > 420]))
-            ]
-            
-            data = [(name, count) for name, count in categories if count > 0]
+            data = [(name, count) for name, count in distribution.items() if count > 0]
+            total_songs = sum(distribution.values())
             
             return (
                 Pie(init_opts=opts.InitOpts(theme=self.theme, width="100%", height="650px"))
@@ -122,7 +107,7 @@ class SongChartsBuilder(BaseChartBuilder):
                 .set_global_opts(
                     title_opts=opts.TitleOpts(
                         title="⏱️ 歌曲时长分布",
-                        subtitle=f"总计 {len(df)} 首歌曲",
+                        subtitle=f"总计 {total_songs} 首歌曲",
                         title_textstyle_opts=opts.TextStyleOpts(font_size=22, font_weight="bold"),
                         pos_left="center",
                         pos_top="2%"
@@ -267,26 +252,14 @@ class SongChartsBuilder(BaseChartBuilder):
     def create_popularity_distribution_bar(self):
         """创建歌曲热度分布柱状图（基于跨歌单次数）"""
         try:
-            # 获取所有歌曲的跨歌单统计
-            songs = self.db.get_all_songs()
-            if not songs:
+            # 按跨歌单次数区间统计唯一歌曲数
+            distribution = self.db.get_cross_count_distribution()
+            if not distribution or sum(distribution.values()) == 0:
                 return self._create_empty_chart("热度分布", "暂无歌曲数据")
             
-            import pandas as pd
-            
-            # 计算每首歌的跨歌单次数
-            df = pd.DataFrame(songs)
-            cross_counts = df.groupby('song_id')['playlist_id'].nunique().reset_index()
-            cross_counts.columns = ['song_id', 'cross_count']
-            
-            # 定义热度区间（基于跨歌单次数）
-            bins = [0, 1, 2, 3, 5, 100]
-            labels = ['仅1个歌单', '2个歌单', '3个歌单', '4-5个歌单', '6个以上歌单']
-            cross_counts['range'] = pd.cut(cross_counts['cross_count'], bins=bins, labels=labels, include_lowest=True)
-            
-            counts = cross_counts['range'].value_counts().sort_index()
-            categories = counts.index.tolist()
-            values = counts.values.tolist()
+            categories = list(distribution.keys())
+            values = list(distribution.values())
+            total_unique = sum(values)
             
             return (
                 Bar(init_opts=opts.InitOpts(theme=self.theme, width="100%", height="650px"))
@@ -303,7 +276,7 @@ class SongChartsBuilder(BaseChartBuilder):
                 .set_global_opts(
                     title_opts=opts.TitleOpts(
                         title="📊 歌曲热度分布",
-                        subtitle=f"总计 {len(cross_counts)} 首唯一歌曲 | 按跨歌单出现次数统计",
+                        subtitle=f"总计 {total_unique} 首唯一歌曲 | 按跨歌单出现次数统计",
                         title_textstyle_opts=opts.TextStyleOpts(font_size=22, font_weight="bold")
                     ),
                     xaxis_opts=opts.AxisOpts(
@@ -1,7 +1,7 @@
 """现代化可视化报告生成器 - 模块化版本"""
 import os
-import re
-import shutil
+import json
+import time
 from typing import List, Dict, Any, Optional
 from pyecharts.globals import ThemeType
 
@@ -9,6 +9,8 @@ from database.db_manager import DatabaseManager
 from config.settings import VISUALIZATION_CONFIG, OUTPUT_CONFIG
 from utils.logger import get_logger
 from .templates.html_builder import ModernHTMLBuilder
+from .asset_manager import AssetManager
+from .report_profiler import ReportProfiler, TimedDatabase
 from .chart_builders import PlaylistChartsBuilder, SongChartsBuilder
 
 logger = get_logger()
@@ -24,10 +26,12 @@ class ModernReportGenerator:
         """
         self.db = db_manager if db_manager else DatabaseManager()
         self.theme = self._get_theme()
+        self.profiler = None  # 最近一次生成报告的性能分析结果
         
-        # 初始化图表构建器
-        self.playlist_builder = PlaylistChartsBuilder(self.db, self.theme)
-        self.song_builder = SongChartsBuilder(self.db, self.theme)
+        # 初始化图表构建器（通过代理统计图表构建中的数据查询耗时）
+        self._timed_db = TimedDatabase(self.db)
+        self.playlist_builder = PlaylistChartsBuilder(self._timed_db, self.theme)
+        self.song_builder = SongChartsBuilder(self._timed_db, self.theme)
         
         logger.info("现代化报告生成器初始化完成")
     
@@ -43,63 +47,49 @@ class ModernReportGenerator:
         theme_name = VISUALIZATION_CONFIG.get('theme', 'macarons')
         return theme_map.get(theme_name, ThemeType.MACARONS)
     
-    def _extract_chart_content(self, html: str) -> Optional[str]:
+    def _serialize_chart(self, chart) -> Optional[Dict[str, str]]:
         """
-        从完整HTML中提取图表内容
-        :param html: 完整HTML字符串
-        :return: 图表内容（div + script）
-        """
-        try:
-            # 匹配 <div id=... 到 </script> 的内容
-            pattern = r'(<div id="[^"]*"[^>]*>.*?</div>\s*<script>.*?</script>)'
-            match = re.search(pattern, html, re.DOTALL)
-            if match:
-                return match.group(1)
-            
-            # 备用匹配方案
-            pattern2 = r'(<div[^>]*class="chart-container"[^>]*>.*?</div>.*?<script>.*?</script>)'
-            match2 = re.search(pattern2, html, re.DOTALL)
-            if match2:
-                return match2.group(1)
-            
-            logger.warning("无法提取图表内容")
-            return None
-        except Exception as e:
-            logger.error(f"提取图表内容失败: {e}")
-            return None
-    
-    def _generate_chart_html(self, chart, temp_file: str) -> Optional[str]:
-        """
-        生成图表HTML内容
+        将图表序列化为延迟初始化所需的数据（不直接生成初始化脚本）
         :param chart: 图表对象
-        :param temp_file: 临时文件路径
-        :return: 图表HTML内容
+        :return: 图表ID、主题、尺寸及option JSON
         """
         try:
             if chart is None:
                 return None
             
-            # 渲染图表到临时文件
-            chart.render(temp_file)
+            # option以紧凑JSON嵌入页面，转义 "<" 避免提前闭合 <script> 标签
+            options = json.loads(chart.dump_options_with_quotes())
+            options_json = json.dumps(options, ensure_ascii=False, separators=(',', ':'))
+            options_json = options_json.replace('<', '\\u003c')
             
-            # 读取并提取内容
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            return self._extract_chart_content(html_content)
+            return {
+                'chart_id': chart.chart_id,
+                'theme': chart.theme,
+                'width': chart.width,
+                'height': chart.height,
+                'options': options_json,
+                'dependencies': list(chart.js_dependencies.items),
+            }
         except Exception as e:
-            logger.error(f"生成图表HTML失败: {e}")
+            logger.error(f"序列化图表失败: {e}")
             return None
     
-    def generate_report(self, output_path: Optional[str] = None) -> str:
+    def generate_report(self, output_path: Optional[str] = None, profile_memory: Optional[bool] = None) -> str:
         """
-        生成完整的现代化可视化报告
+        生成完整的现代化可视化报告（同时在报告旁写出各图表耗时的JSON性能分析）
         :param output_path: 输出文件路径
+        :param profile_memory: 是否统计每个图表的峰值内存增量（None使用配置）
         :return: 报告文件路径
         """
+        if profile_memory is None:
+            profile_memory = VISUALIZATION_CONFIG.get('profile_memory', False)
+        profiler = self.profiler = ReportProfiler(profile_memory)
+        profiler.start()
         try:
             # 获取统计数据
+            stage_start = time.perf_counter()
             stats = self.db.get_statistics()
+            profiler.record_stage('statistics', time.perf_counter() - stage_start)
             if not stats or stats.get('total_playlists', 0) == 0:
                 logger.warning("没有歌单数据，无法生成报告")
                 return ""
@@ -114,10 +104,6 @@ class ModernReportGenerator:
             logger.info("开始生成现代化可视化报告...")
             logger.info("="*60)
             
-            # 创建临时目录
-            temp_dir = os.path.join(OUTPUT_CONFIG['reports_dir'], 'temp_charts')
-            os.makedirs(temp_dir, exist_ok=True)
-            
             # 定义图表配置
             chart_configs = [
                 # 歌单相关图表
@@ -149,7 +135,8 @@ class ModernReportGenerator:
                 {
                     'name': '关系分析',
                     'icon': '💫',
-                    'func': lambda: self.playlist_builder.create_relation_scatter(200)
+                    'func': lambda: self.playlist_builder.create_relation_scatter(
+                        VISUALIZATION_CONFIG.get('scatter_max_points', 1000))
                 },
                 {
                     'name': '规模分布',
@@ -200,7 +187,7 @@ class ModernReportGenerator:
             ]
             
             # 生成所有图表
-            charts_html = []
+            charts = []
             nav_items = ['📋 概览']
             
             for i, config in enumerate(chart_configs):
@@ -210,43 +197,79 @@ class ModernReportGenerator:
                 
                 logger.info(f"[{i+1}/{len(chart_configs)}] 生成 {name} 图表...")
                 
+                self._timed_db.take()
+                profiler.begin_chart()
+                status, render_seconds, output_bytes = 'error', 0.0, 0
+                chart_start = time.perf_counter()
                 try:
                     chart = func()
+                    build_end = time.perf_counter()
                     if chart:
-                        temp_file = os.path.join(temp_dir, f'chart_{i}.html')
-                        chart_html = self._generate_chart_html(chart, temp_file)
+                        chart_data = self._serialize_chart(chart)
+                        render_seconds = time.perf_counter() - build_end
                         
-                        if chart_html:
-                            charts_html.append(chart_html)
+                        if chart_data:
+                            charts.append(chart_data)
                             nav_items.append(f"{icon} {name}")
-                            logger.info(f"    ✓ {name} 生成成功")
+                            status = 'ok'
+                            output_bytes = len(chart_data['options'].encode('utf-8'))
+                            logger.info(f"    ✓ {name} 生成成功 ({(time.perf_counter() - chart_start) * 1000:.0f} ms)")
                         else:
-                            logger.warning(f"    ✗ {name} 提取内容失败")
+                            status = 'serialize_failed'
+                            logger.warning(f"    ✗ {name} 序列化失败")
                     else:
+                        status = 'empty'
                         logger.warning(f"    ✗ {name} 生成失败（无数据）")
                 except Exception as e:
+                    build_end = time.perf_counter()
                     logger.error(f"    ✗ {name} 生成失败: {e}")
+                
+                fetch_seconds = self._timed_db.take()
+                build_seconds = max(0.0, build_end - chart_start - fetch_seconds)
+                profiler.end_chart(name, status, fetch_seconds, build_seconds, render_seconds, output_bytes)
+            
+            profiler.record_stage('charts', sum(c['total_ms'] for c in profiler.charts) / 1000)
             
             logger.info("="*60)
-            logger.info(f"成功生成 {len(charts_html)} 个图表")
+            logger.info(f"成功生成 {len(charts)} 个图表")
             logger.info("="*60)
             
             # 构建最终HTML
             logger.info("正在构建HTML报告...")
-            final_html = ModernHTMLBuilder.build_html(stats, charts_html, nav_items)
+            stage_start = time.perf_counter()
+            asset_manager = AssetManager(VISUALIZATION_CONFIG.get('asset_mode', 'cdn'))
+            asset_tags = asset_manager.build_script_tags(charts, os.path.dirname(os.path.abspath(output_path)))
+            final_html = ModernHTMLBuilder.build_html(
+                stats, charts, nav_items,
+                max_live_charts=VISUALIZATION_CONFIG.get('max_live_charts', 0),
+                asset_tags=asset_tags,
+                minify=VISUALIZATION_CONFIG.get('minify_html', True)
+            )
+            
+            profiler.record_stage('html_build', time.perf_counter() - stage_start)
             
             # 写入文件
+            stage_start = time.perf_counter()
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(final_html)
+            profiler.record_stage('write', time.perf_counter() - stage_start)
+            profiler.stop()
+            
+            report_size = os.path.getsize(output_path)
+            options_size = sum(len(chart['options'].encode('utf-8')) for chart in charts)
+            logger.info(
+                f"报告大小: {report_size / 1024:.1f} KB "
+                f"(图表数据 {options_size / 1024:.1f} KB, 资源模式: {asset_manager.mode})"
+            )
             
-            # 清理临时文件
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-                logger.info("临时文件已清理")
+            logger.info("各图表耗时:\n" + profiler.format_table())
+            profile_path = os.path.splitext(output_path)[0] + '.profile.json'
+            profiler.dump(profile_path, output_path)
+            logger.info(f"性能分析已保存: {profile_path}")
             
             logger.info("="*60)
             logger.info(f"✓ 报告生成成功: {output_path}")
-            logger.info(f"✓ 共包含 {len(charts_html)} 个可视化图表")
+            logger.info(f"✓ 共包含 {len(charts)} 个可视化图表")
             logger.info("="*60)
             
             return output_path
@@ -256,6 +279,8 @@ class ModernReportGenerator:
             import traceback
             logger.error(traceback.format_exc())
             return ""
+        finally:
+            profiler.stop()
     
     def get_report_summary(self) -> Dict[str, Any]:
         """
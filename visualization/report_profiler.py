@@ -0,0 +1,138 @@
+"""
+报告生成性能分析模块
+按图表记录数据查询、图表构建、序列化各阶段耗时、输出大小和峰值内存增量（tracemalloc），
+输出汇总表和JSON，便于把报告生成的性能回退定位到具体图表
+"""
+import json
+import time
+import tracemalloc
+from typing import List, Dict, Any, Optional
+
+
+class TimedDatabase:
+    """数据库管理器代理，累计图表构建过程中花在数据库方法上的时间"""
+
+    def __init__(self, db_manager):
+        self._db = db_manager
+        self.seconds = 0.0
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+        return timed
+
+    def take(self) -> float:
+        """取出并清零累计耗时"""
+        seconds, self.seconds = self.seconds, 0.0
+        return seconds
+
+
+class ReportProfiler:
+    """报告生成各阶段的耗时和内存统计"""
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        初始化
+        :param trace_memory: 是否用 tracemalloc 统计每个图表的峰值内存增量（会使耗时变长）
+        """
+        self.trace_memory = trace_memory
+        self.charts: List[Dict[str, Any]] = []
+        self.stages: Dict[str, float] = {}
+        self._started_tracing = False
+        self._memory_base = 0
+        self._start = None
+
+    def start(self):
+        """开始统计（外部已在跟踪内存时沿用，不重复启动）"""
+        self._start = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """结束统计"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if self._start is not None:
+            self.stages['total'] = time.perf_counter() - self._start
+            self._start = None
+
+    def record_stage(self, name: str, seconds: float):
+        """记录报告级阶段耗时（统计数据、HTML构建、写文件等）"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def begin_chart(self):
+        """开始一个图表（重置峰值内存基线）"""
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self._memory_base = tracemalloc.get_traced_memory()[0]
+
+    def end_chart(self, name: str, status: str, fetch_seconds: float, build_seconds: float,
+                  render_seconds: float, output_bytes: int):
+        """
+        记录一个图表
+        :param name: 图表名称
+        :param status: ok=成功, empty=无数据, serialize_failed=序列化失败, error=异常
+        :param fetch_seconds: 数据查询耗时
+        :param build_seconds: 图表构建耗时（不含数据查询）
+        :param render_seconds: 序列化option耗时
+        :param output_bytes: 嵌入报告的option字节数
+        """
+        peak_delta = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak_delta = max(0, tracemalloc.get_traced_memory()[1] - self._memory_base)
+        self.charts.append({
+            'name': name,
+            'status': status,
+            'fetch_ms': round(fetch_seconds * 1000, 3),
+            'build_ms': round(build_seconds * 1000, 3),
+            'render_ms': round(render_seconds * 1000, 3),
+            'total_ms': round((fetch_seconds + build_seconds + render_seconds) * 1000, 3),
+            'output_bytes': output_bytes,
+            'peak_memory_kb': round(peak_delta / 1024, 1) if peak_delta is not None else None,
+        })
+
+    def to_dict(self, report_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        性能分析结果
+        :param report_path: 报告路径
+        :return: 报告级阶段耗时和各图表明细
+        """
+        return {
+            'report_path': report_path,
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'trace_memory': self.trace_memory,
+            'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            'charts': self.charts,
+        }
+
+    def format_table(self) -> str:
+        """
+        各图表耗时汇总表（按总耗时从高到低）
+        :return: 文本表格
+        """
+        lines = [f"{'图表':<12}{'状态':<8}{'查询ms':>10}{'构建ms':>10}{'序列化ms':>10}{'总计ms':>10}"
+                 f"{'大小KB':>9}{'峰值内存KB':>12}"]
+        for chart in sorted(self.charts, key=lambda c: c['total_ms'], reverse=True):
+            memory = f"{chart['peak_memory_kb']:.1f}" if chart['peak_memory_kb'] is not None else '-'
+            lines.append(
+                f"{chart['name']:<12}{chart['status']:<8}{chart['fetch_ms']:>10.1f}{chart['build_ms']:>10.1f}"
+                f"{chart['render_ms']:>10.1f}{chart['total_ms']:>10.1f}{chart['output_bytes'] / 1024:>9.1f}{memory:>12}"
+            )
+        stages = ', '.join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.stages.items())
+        lines.append(f"阶段耗时: {stages}")
+        return '\n'.join(lines)
+
+    def dump(self, path: str, report_path: Optional[str] = None):
+        """写出JSON性能分析结果"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(report_path), f, ensure_ascii=False, indent=2)
@@ -1,6 +1,16 @@
 """现代化HTML报告构建器"""
+import re
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+# 默认的ECharts运行时引用（未指定资源时使用）
+DEFAULT_ASSET_TAGS = (
+    '<script src="https://cdn.jsdelivr.net/npm/echarts@5/dist/echarts.min.js"></script>\n'
+    '<script src="https://cdn.jsdelivr.net/npm/echarts-wordcloud@2/dist/echarts-wordcloud.min.js"></script>'
+)
+
+# 资源占位符，在压缩模板之后替换，避免改动内联的第三方脚本
+ASSETS_PLACEHOLDER = '<!--ECHARTS_ASSETS-->'
 
 
 class ModernHTMLBuilder:
@@ -416,8 +426,65 @@ class ModernHTMLBuilder:
             // 不自动滚动到顶部，保持当前滚动位置
             // window.scrollTo({ top: 0, behavior: 'smooth' });
             
-            // 调整当前页面的图表大小
-            resizeCurrentPageCharts();
+            // 首次进入时初始化当前页面的图表，已初始化的则调整大小
+            initPageCharts(pageIndex);
+        }
+        
+        // 已初始化图表的页面序号，按最近查看顺序排列
+        const liveChartPages = [];
+        
+        // 延迟初始化：页面首次显示时才从option JSON创建ECharts实例
+        function initPageCharts(pageIndex) {
+            const page = document.getElementById('page-' + pageIndex);
+            if (!page || !window.echarts) {
+                return;
+            }
+            
+            const chartDoms = page.querySelectorAll('.lazy-chart');
+            if (chartDoms.length === 0) {
+                return;
+            }
+            
+            chartDoms.forEach(dom => {
+                const instance = echarts.getInstanceByDom(dom);
+                if (instance) {
+                    instance.resize();
+                    return;
+                }
+                const optionsNode = document.getElementById(dom.dataset.optionsId);
+                if (!optionsNode) {
+                    return;
+                }
+                const chart = echarts.init(dom, dom.dataset.theme || null, {renderer: 'canvas'});
+                chart.setOption(JSON.parse(optionsNode.textContent));
+            });
+            
+            // 更新最近查看顺序
+            const pos = liveChartPages.indexOf(pageIndex);
+            if (pos !== -1) {
+                liveChartPages.splice(pos, 1);
+            }
+            liveChartPages.push(pageIndex);
+            
+            // 超出上限时释放最久未查看页面的图表
+            const maxLive = parseInt(document.body.dataset.maxLiveCharts || '0', 10);
+            while (maxLive > 0 && liveChartPages.length > maxLive) {
+                disposePageCharts(liveChartPages.shift());
+            }
+        }
+        
+        // 释放页面中的图表实例，再次进入时重新初始化
+        function disposePageCharts(pageIndex) {
+            const page = document.getElementById('page-' + pageIndex);
+            if (!page) {
+                return;
+            }
+            page.querySelectorAll('.lazy-chart').forEach(dom => {
+                const instance = echarts.getInstanceByDom(dom);
+                if (instance) {
+                    instance.dispose();
+                }
+            });
         }
         
         // 返回顶部
@@ -461,18 +528,11 @@ class ModernHTMLBuilder:
                 }, index * 100);
             });
             
-            // 强制调整所有ECharts图表大小
-            setTimeout(() => {
-                if (window.echarts) {
-                    const echartsInstances = document.querySelectorAll('[_echarts_instance_]');
-                    echartsInstances.forEach(dom => {
-                        const instance = echarts.getInstanceByDom(dom);
-                        if (instance) {
-                            instance.resize();
-                        }
-                    });
-                }
-            }, 500);
+            // 只初始化当前可见页面的图表，其余页面切换时再初始化
+            const activePage = document.querySelector('.page-section.active');
+            if (activePage) {
+                initPageCharts(parseInt(activePage.id.replace('page-', ''), 10));
+            }
         });
         
         // 监听窗口大小变化，自动调整图表
@@ -487,33 +547,50 @@ class ModernHTMLBuilder:
                 });
             }
         });
-        
-        // 页面切换时也调整图表大小
-        function resizeCurrentPageCharts() {
-            setTimeout(() => {
-                const activePage = document.querySelector('.page-section.active');
-                if (activePage && window.echarts) {
-                    const charts = activePage.querySelectorAll('[_echarts_instance_]');
-                    charts.forEach(dom => {
-                        const instance = echarts.getInstanceByDom(dom);
-                        if (instance) {
-                            instance.resize();
-                        }
-                    });
-                }
-            }, 100);
-        }
+
         """
     
     @staticmethod
-    def build_html(stats: Dict[str, Any], charts_html: List[str], nav_items: List[str]) -> str:
+    def minify_css(css: str) -> str:
+        """压缩CSS：去掉注释和多余空白"""
+        css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+        css = re.sub(r'\s+', ' ', css)
+        css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+        return css.replace(';}', '}').strip()
+    
+    @staticmethod
+    def minify_js(js: str) -> str:
+        """压缩JS：去掉整行注释、缩进和空行（保留换行，不依赖分号补全规则）"""
+        lines = [line.strip() for line in js.splitlines()]
+        return '\n'.join(line for line in lines if line and not line.startswith('//'))
+    
+    @staticmethod
+    def minify_html(html: str) -> str:
+        """压缩HTML：去掉缩进和空行"""
+        lines = [line.strip() for line in html.splitlines()]
+        return '\n'.join(line for line in lines if line)
+    
+    @staticmethod
+    def build_html(stats: Dict[str, Any], charts: List[Dict[str, str]], nav_items: List[str],
+                   max_live_charts: int = 0, asset_tags: Optional[str] = None,
+                   minify: bool = False) -> str:
         """
         构建完整的HTML报告
+        图表以option JSON嵌入，切换到对应标签页时才初始化
         :param stats: 统计数据
-        :param charts_html: 图表HTML列表
+        :param charts: 图表数据列表（chart_id, theme, width, height, options）
         :param nav_items: 导航项列表
+        :param max_live_charts: 同时保留的图表实例数（0=不释放）
+        :param asset_tags: ECharts运行时及扩展的 <script> 标签（None使用CDN默认引用）
+        :param minify: 是否压缩模板
         :return: 完整HTML字符串
         """
+        css = ModernHTMLBuilder.get_css_styles()
+        javascript = ModernHTMLBuilder.get_javascript()
+        if minify:
+            css = ModernHTMLBuilder.minify_css(css)
+            javascript = ModernHTMLBuilder.minify_js(javascript)
+        
         # 构建统计卡片 - 修复数据显示问题
         total_play = stats.get('total_playlist_play_count', 0)
         total_sub = stats.get('total_playlist_subscribe_count', 0)
@@ -629,16 +706,19 @@ class ModernHTMLBuilder:
         </div>
         '''
         
-        # 构建图表页面
+        # 构建图表页面（仅放置容器和option JSON，不在加载时初始化）
         charts_pages_html = '\n'.join([
             f'''
             <div class="page-section" id="page-{i+1}">
                 <div class="chart-card">
-                    {chart_html}
+                    <div id="{chart['chart_id']}" class="chart-container lazy-chart"
+                         data-theme="{chart['theme']}" data-options-id="options-{chart['chart_id']}"
+                         style="width:{chart['width']}; height:{chart['height']};"></div>
+                    <script type="application/json" id="options-{chart['chart_id']}">{chart['options']}</script>
                 </div>
             </div>
             '''
-            for i, chart_html in enumerate(charts_html)
+            for i, chart in enumerate(charts)
         ])
         
         # 完整HTML
@@ -649,11 +729,10 @@ class ModernHTMLBuilder:
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <meta name="description" content="网易云音乐热门歌单数据分析可视化报告">
     <title>🎵 网易云音乐数据分析报告</title>
-    <script src="https://cdn.jsdelivr.net/npm/echarts@5/dist/echarts.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/echarts-wordcloud@2/dist/echarts-wordcloud.min.js"></script>
-    <style>{ModernHTMLBuilder.get_css_styles()}</style>
+    {ASSETS_PLACEHOLDER}
+    <style>{css}</style>
 </head>
-<body>
+<body data-max-live-charts="{max_live_charts}">
     <div class="main-container">
         <!-- 头部 -->
         <div class="modern-header">
@@ -696,8 +775,11 @@ class ModernHTMLBuilder:
     <!-- 返回顶部按钮 -->
     <button class="back-top-btn" onclick="scrollToTop()">↑</button>
     
-    <script>{ModernHTMLBuilder.get_javascript()}</script>
+    <script>{javascript}</script>
 </body>
 </html>'''
         
-        return html
+        if minify:
+            html = ModernHTMLBuilder.minify_html(html)
+        
+        return html.replace(ASSETS_PLACEHOLDER, asset_tags if asset_tags is not None else DEFAULT_ASSET_TAGS)